@@ -1,10 +1,12 @@
 import threading
 import time
 import cv2
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from utils.logger import logger
+from utils.metrics import metrics
 from cameras.camera_events import SnapshotEvent
+from cameras.motion_detector import MotionDetector
 
 
 class CameraClient:
@@ -20,16 +22,40 @@ class CameraClient:
         camera_source,
         snapshot_policy: Dict,
         on_snapshot: Callable,
+        on_end_of_stream: Optional[Callable] = None,
+        wait_ready: Optional[Callable[[str, float], bool]] = None,
     ):
         self.camera_id = camera_id
         self.camera_source = camera_source
         self.snapshot_policy = snapshot_policy
         self.on_snapshot = on_snapshot
+        self.on_end_of_stream = on_end_of_stream
+        # Replay only: wait_ready(camera_id, timeout) blocks until the
+        # pipelines can process a snapshot (models loaded)
+        self.wait_ready = wait_ready
 
         self._running = False
         self._thread = None
         self._lock = threading.Lock()
 
+        # Bumped on reconfigure(), so a superseded loop thread exits even
+        # if it was still busy in on_snapshot when it was replaced.
+        self._generation = 0
+
+        # Motion policy state (snapshot thread only)
+        self._motion_detector: Optional[MotionDetector] = None
+        self._last_checked_seq: Optional[int] = None
+        self._last_emit_time = float("-inf")
+
+        # Health state (monotonic times), see get_health()
+        self._started_at: Optional[float] = None
+        self._period_seconds = 0.0
+        self._last_frame_seen: Optional[float] = None
+        self._last_snapshot_at: Optional[float] = None
+        self._pipeline_started: Optional[float] = None
+        self._pipeline_seconds_ema = 0.0
+        self._snapshots = 0
+
     def start(self):
         with self._lock:
             if self._running:
@@ -38,8 +64,11 @@ class CameraClient:
             logger.log(f"Starting CameraClient '{self.camera_id}'")
 
             self._running = True
+            self._started_at = time.monotonic()
+            self._last_frame_seen = None
 
             try:
+                self._register_consumer_rate()
                 self.camera_source.start()
                 self.camera_source.play()
             except Exception as e:
@@ -51,12 +80,7 @@ class CameraClient:
                 self._running = False
                 return
 
-            self._thread = threading.Thread(
-                target=self._snapshot_loop,
-                name=f"CameraClient-{self.camera_id}",
-                daemon=True,
-            )
-            self._thread.start()
+            self._start_loop_thread()
 
     def stop(self):
         with self._lock:
@@ -66,7 +90,14 @@ class CameraClient:
             logger.log(f"Stopping CameraClient '{self.camera_id}'")
             self._running = False
 
+            # A loop still busy in on_snapshot must not resume after a
+            # later start()
+            self._generation += 1
+
             try:
+                remove_consumer = getattr(self.camera_source, "remove_consumer", None)
+                if remove_consumer is not None:
+                    remove_consumer(self._consumer_id)
                 self.camera_source.stop()
             except Exception as e:
                 # Non-fatal: shutdown must continue
@@ -78,87 +109,189 @@ class CameraClient:
         if self._thread:
             self._thread.join(timeout=2.0)
 
-    def _snapshot_loop(self):
+    def reconfigure(self, snapshot_policy: Dict) -> None:
+        """
+        Apply a new snapshot policy without restarting the camera source.
+        """
+        with self._lock:
+            self.snapshot_policy = snapshot_policy
+            self._generation += 1
+
+            if not self._running:
+                return
+
+            logger.log(f"Reconfiguring CameraClient '{self.camera_id}'")
+
+            previous_thread = self._thread
+
+            try:
+                self._register_consumer_rate()
+            except Exception as e:
+                logger.error(
+                    f"Failed to update consumer rate for '{self.camera_id}'",
+                    exc_info=e,
+                )
+
+        if previous_thread:
+            previous_thread.join(timeout=2.0)
+
+        with self._lock:
+            if self._running:
+                self._start_loop_thread()
+
+    def _start_loop_thread(self) -> None:
+        """
+        Caller must hold the lock.
+        """
+        self._thread = threading.Thread(
+            target=self._snapshot_loop,
+            args=(self._generation,),
+            name=f"CameraClient-{self.camera_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _is_current(self, generation: int) -> bool:
+        return self._running and self._generation == generation
+
+    def get_health(self) -> Dict:
+        """
+        Liveness snapshot for the health monitor. Never raises.
+        """
+        try:
+            now = time.monotonic()
+            source = self.camera_source
+
+            # Prefer source-side freshness: the client loop does not read
+            # frames while it is busy in on_snapshot.
+            last_frame_age = None
+            if hasattr(source, "last_frame_age"):
+                last_frame_age = source.last_frame_age()
+            elif self._last_frame_seen is not None:
+                last_frame_age = now - self._last_frame_seen
+
+            pipeline_started = self._pipeline_started
+            thread = self._thread
+
+            return {
+                "running": self._running,
+                "thread_alive": bool(thread and thread.is_alive()),
+                "paused": bool(getattr(source, "is_paused", lambda: False)()),
+                "replay": bool(getattr(source, "replay", False)),
+                "finished": bool(getattr(source, "is_finished", lambda: False)()),
+                "uptime_seconds": (
+                    now - self._started_at if self._started_at is not None else 0.0
+                ),
+                "last_frame_age": last_frame_age,
+                "last_snapshot_age": (
+                    now - self._last_snapshot_at
+                    if self._last_snapshot_at is not None
+                    else None
+                ),
+                "snapshots": self._snapshots,
+                "period_seconds": self._period_seconds,
+                "pipeline_seconds": self._pipeline_seconds_ema,
+                "pipeline_busy_seconds": (
+                    now - pipeline_started if pipeline_started is not None else 0.0
+                ),
+                "pipeline_lag_seconds": max(
+                    0.0,
+                    self._pipeline_seconds_ema - self._period_seconds,
+                ),
+            }
+        except Exception as e:
+            logger.error(
+                f"Failed to collect health for camera '{self.camera_id}'",
+                exc_info=e,
+            )
+            return {"running": self._running, "error": str(e)}
+
+    def _snapshot_loop(self, generation: int = 0):
         """
         Internal snapshot loop.
         This method runs in a background thread and must never raise.
+
+        Policies:
+          - "interval": emit one snapshot every interval_seconds.
+          - "motion": check a cheap motion score every check_interval_seconds
+            and emit only on change, at most every min_interval_seconds,
+            plus a heartbeat snapshot every heartbeat_seconds.
+
+        Replay sources (source.replay) are stepped on a virtual clock
+        instead, see _replay_loop().
         """
         try:
             policy_mode = self.snapshot_policy.get("mode", "interval")
 
-            if policy_mode != "interval":
+            if policy_mode not in ("interval", "motion"):
                 logger.error(
                     f"Unsupported snapshot policy '{policy_mode}' "
                     f"for camera '{self.camera_id}'"
                 )
                 return
 
-            interval_seconds = self.snapshot_policy.get("interval_seconds", 2)
             resize_percent = self.snapshot_policy.get("resize_percent", 100)
 
-            logger.log(
-                f"CameraClient '{self.camera_id}' snapshot loop started "
-                f"(interval={interval_seconds}s, resize={resize_percent}%)"
-            )
+            self._last_checked_seq = None
+            self._last_emit_time = float("-inf")
+
+            if policy_mode == "motion":
+                period_seconds = self.snapshot_policy.get("check_interval_seconds", 0.2)
+                self._motion_detector = MotionDetector(
+                    analysis_width=self.snapshot_policy.get("analysis_width", 160),
+                    pixel_threshold=self.snapshot_policy.get("pixel_threshold", 25),
+                    background_alpha=self.snapshot_policy.get("background_alpha", 0.05),
+                    roi=self.snapshot_policy.get("roi"),
+                )
+                logger.log(
+                    f"CameraClient '{self.camera_id}' snapshot loop started "
+                    f"(mode=motion, check={period_seconds}s, resize={resize_percent}%)"
+                )
+            else:
+                period_seconds = self.snapshot_policy.get("interval_seconds", 2)
+                logger.log(
+                    f"CameraClient '{self.camera_id}' snapshot loop started "
+                    f"(interval={period_seconds}s, resize={resize_percent}%)"
+                )
+
+            self._period_seconds = float(period_seconds)
+
+            if getattr(self.camera_source, "replay", False):
+                self._replay_loop(generation, policy_mode, period_seconds, resize_percent)
+                return
 
-            while self._running:
+            while self._is_current(generation):
                 loop_start = time.perf_counter()
 
                 try:
-                    frame = self.camera_source.get_snapshot()
+                    frame, frame_seq, is_view = self._get_frame()
                 except Exception as e:
                     logger.error(
                         f"Error retrieving frame from camera '{self.camera_id}'",
                         exc_info=e,
                     )
-                    time.sleep(interval_seconds)
+                    time.sleep(period_seconds)
                     continue
 
                 if frame is None:
-                    time.sleep(interval_seconds)
+                    time.sleep(period_seconds)
                     continue
 
-                processed_frame = frame
-
-                if resize_percent < 100:
-                    try:
-                        height, width = frame.shape[:2]
-                        new_width = int(width * resize_percent / 100)
-                        new_height = int(height * resize_percent / 100)
-
-                        processed_frame = cv2.resize(
-                            frame,
-                            (new_width, new_height),
-                            interpolation=cv2.INTER_AREA,
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to resize frame for camera '{self.camera_id}'",
-                            exc_info=e,
-                        )
-                        time.sleep(interval_seconds)
-                        continue
-
-                event = SnapshotEvent(
-                    camera_id=self.camera_id,
-                    frame=processed_frame,
-                    timestamp=time.time(),
-                )
+                self._last_frame_seen = time.monotonic()
 
-                try:
-                    self.on_snapshot(event)
-                except Exception as e:
-                    logger.error(
-                        f"Snapshot callback failed for camera '{self.camera_id}'",
-                        exc_info=e,
-                    )
+                if policy_mode == "motion" and not self._should_emit_on_motion(
+                    frame,
+                    frame_seq,
+                    time.monotonic(),
+                ):
+                    self._sleep_remaining(loop_start, period_seconds)
+                    continue
 
-                # ---- smart sleep: subtract execution time ----
-                elapsed = time.perf_counter() - loop_start
-                sleep_time = interval_seconds - elapsed
+                if not self._emit_snapshot(frame, is_view, resize_percent, time.time(), frame_seq):
+                    time.sleep(period_seconds)
+                    continue
 
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+                self._sleep_remaining(loop_start, period_seconds)
 
         except Exception as e:
             logger.error(
@@ -169,3 +302,271 @@ class CameraClient:
             logger.log(
                 f"CameraClient '{self.camera_id}' snapshot loop stopped"
             )
+
+    def _replay_loop(
+        self,
+        generation: int,
+        policy_mode: str,
+        period_seconds: float,
+        resize_percent: int,
+    ) -> None:
+        """
+        Offline replay: step through the video in period_seconds of video
+        time, as fast as on_snapshot returns. Snapshot timestamps and the
+        motion policy clock follow the video position, so a run over the
+        same file is deterministic: snapshots wait for wait_ready
+        instead of being skipped while the models load. Signals
+        on_end_of_stream when done.
+        """
+        video_time = 0.0
+        emitted = 0
+
+        while self._is_current(generation):
+            ref = self.camera_source.read_frame_at(video_time)
+            if ref is None:
+                break
+
+            video_time += period_seconds
+
+            if policy_mode == "motion" and not self._should_emit_on_motion(
+                ref.frame,
+                ref.seq,
+                ref.timestamp,
+            ):
+                continue
+
+            if not self._wait_until_ready(generation):
+                return
+
+            if self._emit_snapshot(ref.frame, True, resize_percent, ref.timestamp, ref.seq):
+                emitted += 1
+
+        if not self._is_current(generation):
+            return
+
+        logger.log(
+            f"CameraClient '{self.camera_id}' replay finished "
+            f"(video_time={video_time:.1f}s, snapshots={emitted})"
+        )
+
+        if self.on_end_of_stream:
+            try:
+                self.on_end_of_stream(self.camera_id)
+            except Exception as e:
+                logger.error(
+                    f"End-of-stream callback failed for camera '{self.camera_id}'",
+                    exc_info=e,
+                )
+
+    def _wait_until_ready(self, generation: int) -> bool:
+        """
+        Block until wait_ready() reports the pipelines ready. False if the
+        loop was stopped or replaced meanwhile.
+        """
+        if self.wait_ready is None:
+            return True
+
+        waiting = False
+        while self._is_current(generation):
+            try:
+                if self.wait_ready(self.camera_id, 1.0):
+                    if waiting:
+                        logger.log(f"CameraClient '{self.camera_id}' models ready, replay resumed")
+                    return True
+            except Exception as e:
+                logger.error(
+                    f"Readiness check failed for camera '{self.camera_id}'",
+                    exc_info=e,
+                )
+                time.sleep(1.0)
+
+            if not waiting:
+                waiting = True
+                logger.log(f"CameraClient '{self.camera_id}' replay waiting for models")
+        return False
+
+    def _emit_snapshot(
+        self,
+        frame,
+        is_view: bool,
+        resize_percent: int,
+        timestamp: float,
+        frame_seq: Optional[int] = None,
+    ) -> bool:
+        """
+        Resize/copy the frame and hand it to on_snapshot.
+        Returns False if the frame could not be prepared, or if it is a
+        ring view (frame_seq) whose slot was overwritten meanwhile.
+        """
+        processed_frame = frame
+
+        if resize_percent < 100:
+            try:
+                height, width = frame.shape[:2]
+                new_width = int(width * resize_percent / 100)
+                new_height = int(height * resize_percent / 100)
+
+                processed_frame = cv2.resize(
+                    frame,
+                    (new_width, new_height),
+                    interpolation=cv2.INTER_AREA,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to resize frame for camera '{self.camera_id}'",
+                    exc_info=e,
+                )
+                return False
+        elif is_view:
+            # The pipeline may keep the frame longer than the ring slot
+            processed_frame = frame.copy()
+
+        if is_view and frame_seq is not None and not self._is_frame_valid(frame_seq):
+            # The writer lapped the ring during the resize/copy: torn frame
+            metrics.counter(
+                "observer_torn_frames_total",
+                "Frames dropped because the ring slot was overwritten while read",
+                use="snapshot",
+                camera=self.camera_id,
+            ).inc()
+            return False
+
+        event = SnapshotEvent(
+            camera_id=self.camera_id,
+            frame=processed_frame,
+            timestamp=timestamp,
+            high_res_provider=self._high_res_provider(),
+        )
+
+        metrics.counter(
+            "observer_snapshots_total",
+            "Snapshots handed to the processing pipeline",
+            camera=self.camera_id,
+        ).inc()
+
+        started = time.monotonic()
+        self._pipeline_started = started
+
+        try:
+            with metrics.timer(
+                "observer_pipeline_seconds",
+                "Snapshot processing time in the pipeline",
+                camera=self.camera_id,
+            ):
+                self.on_snapshot(event)
+        except Exception as e:
+            logger.error(
+                f"Snapshot callback failed for camera '{self.camera_id}'",
+                exc_info=e,
+            )
+        finally:
+            finished = time.monotonic()
+            self._pipeline_started = None
+            self._last_snapshot_at = finished
+            self._snapshots += 1
+            elapsed = finished - started
+            self._pipeline_seconds_ema = (
+                elapsed
+                if self._snapshots == 1
+                else 0.8 * self._pipeline_seconds_ema + 0.2 * elapsed
+            )
+
+        return True
+
+    def _is_frame_valid(self, frame_seq: int) -> bool:
+        is_frame_valid = getattr(self.camera_source, "is_frame_valid", None)
+        return is_frame_valid is None or is_frame_valid(frame_seq)
+
+    def _high_res_provider(self) -> Optional[Callable]:
+        """
+        Main-stream frame fetcher for dual-stream sources, else None.
+        Returns (frame, capture timestamp), see SnapshotEvent.
+        """
+        if not getattr(self.camera_source, "main_url", None):
+            return None
+        return getattr(self.camera_source, "get_timed_high_res_snapshot", None)
+
+    @property
+    def _consumer_id(self) -> str:
+        return f"CameraClient-{self.camera_id}"
+
+    def _register_consumer_rate(self) -> None:
+        """
+        Tell the source how often this client samples frames, so it can
+        skip decoding frames nobody reads.
+        """
+        set_consumer_fps = getattr(self.camera_source, "set_consumer_fps", None)
+        if set_consumer_fps is None:
+            return
+
+        if self.snapshot_policy.get("mode", "interval") == "motion":
+            period_seconds = self.snapshot_policy.get("check_interval_seconds", 0.2)
+        else:
+            period_seconds = self.snapshot_policy.get("interval_seconds", 2)
+
+        if period_seconds and period_seconds > 0:
+            set_consumer_fps(self._consumer_id, 1.0 / period_seconds)
+
+    @staticmethod
+    def _sleep_remaining(loop_start: float, period_seconds: float) -> None:
+        # ---- smart sleep: subtract execution time ----
+        elapsed = time.perf_counter() - loop_start
+        sleep_time = period_seconds - elapsed
+
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+    def _should_emit_on_motion(
+        self,
+        frame,
+        frame_seq: Optional[int],
+        now: float,
+    ) -> bool:
+        """
+        Motion policy gate. 'now' is the policy clock in seconds.
+        Never raises: on failure the snapshot is emitted.
+        """
+        try:
+            # Same decoded frame as the last check: nothing new to score
+            if frame_seq is not None and frame_seq == self._last_checked_seq:
+                return False
+            self._last_checked_seq = frame_seq
+
+            score = self._motion_detector.score(frame)
+
+            since_emit = now - self._last_emit_time
+            threshold = self.snapshot_policy.get("motion_threshold", 0.01)
+            min_interval = self.snapshot_policy.get("min_interval_seconds", 0.0)
+            heartbeat = self.snapshot_policy.get("heartbeat_seconds", 60.0)
+
+            emit = (
+                (score >= threshold and since_emit >= min_interval)
+                or since_emit >= heartbeat
+            )
+
+            if emit:
+                self._last_emit_time = now
+            return emit
+
+        except Exception as e:
+            logger.error(
+                f"Motion gate failed for camera '{self.camera_id}'",
+                exc_info=e,
+            )
+            return True
+
+    def _get_frame(self) -> Tuple[Any, Optional[int], bool]:
+        """
+        Read the latest frame from the source as (frame, seq, is_view).
+        Sources with a frame ring return a zero-copy shared-memory view;
+        callers must copy it before handing it to the pipeline.
+        """
+        get_frame_ref = getattr(self.camera_source, "get_frame_ref", None)
+        if get_frame_ref is None:
+            return self.camera_source.get_snapshot(), None, False
+
+        ref = get_frame_ref()
+        if ref is None:
+            return None, None, False
+
+        return ref.frame, ref.seq, True
@@ -1,5 +1,9 @@
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+
+from cameras.frame_context import FrameContext
+from config import settings
+from utils.logger import logger
 
 
 @dataclass
@@ -10,3 +14,56 @@ class SnapshotEvent:
     camera_id: str
     frame: Any          # OpenCV frame (numpy array)
     timestamp: float    # Unix timestamp (seconds)
+
+    # Dual-stream sources: fetches a main-stream frame on demand (blocking),
+    # as (frame, capture timestamp)
+    high_res_provider: Optional[Callable[[], Tuple[Any, Optional[float]]]] = field(
+        default=None, repr=False
+    )
+
+    # Memoized resized frame / JPEG / embedding, shared by all pipelines
+    context: FrameContext = field(init=False, repr=False, compare=False)
+
+    # Capture time of the frame used as evidence, see get_high_res_frame()
+    evidence_timestamp: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.context = FrameContext(self.frame, camera_id=self.camera_id)
+        self.evidence_timestamp = self.timestamp
+        self._high_res: Optional[Tuple[Any]] = None
+
+    def get_high_res_frame(self):
+        """
+        High-resolution frame for evidence, or None if the source has no
+        main stream, it is unavailable, or its frame was captured more
+        than VLM_EVIDENCE_MAX_SKEW_SECONDS away from the snapshot (it may
+        not show the same scene). Fetched once per event; sets
+        evidence_timestamp to its capture time. Never raises.
+        """
+        if self._high_res is None:
+            self._high_res = (self._fetch_high_res_frame(),)
+        return self._high_res[0]
+
+    def _fetch_high_res_frame(self):
+        if self.high_res_provider is None:
+            return None
+
+        try:
+            frame, captured_at = self.high_res_provider()
+        except Exception:
+            return None
+
+        if frame is None:
+            return None
+
+        if captured_at is not None:
+            skew = captured_at - self.timestamp
+            if abs(skew) > settings.VLM_EVIDENCE_MAX_SKEW_SECONDS:
+                logger.warning(
+                    f"High-res frame {skew:+.1f}s from snapshot, using the "
+                    f"analysis frame as evidence | camera={self.camera_id}"
+                )
+                return None
+            self.evidence_timestamp = captured_at
+
+        return frame
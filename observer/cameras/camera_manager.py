@@ -1,14 +1,22 @@
 import sys
 import json
-from typing import Callable, Dict
+import queue
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
 
 from cameras.camera_client import CameraClient
+from cameras.camera_sources.onvif_camera import OnvifCamera
+from cameras.camera_sources.rtsp_camera import RtspCamera, redact_url
 from cameras.camera_sources.video_file_camera import VideoFileCamera
-from cameras.devtools.video_player_ui import VideoPlayerUI
-from PySide6.QtWidgets import QApplication
 
+from config import settings
 from utils.logger import logger
 
+# PySide6 (Qt) is imported only when a camera enables the dev UI
+if TYPE_CHECKING:
+    from cameras.devtools.video_player_ui import VideoPlayerUI
+
 
 class CameraManager:
     """
@@ -17,60 +25,50 @@ class CameraManager:
     Must be resilient and never crash the application.
     """
 
-    def __init__(self, config_path: str, on_camera_snapshot: Callable):
+    def __init__(
+        self,
+        config_path: str,
+        on_camera_snapshot: Callable,
+        on_replay_finished: Optional[Callable] = None,
+        wait_replay_ready: Optional[Callable[[str, float], bool]] = None,
+    ):
         self.config_path = config_path
         self.on_camera_snapshot = on_camera_snapshot
+        self.on_replay_finished = on_replay_finished
+        # Replay clients wait on it before each snapshot, see CameraClient
+        self.wait_replay_ready = wait_replay_ready
+
+        # Replay cameras that have not reached end of stream yet
+        self._active_replays: Set[str] = set()
+        self._replay_lock = threading.Lock()
 
         self._camera_clients: Dict[str, CameraClient] = {}
         self._camera_sources: Dict[str, object] = {}
         self._camera_configs = []
 
+        # Enabled camera configs by camera_id, as currently running
+        self._active_configs: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.RLock()
+
         self._qt_app = None
-        self._ui_players = []
+        self._ui_players: Dict[str, "VideoPlayerUI"] = {}
+        self._ui_actions: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._ui_timer = None
 
     def load(self):
         logger.log(f"Loading camera configuration from {self.config_path}")
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            self._camera_configs = self._read_config()
         except Exception as e:
             # Fatal: cannot operate without valid configuration
             logger.error("Failed to load camera configuration file", exc_info=e)
             raise
 
-        self._camera_configs = config.get("cameras", [])
-
         for cam_cfg in self._camera_configs:
-            try:
-                if not cam_cfg.get("enabled", False):
-                    continue
-
-                camera_id = cam_cfg["camera_id"]
-                camera_type = cam_cfg["type"]
-
-                logger.log(
-                    f"Initializing camera '{camera_id}' of type '{camera_type}'"
-                )
-
-                camera_source = self._create_camera_source(cam_cfg)
-                self._camera_sources[camera_id] = camera_source
-
-                client = CameraClient(
-                    camera_id=camera_id,
-                    camera_source=camera_source,
-                    snapshot_policy=cam_cfg.get("snapshot_policy", {}),
-                    on_snapshot=self._safe_snapshot_callback,
-                )
-
-                self._camera_clients[camera_id] = client
-
-            except Exception as e:
-                # Non-fatal: one camera must not break the entire system
-                logger.error(
-                    f"Failed to initialize camera '{cam_cfg.get('camera_id', 'unknown')}'",
-                    exc_info=e,
-                )
+            if cam_cfg.get("enabled", False):
+                self._init_camera(cam_cfg)
 
         logger.log(
             f"CameraManager initialized with {len(self._camera_clients)} active cameras"
@@ -82,7 +80,11 @@ class CameraManager:
         """
         logger.log("Starting all camera clients")
 
-        for camera_id, client in self._camera_clients.items():
+        with self._lock:
+            clients = list(self._camera_clients.items())
+            configs = list(self._active_configs.values())
+
+        for camera_id, client in clients:
             try:
                 client.start()
             except Exception as e:
@@ -93,59 +95,340 @@ class CameraManager:
                 )
 
         # Development UI (VideoPlayer) is optional and isolated
-        for cam_cfg in self._camera_configs:
-            try:
-                dev_cfg = cam_cfg.get("dev", {})
-                if not dev_cfg.get("ui_enabled", False):
-                    continue
-
-                camera_id = cam_cfg["camera_id"]
-                camera_source = self._camera_sources.get(camera_id)
+        for cam_cfg in configs:
+            self._open_ui(cam_cfg)
 
-                if not camera_source:
-                    continue
+        self._start_ui_action_timer()
 
-                logger.log(f"Starting VideoPlayerUI for camera '{camera_id}'")
-
-                if QApplication.instance() is None:
-                    self._qt_app = QApplication(sys.argv)
+    def stop(self):
+        """
+        Stop all camera clients gracefully.
+        """
+        logger.log("Stopping all camera clients")
 
-                player = VideoPlayerUI(
-                    camera=camera_source,
-                    window_title=cam_cfg.get("name", camera_id),
-                )
-                player.show()
-                self._ui_players.append(player)
+        with self._lock:
+            clients = list(self._camera_clients.items())
 
+        for camera_id, client in clients:
+            try:
+                client.stop()
             except Exception as e:
-                # Dev UI must never affect production flow
+                # Non-fatal: continue shutdown sequence
                 logger.error(
-                    f"Failed to start VideoPlayerUI for camera '{cam_cfg.get('camera_id')}'",
+                    f"Error while stopping CameraClient '{camera_id}'",
                     exc_info=e,
                 )
 
-    def stop(self):
+    def reload(self) -> bool:
         """
-        Stop all camera clients gracefully.
+        Re-read the configuration and apply only the differences:
+        removed cameras are stopped, new ones started, and changed ones
+        reconfigured (policy / dev UI) or recreated (type / source).
+        Unchanged cameras are not touched. An invalid file keeps the
+        running configuration. Never raises.
         """
-        logger.log("Stopping all camera clients")
+        try:
+            new_configs = self._read_config()
+        except Exception as e:
+            logger.error(
+                "Failed to reload camera configuration, keeping current cameras",
+                exc_info=e,
+            )
+            return False
+
+        try:
+            new_active = {
+                cam_cfg["camera_id"]: cam_cfg
+                for cam_cfg in new_configs
+                if cam_cfg.get("enabled", False)
+            }
+
+            with self._lock:
+                old_active = dict(self._active_configs)
+                self._camera_configs = new_configs
+
+            removed = [cid for cid in old_active if cid not in new_active]
+            added = [cid for cid in new_active if cid not in old_active]
+            changed = [
+                cid for cid in new_active
+                if cid in old_active and new_active[cid] != old_active[cid]
+            ]
+
+            if not (removed or added or changed):
+                return True
+
+            logger.log(
+                f"Applying camera configuration changes | added={added} "
+                f"removed={removed} changed={changed}"
+            )
+
+            for camera_id in removed:
+                self._remove_camera(camera_id)
 
-        for camera_id, client in self._camera_clients.items():
+            for camera_id in changed:
+                self._apply_camera_change(old_active[camera_id], new_active[camera_id])
+
+            for camera_id in added:
+                self._add_camera(new_active[camera_id])
+
+            return True
+
+        except Exception as e:
+            logger.error("Failed to apply camera configuration changes", exc_info=e)
+            return False
+
+    def add_camera_listener(self, listener: Callable[[str, str], None]) -> None:
+        """
+        Register listener(camera_id, change) for runtime camera changes.
+        change is "added" or "removed". Called from the reload thread.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    # -------- per-camera lifecycle --------
+
+    def _read_config(self) -> List[Dict]:
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        cameras = config.get("cameras", [])
+        if not isinstance(cameras, list):
+            raise ValueError("'cameras' must be a list")
+        return cameras
+
+    def _init_camera(self, cam_cfg) -> Optional[CameraClient]:
+        """
+        Create source and client for one camera. Never raises.
+        """
+        try:
+            camera_id = cam_cfg["camera_id"]
+            camera_type = cam_cfg["type"]
+
+            logger.log(
+                f"Initializing camera '{camera_id}' of type '{camera_type}'"
+            )
+
+            camera_source = self._create_camera_source(cam_cfg)
+            if hasattr(camera_source, "camera_id"):
+                camera_source.camera_id = camera_id
+
+            client = CameraClient(
+                camera_id=camera_id,
+                camera_source=camera_source,
+                snapshot_policy=cam_cfg.get("snapshot_policy", {}),
+                on_snapshot=self._safe_snapshot_callback,
+                on_end_of_stream=self._on_camera_end_of_stream,
+                wait_ready=(
+                    self.wait_replay_ready
+                    if getattr(camera_source, "replay", False)
+                    else None
+                ),
+            )
+
+            with self._lock:
+                self._camera_sources[camera_id] = camera_source
+                self._camera_clients[camera_id] = client
+                self._active_configs[camera_id] = cam_cfg
+
+            if getattr(camera_source, "replay", False):
+                with self._replay_lock:
+                    self._active_replays.add(camera_id)
+
+            return client
+
+        except Exception as e:
+            # Non-fatal: one camera must not break the entire system
+            logger.error(
+                f"Failed to initialize camera '{cam_cfg.get('camera_id', 'unknown')}'",
+                exc_info=e,
+            )
+            return None
+
+    def _add_camera(self, cam_cfg) -> None:
+        client = self._init_camera(cam_cfg)
+        if client is None:
+            return
+
+        try:
+            client.start()
+        except Exception as e:
+            logger.error(
+                f"Failed to start CameraClient '{client.camera_id}'",
+                exc_info=e,
+            )
+
+        if cam_cfg.get("dev", {}).get("ui_enabled", False) and self._ui_timer is None:
+            logger.warning(
+                f"Dev UI for camera '{client.camera_id}' needs a restart "
+                f"(no Qt event loop running)"
+            )
+        self._post_ui_action(lambda: self._open_ui(cam_cfg))
+        self._notify_listeners(client.camera_id, "added")
+
+    def _remove_camera(self, camera_id: str) -> None:
+        with self._lock:
+            client = self._camera_clients.pop(camera_id, None)
+            self._camera_sources.pop(camera_id, None)
+            self._active_configs.pop(camera_id, None)
+
+        with self._replay_lock:
+            self._active_replays.discard(camera_id)
+
+        # Listeners first, so streaming stops reading before the source closes
+        self._notify_listeners(camera_id, "removed")
+        self._post_ui_action(lambda: self._close_ui(camera_id))
+
+        if client:
             try:
                 client.stop()
             except Exception as e:
-                # Non-fatal: continue shutdown sequence
                 logger.error(
                     f"Error while stopping CameraClient '{camera_id}'",
                     exc_info=e,
                 )
 
+    def _apply_camera_change(self, old_cfg, new_cfg) -> None:
+        camera_id = new_cfg["camera_id"]
+
+        source_changed = (
+            old_cfg.get("type") != new_cfg.get("type")
+            or old_cfg.get("source") != new_cfg.get("source")
+        )
+        if source_changed:
+            logger.log(f"Camera '{camera_id}' source changed, recreating")
+            self._remove_camera(camera_id)
+            self._add_camera(new_cfg)
+            return
+
+        with self._lock:
+            client = self._camera_clients.get(camera_id)
+            self._active_configs[camera_id] = new_cfg
+
+        if client and old_cfg.get("snapshot_policy") != new_cfg.get("snapshot_policy"):
+            client.reconfigure(new_cfg.get("snapshot_policy", {}))
+
+        if old_cfg.get("dev") != new_cfg.get("dev") or old_cfg.get("name") != new_cfg.get("name"):
+            def refresh_ui():
+                self._close_ui(camera_id)
+                self._open_ui(new_cfg)
+
+            self._post_ui_action(refresh_ui)
+
+    def _notify_listeners(self, camera_id: str, change: str) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(camera_id, change)
+            except Exception as e:
+                logger.error(
+                    f"Camera listener failed | camera={camera_id} change={change}",
+                    exc_info=e,
+                )
+
+    # -------- dev UI (Qt thread only) --------
+
+    def _open_ui(self, cam_cfg) -> None:
+        try:
+            dev_cfg = cam_cfg.get("dev", {})
+            if not dev_cfg.get("ui_enabled", False):
+                return
+
+            camera_id = cam_cfg["camera_id"]
+            with self._lock:
+                camera_source = self._camera_sources.get(camera_id)
+
+            if not camera_source or camera_id in self._ui_players:
+                return
+
+            logger.log(f"Starting VideoPlayerUI for camera '{camera_id}'")
+
+            from PySide6.QtWidgets import QApplication
+            from cameras.devtools.video_player_ui import VideoPlayerUI
+
+            if QApplication.instance() is None:
+                self._qt_app = QApplication(sys.argv)
+
+            player = VideoPlayerUI(
+                camera=camera_source,
+                window_title=cam_cfg.get("name", camera_id),
+            )
+            player.show()
+            self._ui_players[camera_id] = player
+
+        except Exception as e:
+            # Dev UI must never affect production flow
+            logger.error(
+                f"Failed to start VideoPlayerUI for camera '{cam_cfg.get('camera_id')}'",
+                exc_info=e,
+            )
+
+    def _close_ui(self, camera_id: str) -> None:
+        player = self._ui_players.pop(camera_id, None)
+        if player is None:
+            return
+
+        try:
+            player.close()
+        except Exception as e:
+            logger.error(
+                f"Failed to close VideoPlayerUI for camera '{camera_id}'",
+                exc_info=e,
+            )
+
+    def _start_ui_action_timer(self) -> None:
+        """
+        Qt widgets may only be touched on the Qt thread; reloads run on
+        the watcher thread and hand UI work over through a queue.
+        """
+        if self._ui_timer is not None or "PySide6.QtWidgets" not in sys.modules:
+            # No dev UI opened: Qt was never imported
+            return
+
+        from PySide6.QtCore import QTimer
+        from PySide6.QtWidgets import QApplication
+
+        if QApplication.instance() is None:
+            return
+
+        self._ui_timer = QTimer()
+        self._ui_timer.timeout.connect(self._drain_ui_actions)
+        self._ui_timer.start(200)
+
+    def quit_ui(self) -> None:
+        """
+        Quit the dev UI event loop, which main.py blocks in. Callable
+        from any thread: the quit runs on the Qt thread.
+        """
+        if self._qt_app is not None:
+            self._post_ui_action(self._qt_app.quit)
+
+    def _post_ui_action(self, action: Callable[[], None]) -> None:
+        if self._ui_timer is None:
+            # No Qt event loop: the UI cannot be opened at runtime
+            return
+        self._ui_actions.put(action)
+
+    def _drain_ui_actions(self) -> None:
+        while True:
+            try:
+                action = self._ui_actions.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                action()
+            except Exception as e:
+                logger.error("Dev UI action failed", exc_info=e)
+
     def get_camera_source(self, camera_id: str):
         """
         Return the camera source for read-only integrations such as streaming.
         """
         try:
-            return self._camera_sources.get(camera_id)
+            with self._lock:
+                return self._camera_sources.get(camera_id)
         except Exception as e:
             logger.error(
                 f"Failed to get camera source '{camera_id}'",
@@ -158,11 +441,99 @@ class CameraManager:
         Return a shallow copy of active camera sources.
         """
         try:
-            return dict(self._camera_sources)
+            with self._lock:
+                return dict(self._camera_sources)
         except Exception as e:
             logger.error("Failed to get camera sources", exc_info=e)
             return {}
 
+    def get_camera_clients(self):
+        """
+        Return a shallow copy of active camera clients.
+        """
+        try:
+            with self._lock:
+                return dict(self._camera_clients)
+        except Exception as e:
+            logger.error("Failed to get camera clients", exc_info=e)
+            return {}
+
+    def get_camera_configs(self) -> Dict[str, Dict]:
+        """
+        Return a shallow copy of enabled camera configs by camera_id.
+        """
+        try:
+            with self._lock:
+                return dict(self._active_configs)
+        except Exception as e:
+            logger.error("Failed to get camera configs", exc_info=e)
+            return {}
+
+    def restart_camera(self, camera_id: str, reason: str = "") -> bool:
+        """
+        Stop and start one camera's client and source (e.g. stalled).
+        Returns False if the camera is unknown. Never raises.
+        """
+        try:
+            # stop() joins the client thread and start() reopens the
+            # source: not under the lock, which get_camera_source()
+            # callers on the asyncio loop also take
+            with self._lock:
+                client = self._camera_clients.get(camera_id)
+            if client is None:
+                return False
+
+            logger.warning(
+                f"Restarting camera '{camera_id}'"
+                + (f" | reason={reason}" if reason else "")
+            )
+            client.stop()
+            client.start()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to restart camera '{camera_id}'", exc_info=e)
+            return False
+
+    def has_replay_cameras(self) -> bool:
+        with self._replay_lock:
+            return bool(self._active_replays)
+
+    def _on_camera_end_of_stream(self, camera_id: str):
+        """
+        Called from a CameraClient thread when a replay source ends.
+        Fires on_replay_finished once every replay camera has ended.
+        Must never raise.
+        """
+        try:
+            with self._replay_lock:
+                if camera_id not in self._active_replays:
+                    return
+                self._active_replays.discard(camera_id)
+                finished = not self._active_replays
+
+            logger.log(f"Replay camera '{camera_id}' reached end of stream")
+
+            if finished and self.on_replay_finished:
+                self.on_replay_finished()
+
+        except Exception as e:
+            logger.error(
+                f"Failed to handle end of stream for camera '{camera_id}'",
+                exc_info=e,
+            )
+
+    @staticmethod
+    def _parse_replay_start(value) -> Optional[float]:
+        """
+        replay_start may be a Unix timestamp or an ISO 8601 string.
+        """
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        return datetime.fromisoformat(str(value)).timestamp()
+
     def _safe_snapshot_callback(self, snapshot_event):
         """
         Internal safety wrapper for snapshot callbacks.
@@ -177,6 +548,32 @@ class CameraManager:
                 exc_info=e,
             )
 
+    @staticmethod
+    def _rtsp_options(source_cfg) -> Dict:
+        """
+        Stream options shared by RTSP-based sources.
+        """
+        return {
+            "transport": source_cfg.get("transport", settings.RTSP_TRANSPORT),
+            "start_paused": source_cfg.get("start_paused", False),
+            "ring_capacity": source_cfg.get(
+                "ring_capacity",
+                settings.FRAME_RING_CAPACITY,
+            ),
+            "stall_timeout": source_cfg.get(
+                "stall_timeout_seconds",
+                settings.RTSP_STALL_TIMEOUT_SECONDS,
+            ),
+            "reconnect_max_delay": source_cfg.get(
+                "reconnect_max_delay_seconds",
+                settings.RTSP_RECONNECT_MAX_DELAY_SECONDS,
+            ),
+            "main_idle_timeout": source_cfg.get(
+                "main_idle_timeout_seconds",
+                settings.RTSP_MAIN_IDLE_TIMEOUT_SECONDS,
+            ),
+        }
+
     def _create_camera_source(self, cam_cfg):
         """
         Factory method for creating camera source objects.
@@ -196,6 +593,44 @@ class CameraManager:
                     video_path=video_path,
                     loop=loop,
                     start_paused=start_paused,
+                    ring_capacity=source_cfg.get(
+                        "ring_capacity",
+                        settings.FRAME_RING_CAPACITY,
+                    ),
+                    decode_threads=source_cfg.get(
+                        "decode_threads",
+                        settings.VIDEO_DECODE_THREADS,
+                    ),
+                    replay=source_cfg.get("replay", False),
+                    replay_start=self._parse_replay_start(
+                        source_cfg.get("replay_start")
+                    ),
+                )
+
+            if cam_type == "rtsp":
+                url = source_cfg["url"]
+
+                logger.log(f"Creating RtspCamera for {redact_url(url)}")
+
+                return RtspCamera(
+                    url=url,
+                    main_url=source_cfg.get("main_url"),
+                    **self._rtsp_options(source_cfg),
+                )
+
+            if cam_type == "onvif":
+                xaddr = source_cfg["xaddr"]
+
+                logger.log(f"Creating OnvifCamera for {xaddr}")
+
+                return OnvifCamera(
+                    xaddr=xaddr,
+                    username=source_cfg.get("username"),
+                    password=source_cfg.get("password"),
+                    password_env=source_cfg.get("password_env"),
+                    sub_profile=source_cfg.get("sub_profile"),
+                    main_profile=source_cfg.get("main_profile"),
+                    **self._rtsp_options(source_cfg),
                 )
 
             raise ValueError(f"Unsupported camera type: {cam_type}")
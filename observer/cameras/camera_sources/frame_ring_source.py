@@ -0,0 +1,218 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cameras.frame_ring_buffer import FrameRef, FrameRingBuffer
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+class FrameRingSource:
+    """
+    Consumer-facing part shared by camera sources that decode into a
+    shared-memory FrameRingBuffer: zero-copy frame access, owned snapshots
+    and consumer rate registration.
+
+    Subclasses own the capture object and the decode thread, and call
+    _retrieve_into_ring() for every frame they decide to decode.
+    """
+
+    # Decode at this multiple of the highest consumer rate, so a sampled
+    # frame is never older than half a consumer period.
+    CONSUMER_RATE_HEADROOM = 2.0
+
+    def __init__(self, ring_capacity: int = 8):
+        self._ring: Optional[FrameRingBuffer] = None
+        self._ring_capacity = ring_capacity
+
+        self._lock = threading.Lock()
+        self._consumer_fps: Dict[str, float] = {}
+
+        self._frames_grabbed = 0
+        self._frames_decoded = 0
+
+        # Metric label, set by CameraManager
+        self.camera_id: Optional[str] = None
+
+        self._paused = False
+
+    # -------- consumers --------
+
+    def set_consumer_fps(self, consumer_id: str, fps: Optional[float]) -> None:
+        """
+        Register the rate at which 'consumer_id' reads frames.
+        None or <= 0 removes the consumer.
+        """
+        with self._lock:
+            if fps is None or fps <= 0:
+                self._consumer_fps.pop(consumer_id, None)
+            else:
+                self._consumer_fps[consumer_id] = float(fps)
+
+    def remove_consumer(self, consumer_id: str) -> None:
+        self.set_consumer_fps(consumer_id, None)
+
+    def _required_consumer_fps(self) -> float:
+        """
+        Highest registered consumer rate, 0.0 when nobody registered.
+        """
+        with self._lock:
+            return max(self._consumer_fps.values(), default=0.0)
+
+    @property
+    def frame_ring_name(self) -> Optional[str]:
+        """
+        Shared memory name of the frame ring, for FrameRingBuffer.attach().
+        """
+        with self._lock:
+            return self._ring.name if self._ring else None
+
+    def get_frame_ref(self) -> Optional[FrameRef]:
+        """
+        Zero-copy reference to the latest frame (see FrameRef).
+        """
+        with self._lock:
+            if self._ring is None:
+                return None
+            return self._ring.latest()
+
+    def is_frame_valid(self, seq: int) -> bool:
+        """
+        True while the ring slot of frame 'seq' still holds that frame.
+        Check after working on a zero-copy view: False means the writer
+        overwrote the slot meanwhile and the result may be torn.
+        """
+        with self._lock:
+            return self._ring is not None and self._ring.is_valid(seq)
+
+    def get_recent_frames(self, count: int) -> List[FrameRef]:
+        """
+        Zero-copy references to up to 'count' recent frames, oldest first.
+        """
+        with self._lock:
+            if self._ring is None:
+                return []
+            return self._ring.history(count)
+
+    def is_paused(self) -> bool:
+        with self._lock:
+            return self._paused
+
+    def last_frame_age(self) -> Optional[float]:
+        """
+        Seconds since the latest frame was written, None before the first.
+        """
+        ref = self.get_frame_ref()
+        if ref is None:
+            return None
+        return max(0.0, time.time() - ref.timestamp)
+
+    def get_snapshot(self):
+        frame, _ = self.get_snapshot_with_seq()
+        return frame
+
+    def get_snapshot_with_seq(self):
+        """
+        Latest frame as an owned copy, safe to keep beyond the ring lifetime.
+        """
+        with self._lock:
+            ring = self._ring
+            if ring is None:
+                return None, 0
+
+            ref = ring.latest()
+            if ref is None:
+                return None, ring.latest_seq
+
+            return ring.copy_frame(ref), ref.seq
+
+    def get_timed_snapshot(self):
+        """
+        Latest frame as an owned copy with its capture time (Unix
+        seconds), or (None, None) before the first frame.
+        """
+        with self._lock:
+            ring = self._ring
+            if ring is None:
+                return None, None
+
+            ref = ring.latest()
+            if ref is None:
+                return None, None
+
+            return ring.copy_frame(ref), ref.timestamp
+
+    # -------- decode side --------
+
+    def _count_grab(self) -> None:
+        self._frames_grabbed += 1
+        metrics.counter(
+            "observer_frames_grabbed_total",
+            "Frames grabbed from the camera (decoded or not)",
+            camera=self.camera_id,
+        ).inc()
+
+    def _retrieve_into_ring(self, cap, timestamp: Optional[float] = None) -> bool:
+        """
+        Decode the frame last grabbed by 'cap' directly into the next ring
+        slot. Returns False if the decoder produced no frame.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with metrics.timer(
+            "observer_frame_decode_seconds",
+            "Frame decode (retrieve) latency",
+            camera=self.camera_id,
+        ):
+            return self._decode_into_ring(cap, timestamp)
+
+    def _decode_into_ring(self, cap, timestamp: float) -> bool:
+        ring = self._ring
+
+        if ring is None:
+            ret, frame = cap.retrieve()
+            if not ret or frame is None:
+                return False
+            self._frames_decoded += 1
+            self._replace_ring(frame, timestamp)
+            return True
+
+        target = ring.begin_write()
+        ret, frame = cap.retrieve(target)
+        if not ret or frame is None:
+            return False
+        self._frames_decoded += 1
+
+        if not np.shares_memory(frame, target):
+            # Decoder allocated a new buffer (e.g. resolution change)
+            if not ring.accepts(frame):
+                self._replace_ring(frame, timestamp)
+                return True
+            np.copyto(target, frame)
+
+        ring.commit_write(timestamp)
+        return True
+
+    def _replace_ring(self, frame, timestamp: float) -> None:
+        ring = FrameRingBuffer.create(self._ring_capacity, frame.shape)
+        ring.write(frame, timestamp)
+
+        with self._lock:
+            previous = self._ring
+            self._ring = ring
+
+        if previous:
+            logger.log(
+                f"{type(self).__name__} frame shape changed, ring reallocated"
+            )
+            previous.close()
+
+    def _close_ring(self) -> None:
+        with self._lock:
+            ring = self._ring
+            self._ring = None
+        if ring:
+            ring.close()
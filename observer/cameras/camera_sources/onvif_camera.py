@@ -0,0 +1,133 @@
+import os
+from typing import Optional
+
+from cameras.camera_sources.rtsp_camera import RtspCamera, redact_url
+from cameras.onvif_discovery import OnvifClient, select_streams, with_credentials
+from utils.logger import logger
+
+
+# Failed connects before the stream URIs are resolved again via ONVIF
+_RESOLVE_AFTER_FAILURES = 3
+
+
+class OnvifCamera(RtspCamera):
+    """
+    RTSP camera whose stream URIs are resolved through ONVIF.
+
+    Profiles can be pinned by token (as generated by
+    cameras.onvif_discovery); otherwise sub/main streams are selected
+    automatically. Resolution happens in the grab thread at connect time
+    and again after repeated connect failures, so start() never blocks
+    and camera address or URI changes are picked up.
+
+    The password is 'password', or read from the environment variable
+    named by 'password_env' at resolution time (generated configs do not
+    store it).
+    """
+
+    def __init__(
+        self,
+        xaddr: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        password_env: Optional[str] = None,
+        sub_profile: Optional[str] = None,
+        main_profile: Optional[str] = None,
+        analysis_max_width: int = 1280,
+        onvif_timeout: float = 5.0,
+        **rtsp_kwargs,
+    ):
+        super().__init__(url="", **rtsp_kwargs)
+
+        self.xaddr = xaddr
+        self._username = username
+        self._password = password
+        self._password_env = password_env
+        self._sub_profile = sub_profile
+        self._main_profile = main_profile
+        self._analysis_max_width = analysis_max_width
+        self._onvif_timeout = onvif_timeout
+
+        self._open_failures = 0
+
+    @property
+    def display_url(self) -> str:
+        return redact_url(self.url) if self.url else f"onvif:{self.xaddr}"
+
+    def _open_capture(self):
+        if not self.url and not self._resolve_streams():
+            return None
+
+        cap = super()._open_capture()
+
+        if cap is None:
+            self._open_failures += 1
+            if self._open_failures >= _RESOLVE_AFTER_FAILURES:
+                # The device may have new URIs (firmware update, DHCP)
+                self.url = ""
+                self._open_failures = 0
+        else:
+            self._open_failures = 0
+
+        return cap
+
+    def _resolve_streams(self) -> bool:
+        """
+        Fetch the stream URIs for the configured (or selected) profiles.
+        Never raises.
+        """
+        try:
+            password = self._get_password()
+            client = OnvifClient(
+                self.xaddr,
+                username=self._username,
+                password=password,
+                timeout=self._onvif_timeout,
+            )
+
+            sub_token, main_token = self._sub_profile, self._main_profile
+            if not sub_token:
+                sub, main = select_streams(
+                    client.get_profiles(),
+                    self._analysis_max_width,
+                )
+                if sub is None:
+                    logger.error(f"ONVIF device has no media profiles ({self.xaddr})")
+                    return False
+                sub_token = sub.token
+                main_token = main.token if main else None
+
+            self.url = with_credentials(
+                client.get_stream_uri(sub_token),
+                self._username,
+                password,
+            )
+
+            if main_token and main_token != sub_token:
+                self.main_url = with_credentials(
+                    client.get_stream_uri(main_token),
+                    self._username,
+                    password,
+                )
+
+            logger.log(
+                f"OnvifCamera resolved streams ({self.xaddr}) | "
+                f"sub={redact_url(self.url)} "
+                f"main={redact_url(self.main_url) if self.main_url else None}"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"OnvifCamera stream resolution failed ({self.xaddr})", exc_info=e)
+            return False
+
+    def _get_password(self) -> Optional[str]:
+        if self._password is not None or not self._password_env:
+            return self._password
+
+        password = os.getenv(self._password_env)
+        if password is None:
+            logger.warning(
+                f"OnvifCamera password variable '{self._password_env}' is not set ({self.xaddr})"
+            )
+        return password
@@ -0,0 +1,544 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import cv2
+
+from cameras.camera_sources.frame_ring_source import FrameRingSource
+from utils.logger import logger
+
+
+# OpenCV reads FFmpeg options from the environment when a capture is opened.
+# The variable is process-wide, so concurrent opens are serialized.
+_CAPTURE_OPTIONS_ENV = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+_capture_options_lock = threading.Lock()
+
+# Consecutive failed grab() calls before the connection is considered lost
+_MAX_GRAB_FAILURES = 3
+
+
+def redact_url(url: str) -> str:
+    """
+    Strip credentials from a stream URL for logging.
+    """
+    try:
+        parts = urlsplit(url)
+        if not parts.password and not parts.username:
+            return url
+
+        host = parts.hostname or ""
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        return urlunsplit((parts.scheme, f"***@{host}", parts.path, parts.query, ""))
+    except Exception:
+        return "<invalid url>"
+
+
+class RtspCamera(FrameRingSource):
+    """
+    Camera source for an RTSP (or any FFmpeg-readable) live stream.
+    Must never crash the application.
+
+    A dedicated grab thread calls grab() back to back, so the decoder
+    always sits on the newest frame and no latency builds up in FFmpeg's
+    buffers. Frames are only retrieved (decoded + converted) at the rate
+    registered consumers need (set_consumer_fps), directly into the
+    shared-memory frame ring.
+
+    Connection failures and stalls trigger a reconnect with exponential
+    backoff. get_stats() reports per-stream decode statistics.
+
+    Grabbing is not paced: a local file would be read at decode speed and
+    reopened at every end of file. Use the video_file source for files.
+
+    Dual-stream cameras: 'url' is the low-resolution sub-stream used for
+    analysis. When 'main_url' is set, the high-resolution main stream is
+    only connected by get_high_res_snapshot() and disconnected again after
+    main_idle_timeout seconds without requests.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        transport: str = "tcp",
+        start_paused: bool = False,
+        ring_capacity: int = 8,
+        open_timeout: float = 10.0,
+        read_timeout: float = 5.0,
+        stall_timeout: float = 10.0,
+        reconnect_initial_delay: float = 1.0,
+        reconnect_max_delay: float = 30.0,
+        main_url: Optional[str] = None,
+        main_idle_timeout: float = 30.0,
+        decode_on_demand: bool = False,
+    ):
+        """
+        decode_on_demand: decode only the first frame and frames requested
+        with get_fresh_frame(), regardless of registered consumers.
+        """
+        super().__init__(ring_capacity=ring_capacity)
+
+        if transport not in ("tcp", "udp"):
+            raise ValueError(f"Unsupported RTSP transport: {transport}")
+
+        self.url = url
+        self.transport = transport
+        self._paused = start_paused
+
+        self._open_timeout = open_timeout
+        self._read_timeout = read_timeout
+        self._stall_timeout = stall_timeout
+        self._reconnect_initial_delay = reconnect_initial_delay
+        self._reconnect_max_delay = reconnect_max_delay
+
+        self._decode_on_demand = decode_on_demand
+        self._decode_requested = threading.Event()
+
+        self.main_url = main_url
+        self._main_idle_timeout = main_idle_timeout
+        self._main_stream: Optional["RtspCamera"] = None
+        self._main_last_used = 0.0
+        self._main_lock = threading.Lock()
+
+        self._cap = None
+        self._running = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Statistics (written by the grab thread only)
+        self._state = "stopped"
+        self._connects = 0
+        self._reconnects = 0
+        self._stalls = 0
+        self._decode_errors = 0
+        self._last_frame_time: Optional[float] = None
+        self._fps_ema = 0.0
+        self._decode_ms_ema = 0.0
+        self._frame_size = None
+
+    @property
+    def display_url(self) -> str:
+        return redact_url(self.url)
+
+    def start(self):
+        if self._running:
+            return
+
+        logger.log(
+            f"Starting RtspCamera ({self.display_url}, transport={self.transport})"
+        )
+
+        self._running = True
+        self._stop_event.clear()
+
+        # Connecting happens in the grab thread, so start() never blocks
+        self._thread = threading.Thread(
+            target=self._grab_loop,
+            name=f"RtspCamera-{self.display_url}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        if not self._running:
+            return
+
+        logger.log(f"Stopping RtspCamera ({self.display_url})")
+
+        self._running = False
+        self._stop_event.set()
+
+        if self._thread:
+            self._thread.join(timeout=max(2.0, self._read_timeout + 1.0))
+            if self._thread.is_alive():
+                logger.warning(
+                    f"RtspCamera grab thread did not stop in time ({self.display_url})"
+                )
+            self._thread = None
+
+        self._close_main_stream()
+        self._close_ring()
+        self._state = "stopped"
+
+        logger.log(
+            f"RtspCamera stopped | grabbed={self._frames_grabbed} "
+            f"decoded={self._frames_decoded} reconnects={self._reconnects}"
+        )
+
+    def play(self):
+        with self._lock:
+            self._paused = False
+
+    def pause(self):
+        with self._lock:
+            self._paused = True
+
+    # -------- on-demand frames --------
+
+    def get_fresh_frame(self, timeout: float = 5.0):
+        """
+        Decode the next frame that arrives and return an owned copy.
+        Falls back to the latest frame on timeout; None if there is none.
+        """
+        frame, _ = self.get_timed_fresh_frame(timeout)
+        return frame
+
+    def get_timed_fresh_frame(self, timeout: float = 5.0):
+        """
+        get_fresh_frame() as (frame, capture timestamp).
+        """
+        with self._lock:
+            seq_before = self._ring.latest_seq if self._ring else 0
+
+        self._decode_requested.set()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self._running:
+            with self._lock:
+                seq = self._ring.latest_seq if self._ring else 0
+            if seq > seq_before:
+                break
+            time.sleep(0.01)
+
+        return self.get_timed_snapshot()
+
+    def get_high_res_snapshot(self, timeout: float = 5.0):
+        """
+        Owned copy of a current main-stream frame for evidence (VLM, zoom).
+        Connects the main stream on first use. Without 'main_url', or if
+        the main stream is unavailable, returns the latest analysis frame.
+        Blocks up to 'timeout' seconds; must not be called on the event loop.
+        """
+        frame, _ = self.get_timed_high_res_snapshot(timeout)
+        return frame
+
+    def get_timed_high_res_snapshot(self, timeout: float = 5.0):
+        """
+        get_high_res_snapshot() with the capture time of the returned
+        frame (Unix seconds), as (frame, timestamp). The frame is decoded
+        when requested, so it can be newer than the snapshot it is
+        evidence for.
+        """
+        if not self.main_url or not self._running:
+            return self.get_timed_snapshot()
+
+        try:
+            with self._main_lock:
+                self._main_last_used = time.monotonic()
+
+                if self._main_stream is None:
+                    logger.log(
+                        f"RtspCamera connecting main stream "
+                        f"({redact_url(self.main_url)})"
+                    )
+                    self._main_stream = RtspCamera(
+                        url=self.main_url,
+                        transport=self.transport,
+                        ring_capacity=2,
+                        open_timeout=self._open_timeout,
+                        read_timeout=self._read_timeout,
+                        stall_timeout=self._stall_timeout,
+                        reconnect_initial_delay=self._reconnect_initial_delay,
+                        reconnect_max_delay=self._reconnect_max_delay,
+                        decode_on_demand=True,
+                    )
+                    self._main_stream.start()
+                    self._schedule_main_idle_check()
+
+                main_stream = self._main_stream
+
+            frame, timestamp = main_stream.get_timed_fresh_frame(timeout=timeout)
+            if frame is not None:
+                return frame, timestamp
+
+            logger.warning(
+                f"RtspCamera main stream returned no frame, using sub-stream "
+                f"({self.display_url})"
+            )
+
+        except Exception as e:
+            logger.error(
+                f"RtspCamera high-res snapshot failed ({self.display_url})",
+                exc_info=e,
+            )
+
+        return self.get_timed_snapshot()
+
+    def _schedule_main_idle_check(self) -> None:
+        timer = threading.Timer(self._main_idle_timeout, self._check_main_idle)
+        timer.daemon = True
+        timer.start()
+
+    def _check_main_idle(self) -> None:
+        """
+        Disconnect the main stream once it has been idle long enough.
+        Never raises.
+        """
+        try:
+            with self._main_lock:
+                if self._main_stream is None:
+                    return
+
+                idle = time.monotonic() - self._main_last_used
+                if idle < self._main_idle_timeout:
+                    self._schedule_main_idle_check()
+                    return
+
+            logger.log(
+                f"RtspCamera main stream idle for {idle:.0f}s, disconnecting "
+                f"({redact_url(self.main_url)})"
+            )
+            self._close_main_stream()
+
+        except Exception as e:
+            logger.error("RtspCamera main stream idle check failed", exc_info=e)
+
+    def _close_main_stream(self) -> None:
+        with self._main_lock:
+            main_stream = self._main_stream
+            self._main_stream = None
+
+        if main_stream:
+            main_stream.stop()
+
+    def get_stats(self) -> Dict:
+        """
+        Snapshot of stream health and decode statistics.
+        """
+        now = time.monotonic()
+        last_frame_age = (
+            now - self._last_frame_time if self._last_frame_time is not None else None
+        )
+
+        with self._main_lock:
+            main_stream = self._main_stream
+
+        return {
+            "url": self.display_url,
+            "transport": self.transport,
+            "state": self._state,
+            "frame_size": self._frame_size,
+            "fps": round(self._fps_ema, 2),
+            "decode_ms": round(self._decode_ms_ema, 2),
+            "frames_grabbed": self._frames_grabbed,
+            "frames_decoded": self._frames_decoded,
+            "decode_errors": self._decode_errors,
+            "connects": self._connects,
+            "reconnects": self._reconnects,
+            "stalls": self._stalls,
+            "last_frame_age": (
+                round(last_frame_age, 3) if last_frame_age is not None else None
+            ),
+            "stalled": (
+                last_frame_age is not None and last_frame_age > self._stall_timeout
+            ),
+            "main_stream": main_stream.get_stats() if main_stream else None,
+        }
+
+    # -------- grab thread --------
+
+    def _grab_loop(self):
+        """
+        Connect / stream / reconnect loop.
+        Runs in a background thread and must never raise.
+        """
+        attempt = 0
+
+        try:
+            while self._running:
+                self._state = "connecting" if attempt == 0 else "reconnecting"
+
+                cap = self._open_capture()
+
+                if cap is None:
+                    delay = self._backoff_delay(attempt)
+                    attempt += 1
+                    logger.warning(
+                        f"RtspCamera connect failed ({self.display_url}), "
+                        f"retry {attempt} in {delay:.1f}s"
+                    )
+                    self._stop_event.wait(delay)
+                    continue
+
+                self._cap = cap
+                self._connects += 1
+
+                try:
+                    got_frames = self._stream(cap)
+                finally:
+                    self._cap = None
+                    try:
+                        cap.release()
+                    except Exception as e:
+                        # Non-fatal: release failures should not propagate
+                        logger.error("Error while releasing VideoCapture", exc_info=e)
+
+                if not self._running:
+                    break
+
+                self._reconnects += 1
+
+                # Only back off when the stream dies without delivering
+                attempt = 0 if got_frames else attempt + 1
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    f"RtspCamera stream lost ({self.display_url}), "
+                    f"reconnecting in {delay:.1f}s"
+                )
+                self._stop_event.wait(delay)
+
+        except Exception as e:
+            # Absolute safety net: thread must never die silently
+            logger.error("Fatal error in RtspCamera grab loop", exc_info=e)
+        finally:
+            self._state = "stopped"
+            logger.log(f"RtspCamera grab loop stopped ({self.display_url})")
+
+    def _stream(self, cap) -> bool:
+        """
+        Drain the stream until it fails, stalls or the camera stops.
+        Returns True if at least one frame was grabbed.
+        """
+        self._state = "streaming"
+        logger.log(f"RtspCamera connected ({self.display_url})")
+
+        got_frames = False
+        grab_failures = 0
+        last_good = time.monotonic()
+        last_grab = None
+        next_decode_at = 0.0
+
+        while self._running:
+            if not cap.grab():
+                grab_failures += 1
+                if grab_failures >= _MAX_GRAB_FAILURES:
+                    return got_frames
+                continue
+
+            now = time.monotonic()
+            grab_failures = 0
+            got_frames = True
+            self._count_grab()
+            self._last_frame_time = now
+
+            if last_grab is not None and now > last_grab:
+                self._fps_ema = self._ema(self._fps_ema, 1.0 / (now - last_grab))
+            last_grab = now
+
+            with self._lock:
+                paused = self._paused
+
+            if paused:
+                last_good = now
+                continue
+
+            # Decode only what consumers need; the first and requested
+            # frames always
+            if self._ring is not None and not self._decode_requested.is_set():
+                if self._decode_on_demand:
+                    last_good = now
+                    continue
+
+                required = self._required_consumer_fps()
+                if required > 0:
+                    if now < next_decode_at:
+                        last_good = now
+                        continue
+                    next_decode_at = now + 1.0 / (required * self.CONSUMER_RATE_HEADROOM)
+
+            self._decode_requested.clear()
+
+            started = time.perf_counter()
+            try:
+                decoded = self._retrieve_into_ring(cap)
+            except Exception as e:
+                logger.error(
+                    f"RtspCamera decode failed ({self.display_url})",
+                    exc_info=e,
+                )
+                decoded = False
+
+            if decoded:
+                last_good = now
+                self._decode_ms_ema = self._ema(
+                    self._decode_ms_ema,
+                    (time.perf_counter() - started) * 1000.0,
+                )
+                if self._frame_size is None and self._ring is not None:
+                    height, width = self._ring.frame_shape[:2]
+                    self._frame_size = (width, height)
+                continue
+
+            self._decode_errors += 1
+            if now - last_good > self._stall_timeout:
+                # Packets arrive but nothing decodes (corrupt stream)
+                self._stalls += 1
+                logger.warning(
+                    f"RtspCamera stalled, no decodable frame for "
+                    f"{self._stall_timeout}s ({self.display_url})"
+                )
+                return got_frames
+
+        return got_frames
+
+    def _open_capture(self):
+        """
+        Open the stream with the configured transport and timeouts.
+        Returns None on failure. Never raises.
+        """
+        options = (
+            f"rtsp_transport;{self.transport}"
+            f"|timeout;{int(self._read_timeout * 1_000_000)}"
+        )
+
+        params = []
+        open_timeout_prop = getattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC", None)
+        if open_timeout_prop is not None:
+            params += [open_timeout_prop, int(self._open_timeout * 1000)]
+        read_timeout_prop = getattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC", None)
+        if read_timeout_prop is not None:
+            params += [read_timeout_prop, int(self._read_timeout * 1000)]
+
+        try:
+            with _capture_options_lock:
+                previous = os.environ.get(_CAPTURE_OPTIONS_ENV)
+                os.environ[_CAPTURE_OPTIONS_ENV] = options
+                try:
+                    cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, params)
+                finally:
+                    if previous is None:
+                        os.environ.pop(_CAPTURE_OPTIONS_ENV, None)
+                    else:
+                        os.environ[_CAPTURE_OPTIONS_ENV] = previous
+
+            if not cap.isOpened():
+                cap.release()
+                return None
+
+            # Keep at most one frame queued in backends that honor it
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            return cap
+
+        except Exception as e:
+            logger.error(
+                f"Failed to open RTSP stream ({self.display_url})",
+                exc_info=e,
+            )
+            return None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = min(
+            self._reconnect_max_delay,
+            self._reconnect_initial_delay * (2 ** min(attempt, 16)),
+        )
+        # Jitter so cameras behind one NVR do not reconnect in lockstep
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def _ema(current: float, value: float, alpha: float = 0.1) -> float:
+        if current <= 0.0:
+            return value
+        return current + alpha * (value - current)
@@ -1,27 +1,59 @@
 import cv2
 import threading
 import time
+from typing import Optional
+
+from cameras.camera_sources.frame_ring_source import FrameRingSource
+from cameras.frame_ring_buffer import FrameRef
 from utils.logger import logger
 
 
-class VideoFileCamera:
+class VideoFileCamera(FrameRingSource):
     """
     Camera source that reads frames from a local video file.
     Designed for long-running, fault-tolerant operation.
     Must never crash the application.
+
+    Decoded frames are written into a shared-memory FrameRingBuffer, so
+    consumers can read the latest frame or a short history without copying,
+    including from other processes (see frame_ring_name).
+
+    Consumers register the frame rate they need (set_consumer_fps). The
+    read loop still advances the stream at native speed with grab(), but
+    only retrieves (decodes + converts) the frames someone will use.
+    Without registered consumers every frame is decoded.
+
+    Replay mode (replay=True) has no read thread and no real-time pacing:
+    the consumer pulls frames by video position with read_frame_at(), and
+    frame timestamps come from a virtual clock (replay_start + position).
     """
 
-    def __init__(self, video_path: str, loop: bool = True, start_paused: bool = True):
+    def __init__(
+        self,
+        video_path: str,
+        loop: bool = True,
+        start_paused: bool = True,
+        ring_capacity: int = 8,
+        decode_threads: int = 0,
+        replay: bool = False,
+        replay_start: Optional[float] = None,
+    ):
+        super().__init__(ring_capacity=ring_capacity)
+
         self.video_path = video_path
         self.loop = loop
+        self.replay = replay
+        self.replay_start = replay_start
         self._paused = start_paused
+        self._decode_threads = decode_threads
+        # Non-looping file reached its end (until the next start)
+        self._finished = False
+
+        self._replay_fps = 0.0
+        self._replay_next_index = 0
 
         self._cap = None
-        self._last_frame = None
-        self._frame_seq = 0
         self._running = False
-
-        self._lock = threading.Lock()
         self._thread = None
 
     def start(self):
@@ -31,7 +63,7 @@ class VideoFileCamera:
         logger.log(f"Starting VideoFileCamera ({self.video_path})")
 
         try:
-            self._cap = cv2.VideoCapture(self.video_path)
+            self._cap = self._open_capture()
             if not self._cap.isOpened():
                 raise RuntimeError(f"Failed to open video file: {self.video_path}")
         except Exception as e:
@@ -41,6 +73,12 @@ class VideoFileCamera:
             return
 
         self._running = True
+        self._finished = False
+
+        if self.replay:
+            self._start_replay()
+            return
+
         self._thread = threading.Thread(
             target=self._read_loop,
             name=f"VideoFileCamera-{self.video_path}",
@@ -68,7 +106,12 @@ class VideoFileCamera:
                 logger.error("Error while releasing VideoCapture", exc_info=e)
             self._cap = None
 
-        logger.log("VideoFileCamera stopped")
+        self._close_ring()
+
+        logger.log(
+            f"VideoFileCamera stopped | grabbed={self._frames_grabbed} "
+            f"decoded={self._frames_decoded}"
+        )
 
     def play(self):
         with self._lock:
@@ -78,13 +121,67 @@ class VideoFileCamera:
         with self._lock:
             self._paused = True
 
-    def get_snapshot(self):
+    def is_finished(self) -> bool:
+        """
+        True once a non-looping file reached its end: no new frames will
+        come, which is not a stall.
+        """
         with self._lock:
-            return self._last_frame
+            return self._finished
 
-    def get_snapshot_with_seq(self):
-        with self._lock:
-            return self._last_frame, self._frame_seq
+    # -------- replay mode --------
+
+    def _start_replay(self) -> None:
+        fps = 0.0
+        try:
+            fps = self._cap.get(cv2.CAP_PROP_FPS)
+        except Exception:
+            fps = 0.0
+
+        self._replay_fps = fps if fps and fps > 0 else 25.0
+        self._replay_next_index = 0
+
+        if self.replay_start is None:
+            self.replay_start = time.time()
+
+        logger.log(
+            f"VideoFileCamera replay ready (fps={self._replay_fps}, "
+            f"replay_start={self.replay_start})"
+        )
+
+    def read_frame_at(self, video_time: float) -> Optional[FrameRef]:
+        """
+        Replay mode: decode the frame at 'video_time' seconds from the
+        start of the file. Positions only move forward; frames in between
+        are grabbed without decoding. Returns None at end of stream.
+
+        The returned FrameRef.timestamp is replay_start + frame position.
+        """
+        if not self.replay or not self._running or self._cap is None:
+            return None
+
+        target_index = max(
+            self._replay_next_index,
+            int(round(video_time * self._replay_fps)),
+        )
+
+        try:
+            while self._replay_next_index < target_index:
+                if not self._cap.grab():
+                    return None
+                self._replay_next_index += 1
+                self._count_grab()
+
+            timestamp = self.replay_start + target_index / self._replay_fps
+            if not self._read_into_ring(timestamp=timestamp):
+                return None
+            self._replay_next_index += 1
+
+        except Exception as e:
+            logger.error("Error reading replay frame from video file", exc_info=e)
+            return None
+
+        return self.get_frame_ref()
 
     def _read_loop(self):
         """
@@ -102,9 +199,13 @@ class VideoFileCamera:
 
             logger.log(
                 f"VideoFileCamera read loop started "
-                f"(fps={fps if fps else 'unknown'})"
+                f"(fps={fps if fps else 'unknown'}, "
+                f"decode_threads={self._decode_threads or 'default'})"
             )
 
+            # Fraction of a frame owed to consumers; retrieve when >= 1
+            decode_credit = 1.0
+
             while self._running:
                 with self._lock:
                     paused = self._paused
@@ -113,15 +214,18 @@ class VideoFileCamera:
                     time.sleep(0.05)
                     continue
 
+                decode_credit += self._decode_ratio(fps)
+                retrieve = decode_credit >= 1.0
+
                 try:
-                    ret, frame = self._cap.read()
+                    ret = self._read_into_ring(retrieve)
                 except Exception as e:
                     # VideoCapture read failure: wait and retry
                     logger.error("Error reading frame from video file", exc_info=e)
                     time.sleep(delay)
                     continue
 
-                if not ret or frame is None:
+                if not ret:
                     if self.loop:
                         try:
                             self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
@@ -136,12 +240,12 @@ class VideoFileCamera:
                         # End of video reached, pause silently
                         with self._lock:
                             self._paused = True
+                            self._finished = True
                         time.sleep(delay)
                         continue
 
-                with self._lock:
-                    self._last_frame = frame
-                    self._frame_seq += 1
+                if retrieve:
+                    decode_credit = min(decode_credit - 1.0, 1.0)
 
                 time.sleep(delay)
 
@@ -153,3 +257,50 @@ class VideoFileCamera:
             )
         finally:
             logger.log("VideoFileCamera read loop stopped")
+
+    def _open_capture(self):
+        """
+        Open the video file, with a fixed FFmpeg decoder thread count
+        when decode_threads is set and supported by this OpenCV build.
+        """
+        n_threads_prop = getattr(cv2, "CAP_PROP_N_THREADS", None)
+
+        if self._decode_threads > 0 and n_threads_prop is not None:
+            return cv2.VideoCapture(
+                self.video_path,
+                cv2.CAP_FFMPEG,
+                [n_threads_prop, self._decode_threads],
+            )
+
+        return cv2.VideoCapture(self.video_path)
+
+    def _decode_ratio(self, fps: float) -> float:
+        """
+        Fraction of source frames that must be decoded for consumers.
+        """
+        required = self._required_consumer_fps()
+
+        if required <= 0 or not fps or fps <= 0:
+            return 1.0
+
+        return min(1.0, required * self.CONSUMER_RATE_HEADROOM / fps)
+
+    def _read_into_ring(
+        self,
+        retrieve: bool = True,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """
+        Advance the stream by one frame. When 'retrieve' is set, decode it
+        directly into the next ring slot; otherwise only grab() it.
+        Returns False at end of stream.
+        """
+        if not self._cap.grab():
+            return False
+        self._count_grab()
+
+        # The first frame is always decoded to allocate the ring
+        if not retrieve and self._ring is not None:
+            return True
+
+        return self._retrieve_into_ring(self._cap, timestamp)
@@ -37,6 +37,10 @@ class VideoPlayerUI(QWidget):
         self.timer.timeout.connect(self._on_timer)
         self.timer.start(30)
 
+        # Preview needs (close to) every frame while the window is open
+        if hasattr(self.camera, "set_consumer_fps"):
+            self.camera.set_consumer_fps("VideoPlayerUI", 1000.0 / 30)
+
         logger.log("VideoPlayerUI started")
 
     def closeEvent(self, event):
@@ -47,6 +51,8 @@ class VideoPlayerUI(QWidget):
             self._running = False
             if self.timer:
                 self.timer.stop()
+            if hasattr(self.camera, "remove_consumer"):
+                self.camera.remove_consumer("VideoPlayerUI")
         except Exception:
             pass
 
@@ -100,7 +106,12 @@ class VideoPlayerUI(QWidget):
             return
 
         try:
-            frame = self.camera.get_snapshot()
+            if hasattr(self.camera, "get_frame_ref"):
+                # Zero-copy: color conversion below makes its own copy
+                ref = self.camera.get_frame_ref()
+                frame = ref.frame if ref else None
+            else:
+                frame = self.camera.get_snapshot()
             if frame is None:
                 return
 
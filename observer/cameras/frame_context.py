@@ -0,0 +1,106 @@
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.logger import logger
+
+
+# Analysis JPEG: CLIP input and VLM image of the pipelines
+DEFAULT_MAX_WIDTH = 384
+DEFAULT_JPEG_QUALITY = 60
+
+_NOT_COMPUTED = object()
+
+
+class FrameContext:
+    """
+    Derived artifacts of one frame, computed on first use and memoized:
+    resized frame, JPEG bytes, CLIP embedding.
+
+    Attached to every SnapshotEvent (event.context), so the router
+    pre-stage and all pipelines of a camera share one resize, one JPEG
+    encode and one CLIP inference per frame and parameter set.
+
+    Not thread-safe: a snapshot is processed by its camera thread only.
+    """
+
+    def __init__(self, frame, camera_id: Optional[str] = None):
+        self.frame = frame
+        self.camera_id = camera_id
+
+        self._resized: Dict[int, np.ndarray] = {}
+        self._jpegs: Dict[Tuple[int, int], Optional[bytes]] = {}
+        self._embedding = _NOT_COMPUTED
+
+    def resized(self, max_width: int = DEFAULT_MAX_WIDTH) -> np.ndarray:
+        """
+        Frame downscaled to max_width (aspect ratio kept). Smaller frames
+        are returned as they are.
+        """
+        resized = self._resized.get(max_width)
+        if resized is None:
+            height, width = self.frame.shape[:2]
+            resized = self.frame
+            if width > max_width:
+                scale = max_width / float(width)
+                new_size = (max_width, int(height * scale))
+                resized = cv2.resize(self.frame, new_size, interpolation=cv2.INTER_AREA)
+            self._resized[max_width] = resized
+        return resized
+
+    def jpeg(
+        self,
+        max_width: int = DEFAULT_MAX_WIDTH,
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+    ) -> Optional[bytes]:
+        """
+        Resized frame as JPEG bytes, None if encoding failed. Never raises.
+        """
+        key = (max_width, jpeg_quality)
+        if key in self._jpegs:
+            return self._jpegs[key]
+
+        image_bytes = None
+        try:
+            success, buffer = cv2.imencode(
+                ".jpg",
+                self.resized(max_width),
+                [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality],
+            )
+            if success:
+                image_bytes = buffer.tobytes()
+        except Exception as e:
+            logger.error(f"JPEG encoding failed | camera={self.camera_id}", exc_info=e)
+
+        self._jpegs[key] = image_bytes
+        return image_bytes
+
+    def embedding(self, embedding_pool=None) -> Optional[List[float]]:
+        """
+        CLIP image embedding: from the worker pool, or in process from
+        the default JPEG (the same preprocessing the workers apply).
+        None on failure, which is memoized too: the frame is not
+        embedded again by the next pipeline. Callers check model
+        readiness first. Never raises.
+        """
+        if self._embedding is not _NOT_COMPUTED:
+            return self._embedding
+
+        embedding = None
+        try:
+            if embedding_pool is not None:
+                embedding = embedding_pool.embed_frame(self.frame)
+            else:
+                image_buffer = self.jpeg()
+                if image_buffer:
+                    # Imported here: the camera side and worker processes
+                    # use FrameContext without the CLIP module
+                    from embeddings.clip_embeddings import embed_image_sync
+
+                    embedding = embed_image_sync(image_buffer)
+        except Exception as e:
+            logger.error(f"CLIP embedding failed | camera={self.camera_id}", exc_info=e)
+
+        self._embedding = embedding or None
+        return self._embedding
@@ -0,0 +1,276 @@
+import struct
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import logger
+
+
+_MAGIC = b"SBFRING1"
+
+# magic, capacity, height, width, channels
+_HEADER_FORMAT = "<8sIIII"
+_HEADER_SIZE = 64
+
+_WRITE_SEQ_OFFSET = struct.calcsize(_HEADER_FORMAT)
+
+
+@dataclass(frozen=True)
+class FrameRef:
+    """
+    Zero-copy reference to a frame inside a FrameRingBuffer.
+
+    'frame' is a view into shared memory. It stays valid until the writer
+    wraps around the ring (capacity - 1 newer frames). Use
+    FrameRingBuffer.is_valid(seq) after reading, or copy_frame() when the
+    frame must outlive the ring slot.
+    """
+    frame: np.ndarray
+    seq: int
+    timestamp: float
+
+
+class FrameRingBuffer:
+    """
+    Fixed-capacity ring of preallocated frames in shared memory.
+
+    Single writer (the camera decode thread), any number of readers in the
+    same or other processes. Each slot carries a sequence number and a
+    timestamp; a slot's sequence is cleared while it is being rewritten, so
+    readers can detect torn or overwritten frames without locks.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        capacity: int,
+        frame_shape: Tuple[int, int, int],
+        owner: bool,
+    ):
+        self._shm = shm
+        self._owner = owner
+        self.capacity = capacity
+        self.frame_shape = frame_shape
+
+        meta_offset = _HEADER_SIZE
+        self._write_seq = np.ndarray(
+            (1,), dtype=np.int64, buffer=shm.buf, offset=_WRITE_SEQ_OFFSET,
+        )
+        self._slot_seq = np.ndarray(
+            (capacity,), dtype=np.int64, buffer=shm.buf, offset=meta_offset,
+        )
+        self._slot_ts = np.ndarray(
+            (capacity,), dtype=np.float64, buffer=shm.buf,
+            offset=meta_offset + capacity * 8,
+        )
+        self._frames = np.ndarray(
+            (capacity, *frame_shape), dtype=np.uint8, buffer=shm.buf,
+            offset=self._frames_offset(capacity),
+        )
+
+        self._pending_seq: Optional[int] = None
+
+    # -------- construction --------
+
+    @staticmethod
+    def _frames_offset(capacity: int) -> int:
+        return _HEADER_SIZE + capacity * 16
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        frame_shape: Tuple[int, ...],
+    ) -> "FrameRingBuffer":
+        """
+        Allocate a new ring. The creating process owns (and unlinks) it.
+        """
+        if capacity < 2:
+            raise ValueError("FrameRingBuffer capacity must be at least 2")
+
+        if len(frame_shape) == 2:
+            frame_shape = (frame_shape[0], frame_shape[1], 1)
+        height, width, channels = frame_shape
+
+        size = cls._frames_offset(capacity) + capacity * height * width * channels
+        shm = shared_memory.SharedMemory(create=True, size=size)
+
+        struct.pack_into(
+            _HEADER_FORMAT, shm.buf, 0,
+            _MAGIC, capacity, height, width, channels,
+        )
+
+        ring = cls(shm, capacity, (height, width, channels), owner=True)
+        ring._write_seq[0] = 0
+        ring._slot_seq[:] = 0
+        ring._slot_ts[:] = 0.0
+
+        logger.log(
+            f"FrameRingBuffer created | name={shm.name} capacity={capacity} "
+            f"shape={height}x{width}x{channels} bytes={size}"
+        )
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRingBuffer":
+        """
+        Attach to an existing ring by shared memory name (read side).
+        """
+        # Readers are expected to be children of the owning process, so
+        # they share its resource tracker and never unlink the segment.
+        shm = shared_memory.SharedMemory(name=name, create=False)
+
+        magic, capacity, height, width, channels = struct.unpack_from(
+            _HEADER_FORMAT, shm.buf, 0,
+        )
+        if magic != _MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a FrameRingBuffer")
+
+        return cls(shm, capacity, (height, width, channels), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # -------- writer side --------
+
+    def begin_write(self) -> np.ndarray:
+        """
+        Reserve the next slot and return it as a writable view.
+        Decoders can write into it directly (e.g. VideoCapture.retrieve).
+        """
+        seq = int(self._write_seq[0]) + 1
+        slot = seq % self.capacity
+
+        # Invalidate the slot before it is overwritten
+        self._slot_seq[slot] = 0
+        self._pending_seq = seq
+
+        return self._frames[slot]
+
+    def commit_write(self, timestamp: float) -> int:
+        """
+        Publish the slot reserved by begin_write(). Returns its sequence.
+        """
+        seq = self._pending_seq
+        if seq is None:
+            raise RuntimeError("commit_write() called without begin_write()")
+
+        slot = seq % self.capacity
+        self._slot_ts[slot] = timestamp
+        self._slot_seq[slot] = seq
+        self._write_seq[0] = seq
+        self._pending_seq = None
+        return seq
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        """
+        Copy a frame into the next slot and publish it.
+        """
+        target = self.begin_write()
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+        np.copyto(target, frame)
+        return self.commit_write(timestamp)
+
+    def accepts(self, frame: np.ndarray) -> bool:
+        shape = frame.shape if frame.ndim == 3 else (*frame.shape, 1)
+        return shape == self.frame_shape and frame.dtype == np.uint8
+
+    # -------- reader side --------
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self._write_seq[0])
+
+    def is_valid(self, seq: int) -> bool:
+        """
+        True while the slot for 'seq' still holds that frame.
+        """
+        if seq <= 0:
+            return False
+        return int(self._slot_seq[seq % self.capacity]) == seq
+
+    def get(self, seq: int) -> Optional[FrameRef]:
+        if not self.is_valid(seq):
+            return None
+
+        slot = seq % self.capacity
+        ref = FrameRef(
+            frame=self._view(slot),
+            seq=seq,
+            timestamp=float(self._slot_ts[slot]),
+        )
+
+        # Re-check: the writer may have started overwriting meanwhile
+        if not self.is_valid(seq):
+            return None
+        return ref
+
+    def latest(self) -> Optional[FrameRef]:
+        return self.get(self.latest_seq)
+
+    def history(self, count: int) -> List[FrameRef]:
+        """
+        Up to 'count' most recent frames, oldest first (e.g. clip pre-roll).
+        Only frames not yet overwritten are returned.
+        """
+        newest = self.latest_seq
+        count = min(count, self.capacity - 1, newest)
+
+        refs = []
+        for seq in range(newest - count + 1, newest + 1):
+            ref = self.get(seq)
+            if ref is not None:
+                refs.append(ref)
+        return refs
+
+    def copy_frame(self, ref: FrameRef) -> Optional[np.ndarray]:
+        """
+        Copy a referenced frame out of shared memory.
+        Returns None if it was overwritten during the copy.
+        """
+        frame = ref.frame.copy()
+        if not self.is_valid(ref.seq):
+            return None
+        return frame
+
+    def _view(self, slot: int) -> np.ndarray:
+        frame = self._frames[slot]
+        if self.frame_shape[2] == 1:
+            return frame[:, :, 0]
+        return frame
+
+    # -------- lifecycle --------
+
+    def close(self) -> None:
+        """
+        Release this process's mapping; the owner also unlinks the segment.
+        Never raises.
+        """
+        name = self._shm.name
+
+        # Drop our own views so the mapping can be released
+        self._write_seq = None
+        self._slot_seq = None
+        self._slot_ts = None
+        self._frames = None
+
+        try:
+            self._shm.close()
+        except BufferError:
+            # A consumer still holds a view; the mapping is released on GC
+            pass
+        except Exception as e:
+            logger.error(f"Failed to close FrameRingBuffer '{name}'", exc_info=e)
+
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Failed to unlink FrameRingBuffer '{name}'", exc_info=e)
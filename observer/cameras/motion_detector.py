@@ -0,0 +1,117 @@
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from utils.logger import logger
+
+
+class MotionDetector:
+    """
+    Cheap per-camera change detector for snapshot gating.
+
+    Works on a small grayscale thumbnail against a running-average
+    background, so it costs a fraction of a millisecond per check and runs
+    in the camera thread before any JPEG encoding or CLIP inference.
+
+    score() returns the fraction of (ROI) pixels that changed, 0.0 - 1.0.
+    """
+
+    def __init__(
+        self,
+        analysis_width: int = 160,
+        pixel_threshold: int = 25,
+        background_alpha: float = 0.05,
+        roi: Optional[Sequence[Sequence[Sequence[float]]]] = None,
+    ):
+        """
+        roi: optional list of polygons in normalized [x, y] coordinates
+        (0.0 - 1.0). Only pixels inside the polygons are scored.
+        """
+        self._analysis_width = analysis_width
+        self._pixel_threshold = pixel_threshold
+        self._background_alpha = background_alpha
+        self._roi = roi
+
+        self._background: Optional[np.ndarray] = None
+        self._roi_mask: Optional[np.ndarray] = None
+        self._roi_pixels = 0
+
+    def reset(self) -> None:
+        self._background = None
+
+    def score(self, frame) -> float:
+        gray = self._to_thumbnail(frame)
+
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray.astype(np.float32)
+            self._roi_mask = self._build_roi_mask(gray.shape)
+            # No reference yet: treat the first frame as a change
+            return 1.0
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+        _, changed = cv2.threshold(
+            diff,
+            self._pixel_threshold,
+            255,
+            cv2.THRESH_BINARY,
+        )
+
+        if self._roi_mask is not None:
+            changed = cv2.bitwise_and(changed, self._roi_mask)
+            total = self._roi_pixels
+        else:
+            total = changed.size
+
+        cv2.accumulateWeighted(gray, self._background, self._background_alpha)
+
+        if total <= 0:
+            return 0.0
+        return cv2.countNonZero(changed) / float(total)
+
+    def _to_thumbnail(self, frame) -> np.ndarray:
+        height, width = frame.shape[:2]
+
+        if width > self._analysis_width:
+            scale = self._analysis_width / float(width)
+            frame = cv2.resize(
+                frame,
+                (self._analysis_width, max(1, int(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        # Suppress sensor noise and compression artifacts
+        return cv2.GaussianBlur(frame, (5, 5), 0)
+
+    def _build_roi_mask(self, shape) -> Optional[np.ndarray]:
+        if not self._roi:
+            return None
+
+        height, width = shape[:2]
+        mask = np.zeros((height, width), dtype=np.uint8)
+
+        try:
+            polygons: List[np.ndarray] = []
+            for polygon in self._roi:
+                points = np.array(
+                    [[x * (width - 1), y * (height - 1)] for x, y in polygon],
+                    dtype=np.int32,
+                )
+                if len(points) >= 3:
+                    polygons.append(points)
+
+            if not polygons:
+                return None
+
+            cv2.fillPoly(mask, polygons, 255)
+
+        except Exception as e:
+            # Invalid ROI: fall back to the full frame
+            logger.error("Invalid motion ROI, using full frame", exc_info=e)
+            return None
+
+        self._roi_pixels = cv2.countNonZero(mask)
+        return mask
@@ -0,0 +1,775 @@
+"""
+ONVIF camera discovery and provisioning.
+
+- WS-Discovery probe for NetworkVideoTransmitter devices on the subnet.
+- Minimal ONVIF SOAP client (WS-Security digest auth) for capabilities,
+  media profiles and stream URIs.
+- Automatic sub/main stream selection and cameras_config.json generation.
+
+CLI:
+    ONVIF_PASSWORD=secret python -m cameras.onvif_discovery --username admin \\
+        --output config/cameras_config.generated.json
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+from xml.etree import ElementTree
+
+import requests
+
+from utils.logger import logger
+
+
+WS_DISCOVERY_ADDRESS = ("239.255.255.250", 3702)
+
+_SOAP_ENV_NS = "http://www.w3.org/2003/05/soap-envelope"
+_WSSE_NS = "http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd"
+_WSU_NS = "http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd"
+_PASSWORD_DIGEST = (
+    "http://docs.oasis-open.org/wss/2004/01/"
+    "oasis-200401-wss-username-token-profile-1.0#PasswordDigest"
+)
+_BASE64_BINARY = (
+    "http://docs.oasis-open.org/wss/2004/01/"
+    "oasis-200401-wss-soap-message-security-1.0#Base64Binary"
+)
+_DEVICE_NS = "http://www.onvif.org/ver10/device/wsdl"
+_MEDIA_NS = "http://www.onvif.org/ver10/media/wsdl"
+_SCHEMA_NS = "http://www.onvif.org/ver10/schema"
+
+_PROBE_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope" '
+    'xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing" '
+    'xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery" '
+    'xmlns:dn="http://www.onvif.org/ver10/network/wsdl">'
+    "<e:Header>"
+    "<w:MessageID>uuid:{message_id}</w:MessageID>"
+    '<w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>'
+    '<w:Action e:mustUnderstand="true">'
+    "http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>"
+    "</e:Header>"
+    "<e:Body><d:Probe><d:Types>dn:NetworkVideoTransmitter</d:Types></d:Probe></e:Body>"
+    "</e:Envelope>"
+)
+
+# Environment variable generated configs read the camera password from
+DEFAULT_PASSWORD_ENV = "ONVIF_PASSWORD"
+
+# Lower is better for analysis decoding cost / compatibility
+_CODEC_RANK = {"H264": 0, "H265": 1, "HEVC": 1, "JPEG": 2, "MJPEG": 2}
+
+
+class OnvifError(Exception):
+    pass
+
+
+@dataclass
+class DiscoveredDevice:
+    endpoint: str
+    xaddrs: List[str]
+    scopes: List[str] = field(default_factory=list)
+
+    @property
+    def host(self) -> str:
+        for xaddr in self.xaddrs:
+            host = urlsplit(xaddr).hostname
+            if host:
+                return host
+        return ""
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._scope_value("name")
+
+    @property
+    def hardware(self) -> Optional[str]:
+        return self._scope_value("hardware")
+
+    def _scope_value(self, key: str) -> Optional[str]:
+        prefix = f"onvif://www.onvif.org/{key}/"
+        for scope in self.scopes:
+            if scope.startswith(prefix):
+                return unquote(scope[len(prefix):])
+        return None
+
+
+@dataclass
+class MediaProfile:
+    token: str
+    name: str = ""
+    encoding: str = ""
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    stream_uri: Optional[str] = None
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+@dataclass
+class DeviceStreams:
+    device: DiscoveredDevice
+    profiles: List[MediaProfile] = field(default_factory=list)
+    sub: Optional[MediaProfile] = None
+    main: Optional[MediaProfile] = None
+    error: Optional[str] = None
+
+
+# -------- XML helpers --------
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find(element, name: str):
+    """
+    First descendant with the given local name (namespace-agnostic,
+    vendors disagree on prefixes and schema versions).
+    """
+    for child in element.iter():
+        if child is not element and _local(child.tag) == name:
+            return child
+    return None
+
+
+def _find_all(element, name: str):
+    return [c for c in element.iter() if c is not element and _local(c.tag) == name]
+
+
+def _text(element, name: str, default: str = "") -> str:
+    found = _find(element, name)
+    if found is None or found.text is None:
+        return default
+    return found.text.strip()
+
+
+# -------- WS-Discovery --------
+
+def discover_devices(
+    timeout: float = 3.0,
+    interface_ip: Optional[str] = None,
+    target: Tuple[str, int] = WS_DISCOVERY_ADDRESS,
+) -> List[DiscoveredDevice]:
+    """
+    Multicast a WS-Discovery Probe and collect ProbeMatches until timeout.
+    'target' can point at a unicast stub responder for testing.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+    if interface_ip:
+        sock.setsockopt(
+            socket.IPPROTO_IP,
+            socket.IP_MULTICAST_IF,
+            socket.inet_aton(interface_ip),
+        )
+    sock.bind((interface_ip or "", 0))
+
+    devices: Dict[str, DiscoveredDevice] = {}
+
+    try:
+        probe = _PROBE_TEMPLATE.format(message_id=uuid.uuid4()).encode("utf-8")
+
+        # UDP is lossy; the spec recommends repeating the probe
+        for _ in range(2):
+            sock.sendto(probe, target)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+
+            try:
+                data, _ = sock.recvfrom(65535)
+            except socket.timeout:
+                break
+
+            for device in _parse_probe_matches(data):
+                known = devices.get(device.endpoint)
+                if known is None:
+                    devices[device.endpoint] = device
+                else:
+                    known.xaddrs = sorted(set(known.xaddrs) | set(device.xaddrs))
+
+    finally:
+        sock.close()
+
+    logger.log(f"ONVIF discovery found {len(devices)} devices")
+    return list(devices.values())
+
+
+def _parse_probe_matches(data: bytes) -> List[DiscoveredDevice]:
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        return []
+
+    devices = []
+    for match in _find_all(root, "ProbeMatch"):
+        xaddrs = _text(match, "XAddrs").split()
+        if not xaddrs:
+            continue
+
+        endpoint = _text(match, "Address") or xaddrs[0]
+        devices.append(
+            DiscoveredDevice(
+                endpoint=endpoint,
+                xaddrs=xaddrs,
+                scopes=_text(match, "Scopes").split(),
+            )
+        )
+    return devices
+
+
+# -------- ONVIF SOAP client --------
+
+class OnvifClient:
+    """
+    Minimal ONVIF device/media client over SOAP 1.2.
+    Only the calls needed for provisioning are implemented.
+    """
+
+    def __init__(
+        self,
+        xaddr: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 5.0,
+    ):
+        self.xaddr = xaddr
+        self._username = username
+        self._password = password or ""
+        self._timeout = timeout
+        self._session = requests.Session()
+
+        self._media_xaddr: Optional[str] = None
+        # Device clock minus local clock; digests use the device's time
+        self._clock_offset: Optional[float] = None
+
+    def get_system_time_offset(self) -> float:
+        """
+        Seconds between the device clock and ours (unauthenticated call).
+        """
+        if self._clock_offset is not None:
+            return self._clock_offset
+
+        self._clock_offset = 0.0
+        try:
+            root = self._call(
+                self.xaddr,
+                f'<tds:GetSystemDateAndTime xmlns:tds="{_DEVICE_NS}"/>',
+                authenticate=False,
+            )
+            utc = _find(root, "UTCDateTime")
+            if utc is not None:
+                device_time = datetime(
+                    int(_text(utc, "Year")),
+                    int(_text(utc, "Month")),
+                    int(_text(utc, "Day")),
+                    int(_text(utc, "Hour")),
+                    int(_text(utc, "Minute")),
+                    int(_text(utc, "Second")),
+                    tzinfo=timezone.utc,
+                )
+                self._clock_offset = device_time.timestamp() - time.time()
+        except Exception as e:
+            logger.warning(f"ONVIF GetSystemDateAndTime failed ({self.xaddr}): {e!r}")
+
+        return self._clock_offset
+
+    def get_media_xaddr(self) -> str:
+        if self._media_xaddr:
+            return self._media_xaddr
+
+        root = self._call(
+            self.xaddr,
+            f'<tds:GetCapabilities xmlns:tds="{_DEVICE_NS}">'
+            "<tds:Category>Media</tds:Category>"
+            "</tds:GetCapabilities>",
+        )
+        media = _find(root, "Media")
+        media_xaddr = _text(media, "XAddr") if media is not None else ""
+
+        # Some devices serve every service on the device endpoint
+        self._media_xaddr = media_xaddr or self.xaddr
+        return self._media_xaddr
+
+    def get_profiles(self) -> List[MediaProfile]:
+        root = self._call(
+            self.get_media_xaddr(),
+            f'<trt:GetProfiles xmlns:trt="{_MEDIA_NS}"/>',
+        )
+
+        profiles = []
+        for element in _find_all(root, "Profiles"):
+            token = element.get("token")
+            if not token:
+                continue
+
+            profile = MediaProfile(token=token, name=_text(element, "Name"))
+
+            encoder = _find(element, "VideoEncoderConfiguration")
+            if encoder is not None:
+                profile.encoding = _text(encoder, "Encoding").upper()
+                resolution = _find(encoder, "Resolution")
+                if resolution is not None:
+                    profile.width = int(_text(resolution, "Width", "0") or 0)
+                    profile.height = int(_text(resolution, "Height", "0") or 0)
+                profile.fps = float(_text(encoder, "FrameRateLimit", "0") or 0)
+
+            profiles.append(profile)
+
+        return profiles
+
+    def get_stream_uri(self, profile_token: str) -> str:
+        root = self._call(
+            self.get_media_xaddr(),
+            f'<trt:GetStreamUri xmlns:trt="{_MEDIA_NS}" xmlns:tt="{_SCHEMA_NS}">'
+            "<trt:StreamSetup>"
+            "<tt:Stream>RTP-Unicast</tt:Stream>"
+            "<tt:Transport><tt:Protocol>RTSP</tt:Protocol></tt:Transport>"
+            "</trt:StreamSetup>"
+            f"<trt:ProfileToken>{_xml_escape(profile_token)}</trt:ProfileToken>"
+            "</trt:GetStreamUri>",
+        )
+        uri = _text(root, "Uri")
+        if not uri:
+            raise OnvifError(f"No stream URI for profile '{profile_token}'")
+        return uri
+
+    def _call(self, url: str, body: str, authenticate: bool = True):
+        header = ""
+        if authenticate and self._username:
+            header = self._security_header()
+
+        envelope = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<s:Envelope xmlns:s="{_SOAP_ENV_NS}">'
+            f"<s:Header>{header}</s:Header>"
+            f"<s:Body>{body}</s:Body>"
+            "</s:Envelope>"
+        )
+
+        try:
+            response = self._session.post(
+                url,
+                data=envelope.encode("utf-8"),
+                headers={"Content-Type": "application/soap+xml; charset=utf-8"},
+                timeout=self._timeout,
+            )
+        except requests.RequestException as e:
+            raise OnvifError(f"ONVIF request to {url} failed: {e!r}") from e
+
+        try:
+            root = ElementTree.fromstring(response.content)
+        except ElementTree.ParseError as e:
+            raise OnvifError(
+                f"Invalid ONVIF response from {url} (HTTP {response.status_code})"
+            ) from e
+
+        fault = _find(root, "Fault")
+        if fault is not None:
+            reason = _text(fault, "Text") or _text(fault, "Value") or "SOAP fault"
+            raise OnvifError(f"ONVIF fault from {url}: {reason}")
+
+        return root
+
+    def _security_header(self) -> str:
+        """
+        WS-Security UsernameToken with PasswordDigest:
+        Base64(SHA1(nonce + created + password)).
+        """
+        offset = self.get_system_time_offset()
+        created = datetime.fromtimestamp(time.time() + offset, tz=timezone.utc)
+        created_text = created.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+        nonce = os.urandom(16)
+        digest = base64.b64encode(
+            hashlib.sha1(
+                nonce + created_text.encode("utf-8") + self._password.encode("utf-8")
+            ).digest()
+        ).decode("ascii")
+
+        return (
+            f'<wsse:Security s:mustUnderstand="1" '
+            f'xmlns:wsse="{_WSSE_NS}" xmlns:wsu="{_WSU_NS}">'
+            "<wsse:UsernameToken>"
+            f"<wsse:Username>{_xml_escape(self._username)}</wsse:Username>"
+            f'<wsse:Password Type="{_PASSWORD_DIGEST}">{digest}</wsse:Password>'
+            f'<wsse:Nonce EncodingType="{_BASE64_BINARY}">'
+            f"{base64.b64encode(nonce).decode('ascii')}</wsse:Nonce>"
+            f"<wsu:Created>{created_text}</wsu:Created>"
+            "</wsse:UsernameToken>"
+            "</wsse:Security>"
+        )
+
+
+def _xml_escape(value: str) -> str:
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
+def with_credentials(uri: str, username: Optional[str], password: Optional[str]) -> str:
+    """
+    Embed credentials into an RTSP URI (ONVIF returns URIs without them).
+    """
+    if not username:
+        return uri
+
+    parts = urlsplit(uri)
+    if parts.username:
+        return uri
+
+    # netloc as returned, so IPv6 hosts keep their brackets ([::1]:554)
+    host = parts.netloc.rpartition("@")[2]
+
+    userinfo = quote(username, safe="")
+    if password:
+        userinfo += ":" + quote(password, safe="")
+
+    return urlunsplit(
+        (parts.scheme, f"{userinfo}@{host}", parts.path, parts.query, parts.fragment)
+    )
+
+
+# -------- stream selection --------
+
+def select_streams(
+    profiles: List[MediaProfile],
+    analysis_max_width: int = 1280,
+) -> Tuple[Optional[MediaProfile], Optional[MediaProfile]]:
+    """
+    Pick (sub, main) profiles.
+
+    main: highest resolution (best codec on ties), used for evidence.
+    sub:  best analysis codec with width <= analysis_max_width, largest
+          such resolution. None of them fits: main is used for both and
+          the second slot is None.
+    """
+    usable = [p for p in profiles if p.width > 0 and p.height > 0]
+    if not usable:
+        return (profiles[0] if profiles else None), None
+
+    def codec_rank(profile: MediaProfile) -> int:
+        return _CODEC_RANK.get(profile.encoding, 3)
+
+    main = max(usable, key=lambda p: (p.pixels, -codec_rank(p)))
+
+    candidates = [
+        p for p in usable
+        if p is not main and p.width <= analysis_max_width
+    ]
+    if not candidates:
+        return main, None
+
+    sub = min(candidates, key=lambda p: (codec_rank(p), -p.pixels))
+    return sub, main
+
+
+def fetch_device_streams(
+    device: DiscoveredDevice,
+    username: Optional[str],
+    password: Optional[str],
+    analysis_max_width: int = 1280,
+    timeout: float = 5.0,
+) -> DeviceStreams:
+    """
+    Profiles, stream selection and stream URIs for one device.
+    Never raises; failures are reported in DeviceStreams.error.
+    """
+    result = DeviceStreams(device=device)
+
+    try:
+        client = OnvifClient(
+            device.xaddrs[0],
+            username=username,
+            password=password,
+            timeout=timeout,
+        )
+
+        result.profiles = client.get_profiles()
+        result.sub, result.main = select_streams(result.profiles, analysis_max_width)
+
+        # Only the selected profiles need a round trip for their URI
+        for profile in (result.sub, result.main):
+            if profile is not None:
+                profile.stream_uri = client.get_stream_uri(profile.token)
+
+        if result.sub is None:
+            result.error = "no_media_profiles"
+
+    except Exception as e:
+        result.error = repr(e)
+        logger.warning(f"ONVIF device {device.host} failed: {e!r}")
+
+    return result
+
+
+def fetch_all_streams(
+    devices: List[DiscoveredDevice],
+    username: Optional[str],
+    password: Optional[str],
+    analysis_max_width: int = 1280,
+    timeout: float = 5.0,
+    max_workers: int = 32,
+) -> List[DeviceStreams]:
+    """
+    Query all devices concurrently; one slow or dead camera only costs
+    its own timeout.
+    """
+    if not devices:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(devices)),
+        thread_name_prefix="onvif",
+    ) as executor:
+        return list(
+            executor.map(
+                lambda device: fetch_device_streams(
+                    device,
+                    username,
+                    password,
+                    analysis_max_width=analysis_max_width,
+                    timeout=timeout,
+                ),
+                devices,
+            )
+        )
+
+
+# -------- config generation --------
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]+", "_", value).strip("_").lower()
+
+
+def _unique_id(candidates: List[str], taken_ids: set) -> str:
+    """
+    First candidate not in taken_ids, else the last one with a numeric
+    suffix. The result is added to taken_ids.
+    """
+    camera_id = next((c for c in candidates if c not in taken_ids), None)
+    suffix = 2
+    while camera_id is None:
+        candidate = f"{candidates[-1]}_{suffix}"
+        if candidate not in taken_ids:
+            camera_id = candidate
+        suffix += 1
+
+    taken_ids.add(camera_id)
+    return camera_id
+
+
+def _camera_id_for(device: DiscoveredDevice, taken_ids: Optional[set] = None) -> str:
+    """
+    camera_id from the ONVIF name scope, which is usually the model name.
+    Identical models get their host appended (then a numeric suffix), so
+    ids are unique among taken_ids.
+    """
+    base = "onvif_" + _slug(device.name or device.host or device.endpoint)
+    if taken_ids is None:
+        return base
+
+    candidates = [base]
+    if device.name and device.host:
+        candidates.append(f"{base}_{_slug(device.host)}")
+    return _unique_id(candidates, taken_ids)
+
+
+def build_camera_config(
+    streams: DeviceStreams,
+    username: Optional[str],
+    password_env: Optional[str] = DEFAULT_PASSWORD_ENV,
+    interval_seconds: float = 2.0,
+    taken_ids: Optional[set] = None,
+) -> Optional[Dict]:
+    """
+    cameras_config.json entry for a provisioned device, or None.
+    Profiles are pinned by token; OnvifCamera resolves the URIs at
+    connect time, so address changes do not break the config.
+    The password is never written: the entry names the environment
+    variable it is read from (password_env).
+    taken_ids: camera ids already in use, updated with the new one.
+    """
+    if streams.error or streams.sub is None:
+        return None
+
+    device = streams.device
+    source = {
+        "xaddr": device.xaddrs[0],
+        "username": username,
+        "password_env": password_env,
+        "sub_profile": streams.sub.token,
+        "main_profile": streams.main.token if streams.main else None,
+        "transport": "tcp",
+    }
+
+    return {
+        "camera_id": _camera_id_for(device, taken_ids),
+        "name": device.name or device.host,
+        "type": "onvif",
+        "enabled": True,
+        "source": source,
+        "snapshot_policy": {
+            "mode": "interval",
+            "interval_seconds": interval_seconds,
+            "resize_percent": 100,
+        },
+        "provisioning": {
+            "endpoint": device.endpoint,
+            "hardware": device.hardware,
+            "sub": asdict(streams.sub),
+            "main": asdict(streams.main) if streams.main else None,
+        },
+    }
+
+
+def merge_camera_configs(existing: Dict, generated: List[Dict]) -> Dict:
+    """
+    Add generated cameras to an existing config without touching cameras
+    that are already configured (same ONVIF xaddr or endpoint). A new
+    device whose camera_id is taken gets a numeric suffix.
+    """
+    cameras = list(existing.get("cameras", []))
+    known_ids = {c.get("camera_id") for c in cameras}
+    known_xaddrs = {c.get("source", {}).get("xaddr") for c in cameras}
+    known_endpoints = {
+        (c.get("provisioning") or {}).get("endpoint") for c in cameras
+    } - {None}
+
+    for camera in generated:
+        xaddr = camera["source"]["xaddr"]
+        endpoint = (camera.get("provisioning") or {}).get("endpoint")
+        if xaddr in known_xaddrs or endpoint in known_endpoints:
+            logger.warning(
+                f"ONVIF camera '{camera['camera_id']}' skipped: device "
+                f"{xaddr} is already configured"
+            )
+            continue
+
+        if camera["camera_id"] in known_ids:
+            camera_id = _unique_id([camera["camera_id"]], known_ids)
+            logger.warning(
+                f"ONVIF camera id '{camera['camera_id']}' already used, "
+                f"renamed to '{camera_id}' | xaddr={xaddr}"
+            )
+            camera = dict(camera, camera_id=camera_id)
+        else:
+            known_ids.add(camera["camera_id"])
+
+        cameras.append(camera)
+        known_xaddrs.add(xaddr)
+        if endpoint:
+            known_endpoints.add(endpoint)
+
+    merged = dict(existing)
+    merged["cameras"] = cameras
+    return merged
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Discover ONVIF cameras and generate cameras_config.json entries",
+    )
+    parser.add_argument("--username", default=os.getenv("ONVIF_USERNAME"))
+    parser.add_argument("--password", default=os.getenv(DEFAULT_PASSWORD_ENV))
+    parser.add_argument("--password-env", default=DEFAULT_PASSWORD_ENV,
+                        help="Environment variable the generated config reads the password from")
+    parser.add_argument("--interface", help="Local IPv4 address to probe from")
+    parser.add_argument("--xaddr", action="append", default=[],
+                        help="Skip discovery for this device service URL (repeatable)")
+    parser.add_argument("--discovery-timeout", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--analysis-max-width", type=int, default=1280)
+    parser.add_argument("--interval-seconds", type=float, default=2.0)
+    parser.add_argument("--merge", help="Existing cameras_config.json to merge into")
+    parser.add_argument("--output", help="Output path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.xaddr:
+        devices = [
+            DiscoveredDevice(endpoint=xaddr, xaddrs=[xaddr]) for xaddr in args.xaddr
+        ]
+    else:
+        devices = discover_devices(
+            timeout=args.discovery_timeout,
+            interface_ip=args.interface,
+        )
+
+    started = time.monotonic()
+    results = fetch_all_streams(
+        devices,
+        args.username,
+        args.password,
+        analysis_max_width=args.analysis_max_width,
+        timeout=args.timeout,
+    )
+
+    existing = None
+    taken_ids = set()
+    if args.merge:
+        with open(args.merge, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+        taken_ids = {c.get("camera_id") for c in existing.get("cameras", [])}
+
+    generated = []
+    for streams in results:
+        camera = build_camera_config(
+            streams,
+            args.username,
+            args.password_env,
+            interval_seconds=args.interval_seconds,
+            taken_ids=taken_ids,
+        )
+        if camera is None:
+            print(
+                f"skipped {streams.device.host or streams.device.endpoint}: {streams.error}",
+                file=sys.stderr,
+            )
+            continue
+        generated.append(camera)
+
+    print(
+        f"provisioned {len(generated)}/{len(devices)} devices "
+        f"in {time.monotonic() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+    config = {"cameras": generated}
+    if existing is not None:
+        config = merge_camera_configs(existing, generated)
+
+    output = json.dumps(config, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import requests
 import logging
 from typing import Dict, Any, Optional
 from config import settings
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +27,19 @@ class CloudClient:
         headers: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
         url = f"{self._base_url}/{path.lstrip('/')}"
+        endpoint = path.strip("/")
         try:
-            resp = requests.post(
-                url,
-                json=payload,
-                headers=headers or {},
-                timeout=self._timeout,
-            )
+            with metrics.timer(
+                "observer_cloud_request_seconds",
+                "Cloud (VLM) request round trip",
+                endpoint=endpoint,
+            ):
+                resp = requests.post(
+                    url,
+                    json=payload,
+                    headers=headers or {},
+                    timeout=self._timeout,
+                )
 
             data = resp.json()
             usage = (
@@ -41,14 +48,31 @@ class CloudClient:
                 .get("openai_response", {})
                 .get("usage")
             )
-            #if usage:
-                #print(f"Usage: {usage}")
+            if isinstance(usage, dict):
+                for kind in ("prompt_tokens", "completion_tokens"):
+                    if isinstance(usage.get(kind), (int, float)):
+                        metrics.counter(
+                            "observer_cloud_tokens_total",
+                            "Tokens reported by the VLM provider",
+                            endpoint=endpoint,
+                            kind=kind,
+                        ).inc(usage[kind])
 
         except Exception as e:
+            metrics.counter(
+                "observer_cloud_errors_total",
+                "Failed cloud requests",
+                endpoint=endpoint,
+            ).inc()
             logger.error("Cloud request failed", exc_info=e)
             raise CloudClientError("cloud_request_failed") from e
 
         if resp.status_code >= 400:
+            metrics.counter(
+                "observer_cloud_errors_total",
+                "Failed cloud requests",
+                endpoint=endpoint,
+            ).inc()
             logger.error(
                 "Cloud error response",
                 extra={
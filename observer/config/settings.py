@@ -29,6 +29,13 @@ VLM_MODEL = os.getenv("VLM_MODEL")
 
 VLM_TIMEOUT_SEC = int(os.getenv("VLM_TIMEOUT_SEC", "30"))
 
+# Evidence images sent to the VLM when a camera has a high-res main stream
+VLM_EVIDENCE_MAX_WIDTH = int(os.getenv("VLM_EVIDENCE_MAX_WIDTH", "1280"))
+VLM_EVIDENCE_JPEG_QUALITY = int(os.getenv("VLM_EVIDENCE_JPEG_QUALITY", "85"))
+# The main-stream frame is fetched at VLM time: one captured more than this
+# many seconds from the snapshot is not used (the analysis frame is)
+VLM_EVIDENCE_MAX_SKEW_SECONDS = float(os.getenv("VLM_EVIDENCE_MAX_SKEW_SECONDS", "3"))
+
 
 # ===============================
 # Embeddings
@@ -41,6 +48,25 @@ CLIP_TEXT_MODEL = os.getenv("CLIP_TEXT_MODEL")
 TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL")
 
 
+# Text embeddings (BGE-M3): texts per forward pass, cached embeddings
+# (LRU by content hash, 0 = off) and how long a request waits for
+# concurrent ones to share its batch (0 = no micro-batching)
+TEXT_EMBED_BATCH_SIZE = int(os.getenv("TEXT_EMBED_BATCH_SIZE", "16"))
+TEXT_EMBED_CACHE_SIZE = int(os.getenv("TEXT_EMBED_CACHE_SIZE", "2048"))
+TEXT_EMBED_BATCH_WAIT_MS = float(os.getenv("TEXT_EMBED_BATCH_WAIT_MS", "10"))
+
+# Models are loaded in background threads at startup; warm-up runs one
+# inference so the first frame is not slow. Failed loads are retried.
+MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", "60"))
+
+# Embedding worker processes (0 = embed in the observer process)
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))
+
+# Cores pinned per worker (0 = split available cores evenly)
+EMBEDDING_WORKER_CORES = int(os.getenv("EMBEDDING_WORKER_CORES", "0"))
+
+
 # ===============================
 # Vector Store
 # ===============================
@@ -48,6 +74,71 @@ TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL")
 VECTOR_STORE_NAMESPACE = os.getenv("VECTOR_STORE_NAMESPACE")
 VECTOR_SIZE = int(os.getenv("VECTOR_SIZE", "512"))
 
+# "qdrant" (server) or "embedded" (in-process, no server)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "qdrant").lower()
+
+QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
+QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+
+# Embedded backend: data directory; exact search below this many points
+# per collection, HNSW (hnswlib) above
+EMBEDDED_STORE_PATH = os.getenv("EMBEDDED_STORE_PATH", "c:/smart-boss-files/vector_store")
+EMBEDDED_HNSW_THRESHOLD = int(os.getenv("EMBEDDED_HNSW_THRESHOLD", "20000"))
+
+# Collection profiles (vector_store/collection_profiles.py):
+# memory (float32 in RAM), scalar (int8 + on-disk originals), binary
+QDRANT_IMAGE_PROFILE = os.getenv("QDRANT_IMAGE_PROFILE", "scalar")
+QDRANT_TEXT_PROFILE = os.getenv("QDRANT_TEXT_PROFILE", "scalar")
+
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+QDRANT_HNSW_ON_DISK = os.getenv("QDRANT_HNSW_ON_DISK", "false").lower() == "true"
+
+# Search-time beam width (0 = Qdrant default)
+QDRANT_SEARCH_HNSW_EF = int(os.getenv("QDRANT_SEARCH_HNSW_EF", "0"))
+
+# Convert existing collections to the configured profile on startup
+QDRANT_MIGRATE_COLLECTIONS = os.getenv("QDRANT_MIGRATE_COLLECTIONS", "true").lower() == "true"
+
+# Text index: dense + sparse (BGE-M3 lexical weights) vectors, fused with
+# RRF at query time. Candidates taken from each side before fusion, and
+# the minimum sparse (lexical) score of a candidate.
+TEXT_HYBRID_ENABLED = os.getenv("TEXT_HYBRID_ENABLED", "true").lower() == "true"
+TEXT_HYBRID_PREFETCH_LIMIT = int(os.getenv("TEXT_HYBRID_PREFETCH_LIMIT", "50"))
+TEXT_SPARSE_SCORE_THRESHOLD = float(os.getenv("TEXT_SPARSE_SCORE_THRESHOLD", "0.0"))
+
+
+# ===============================
+# Cameras
+# ===============================
+
+# Frames kept per camera in the shared-memory ring (pre-roll history)
+FRAME_RING_CAPACITY = int(os.getenv("FRAME_RING_CAPACITY", "8"))
+
+# FFmpeg decoder threads per video file camera (0 = OpenCV default)
+VIDEO_DECODE_THREADS = int(os.getenv("VIDEO_DECODE_THREADS", "0"))
+
+# RTSP cameras: transport (tcp / udp), stall detection and reconnect backoff
+RTSP_TRANSPORT = os.getenv("RTSP_TRANSPORT", "tcp")
+RTSP_STALL_TIMEOUT_SECONDS = float(os.getenv("RTSP_STALL_TIMEOUT_SECONDS", "10"))
+RTSP_RECONNECT_MAX_DELAY_SECONDS = float(os.getenv("RTSP_RECONNECT_MAX_DELAY_SECONDS", "30"))
+
+# Dual-stream cameras: main stream is disconnected after this idle time
+RTSP_MAIN_IDLE_TIMEOUT_SECONDS = float(os.getenv("RTSP_MAIN_IDLE_TIMEOUT_SECONDS", "30"))
+
+# Hot reload of cameras_config.json (polling interval in seconds)
+CAMERA_CONFIG_WATCH_ENABLED = os.getenv("CAMERA_CONFIG_WATCH_ENABLED", "true").lower() == "true"
+CAMERA_CONFIG_POLL_SECONDS = float(os.getenv("CAMERA_CONFIG_POLL_SECONDS", "2"))
+
+# Pipelines of cameras without "pipelines" in cameras_config.json
+# (comma-separated: image, cycle, cycle_training)
+DEFAULT_PIPELINES = os.getenv("DEFAULT_PIPELINES", "cycle_training")
+
+# A pipeline that failed to initialize is retried after this delay,
+# doubled after each failure up to the max
+PIPELINE_RETRY_SECONDS = float(os.getenv("PIPELINE_RETRY_SECONDS", "30"))
+PIPELINE_RETRY_MAX_SECONDS = float(os.getenv("PIPELINE_RETRY_MAX_SECONDS", "600"))
+
 
 # ===============================
 # Logging
@@ -66,3 +157,104 @@ WEBSOCKET_PORT = int(os.getenv("WEBSOCKET_PORT", "8765"))
 WEBSOCKET_DISPLAY_FPS = float(os.getenv("WEBSOCKET_DISPLAY_FPS", "6"))
 WEBSOCKET_JPEG_QUALITY = int(os.getenv("WEBSOCKET_JPEG_QUALITY", "60"))
 WEBSOCKET_MAX_WIDTH = int(os.getenv("WEBSOCKET_MAX_WIDTH", "640"))
+
+# permessage-deflate for JSON event messages (frames are never compressed)
+WEBSOCKET_COMPRESSION_ENABLED = (
+    os.getenv("WEBSOCKET_COMPRESSION_ENABLED", "true").lower() == "true"
+)
+WEBSOCKET_COMPRESSION_LEVEL = int(os.getenv("WEBSOCKET_COMPRESSION_LEVEL", "6"))
+WEBSOCKET_COMPRESSION_MIN_BYTES = int(
+    os.getenv("WEBSOCKET_COMPRESSION_MIN_BYTES", "128")
+)
+
+# Pipeline events are buffered and flushed as one batch per tick
+WEBSOCKET_EVENT_FLUSH_MS = int(os.getenv("WEBSOCKET_EVENT_FLUSH_MS", "100"))
+
+
+# ===============================
+# Metrics / Status endpoint
+# ===============================
+
+# Disabled metrics cost one attribute check per instrumented call
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SUMMARY_INTERVAL_SECONDS = float(os.getenv("METRICS_SUMMARY_INTERVAL_SECONDS", "60"))
+
+# Local HTTP endpoint (GET /metrics in Prometheus text format)
+STATUS_HTTP_ENABLED = os.getenv("STATUS_HTTP_ENABLED", "true").lower() == "true"
+STATUS_HTTP_HOST = os.getenv("STATUS_HTTP_HOST", "127.0.0.1")
+STATUS_HTTP_PORT = int(os.getenv("STATUS_HTTP_PORT", "9108"))
+
+
+# ===============================
+# Health / Readiness
+# ===============================
+
+HEALTH_ENABLED = os.getenv("HEALTH_ENABLED", "true").lower() == "true"
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "5"))
+
+# Dependency probes (Qdrant, VLM endpoint) run on their own, slower cadence
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "30"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "3"))
+QDRANT_HEALTH_URL = os.getenv("QDRANT_HEALTH_URL", "http://localhost:6333/readyz")
+
+# A camera without a new frame for this long is stalled
+CAMERA_STALL_SECONDS = float(os.getenv("CAMERA_STALL_SECONDS", "30"))
+CAMERA_AUTO_RESTART = os.getenv("CAMERA_AUTO_RESTART", "true").lower() == "true"
+CAMERA_RESTART_COOLDOWN_SECONDS = float(os.getenv("CAMERA_RESTART_COOLDOWN_SECONDS", "60"))
+
+# A single snapshot in the pipeline for this long marks it stuck
+PIPELINE_STUCK_SECONDS = float(os.getenv("PIPELINE_STUCK_SECONDS", "120"))
+
+
+# ===============================
+# Scheduler / Maintenance jobs
+# ===============================
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+# Random delay added to each run so jobs do not hit Qdrant together
+SCHEDULER_JITTER_SECONDS = float(os.getenv("SCHEDULER_JITTER_SECONDS", "30"))
+
+# Runtime image/text points older than this are deleted (0 = keep forever)
+RETENTION_DAYS = float(os.getenv("RETENTION_DAYS", "30"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+
+# Image points younger than this keep full density
+RETENTION_FULL_DENSITY_HOURS = float(os.getenv("RETENTION_FULL_DENSITY_HOURS", "24"))
+
+# Older image points are thinned per camera and time bucket:
+# "max_age_hours:bucket_minutes:keep,..." (empty = no thinning)
+RETENTION_TIERS = os.getenv("RETENTION_TIERS", "168:10:1,720:60:1")
+
+ANCHOR_RECOMPACT_INTERVAL_SECONDS = float(
+    os.getenv("ANCHOR_RECOMPACT_INTERVAL_SECONDS", "300")
+)
+
+# Cron expression (local time), empty disables snapshots
+QDRANT_SNAPSHOT_CRON = os.getenv("QDRANT_SNAPSHOT_CRON", "30 3 * * *")
+QDRANT_SNAPSHOT_KEEP = int(os.getenv("QDRANT_SNAPSHOT_KEEP", "3"))
+
+CACHE_CLEANUP_INTERVAL_SECONDS = float(os.getenv("CACHE_CLEANUP_INTERVAL_SECONDS", "900"))
+
+
+# ===============================
+# History search (GET /search on the status endpoint)
+# ===============================
+
+QUERY_ENABLED = os.getenv("QUERY_ENABLED", "true").lower() == "true"
+
+# Episodes returned, frames kept per episode, candidates per search side
+QUERY_LIMIT = int(os.getenv("QUERY_LIMIT", "10"))
+QUERY_FRAMES_PER_EPISODE = int(os.getenv("QUERY_FRAMES_PER_EPISODE", "3"))
+QUERY_CANDIDATES = int(os.getenv("QUERY_CANDIDATES", "100"))
+
+# CLIP text-to-image cosine scores are low (~0.2-0.35 for a match)
+QUERY_IMAGE_SCORE_THRESHOLD = float(os.getenv("QUERY_IMAGE_SCORE_THRESHOLD", "0.18"))
+QUERY_TEXT_SCORE_THRESHOLD = float(os.getenv("QUERY_TEXT_SCORE_THRESHOLD", "0.4"))
+
+# Hits of one camera closer than this are one episode
+QUERY_CLUSTER_GAP_SECONDS = float(os.getenv("QUERY_CLUSTER_GAP_SECONDS", "120"))
+
+# Cached query embeddings (LRU, 0 = off)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "10"))
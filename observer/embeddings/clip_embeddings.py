@@ -3,22 +3,26 @@ import asyncio
 import threading
 import time
 import asyncio
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from PIL import Image
-import torch
-import torch.nn.functional as F
-from transformers import CLIPModel, CLIPProcessor
 
 from utils.logger import logger
+from utils.metrics import metrics
+
+# torch / transformers are imported on first load (seconds of import
+# time), so importing this module is cheap
+if TYPE_CHECKING:
+    import torch
+    from transformers import CLIPModel, CLIPProcessor
 
 
 # Model name (centralized)
 _MODEL_NAME = "openai/clip-vit-base-patch16"
 
 # Module-level singletons
-_clip_model: CLIPModel | None = None
-_clip_processor: CLIPProcessor | None = None
+_clip_model: "CLIPModel | None" = None
+_clip_processor: "CLIPProcessor | None" = None
 _model_lock = threading.Lock()
 
 
@@ -39,6 +43,8 @@ def _load_clip():
         try:
             logger.log(f"Loading CLIP model '{_MODEL_NAME}'")
 
+            from transformers import CLIPModel, CLIPProcessor
+
             _clip_model = CLIPModel.from_pretrained(_MODEL_NAME)
             _clip_processor = CLIPProcessor.from_pretrained(
                 _MODEL_NAME,
@@ -60,16 +66,32 @@ def _load_clip():
             raise
 
 
+def warm_up() -> None:
+    """
+    Load the model and run one image and one text inference, so the
+    first real frame does not pay for lazy initialization. Raises on
+    failure (logged).
+    """
+    _load_clip()
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (224, 224), (127, 127, 127)).save(buffer, format="JPEG")
+    embed_image_sync(buffer.getvalue())
+    embed_clip_text_sync("a photo")
+
+
 def embed_image_sync(image_buffer: bytes) -> List[float]:
     """
     Synchronous CLIP image embedding.
     CPU-bound. Must never raise silently.
     """
-    try:
-        start_ts = time.perf_counter()
+    start_ts = time.perf_counter()
 
+    try:
         _load_clip()
 
+        import torch
+
         if not image_buffer:
             raise ValueError("Empty image buffer")
 
@@ -108,8 +130,10 @@ def embed_image_sync(image_buffer: bytes) -> List[float]:
         raise
 
     finally:
-        elapsed_ms = (time.perf_counter() - start_ts) * 1000
-        #print(f"CLIP embed_image time: {elapsed_ms:.2f} ms")
+        metrics.histogram(
+            "observer_clip_embed_seconds",
+            "CLIP image embedding latency (in-process)",
+        ).observe(time.perf_counter() - start_ts)
 
 async def embed_image(image_buffer: bytes) -> List[float]:
     """
@@ -137,7 +161,7 @@ async def embed_image(image_buffer: bytes) -> List[float]:
         raise
 
 
-def _embed_text_sync(text: str) -> List[float]:
+def embed_clip_text_sync(text: str) -> List[float]:
     """
     Synchronous CLIP text embedding.
     CPU-bound. Must never raise silently.
@@ -145,6 +169,8 @@ def _embed_text_sync(text: str) -> List[float]:
     try:
         _load_clip()
 
+        import torch
+
         if not text or not text.strip():
             raise ValueError("Empty text input")
 
@@ -193,7 +219,7 @@ async def embed_clip_text(text: str) -> List[float]:
     try:
         return await loop.run_in_executor(
             None,
-            _embed_text_sync,
+            embed_clip_text_sync,
             text,
         )
     except Exception:
@@ -201,6 +227,8 @@ async def embed_clip_text(text: str) -> List[float]:
         raise
 
 
-def merge_embeddings(v_prev: torch.Tensor, v_curr: torch.Tensor) -> torch.Tensor:
+def merge_embeddings(v_prev: "torch.Tensor", v_curr: "torch.Tensor") -> "torch.Tensor":
+    import torch.nn.functional as F
+
     merged = (v_prev + v_curr) * 0.5
     return F.normalize(merged, p=2, dim=-1)
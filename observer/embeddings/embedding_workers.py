@@ -0,0 +1,487 @@
+import os
+import queue
+import threading
+import time
+import itertools
+import multiprocessing as mp
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from cameras.frame_context import DEFAULT_JPEG_QUALITY, DEFAULT_MAX_WIDTH, FrameContext
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+def _worker_main(
+    worker_index: int,
+    shm_name: str,
+    slot_bytes: int,
+    task_queue,
+    result_queue,
+    cpu_ids: List[int],
+    max_width: int,
+    jpeg_quality: int,
+) -> None:
+    """
+    Embedding worker process entry point.
+    Loads CLIP once, then embeds frames handed over through shared memory.
+    """
+    if cpu_ids and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpu_ids)
+        except Exception as e:
+            logger.error(
+                f"Failed to pin embedding worker {worker_index} to cores {cpu_ids}",
+                exc_info=e,
+            )
+
+    shm = shared_memory.SharedMemory(name=shm_name, create=False)
+
+    try:
+        import torch
+        from embeddings import clip_embeddings
+
+        if cpu_ids:
+            torch.set_num_threads(len(cpu_ids))
+
+        # Ready only after a first inference: it is several times slower
+        clip_embeddings.warm_up()
+        result_queue.put(("ready", worker_index, None, None))
+
+        logger.log(
+            f"Embedding worker {worker_index} ready | pid={os.getpid()} cores={cpu_ids}"
+        )
+
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            request_id, slot, shape = task
+            try:
+                frame = np.ndarray(
+                    shape,
+                    dtype=np.uint8,
+                    buffer=shm.buf,
+                    offset=slot * slot_bytes,
+                )
+                # Same preprocessing as in-process embedding (FrameContext.embedding)
+                image_buffer = FrameContext(frame).jpeg(max_width, jpeg_quality)
+                del frame
+
+                if not image_buffer:
+                    raise RuntimeError("JPEG encoding failed in embedding worker")
+
+                embedding = clip_embeddings.embed_image_sync(image_buffer)
+                result_queue.put(("result", worker_index, request_id, embedding))
+
+            except Exception as e:
+                result_queue.put(("error", worker_index, request_id, repr(e)))
+
+    except Exception as e:
+        logger.error(f"Embedding worker {worker_index} crashed", exc_info=e)
+        raise
+
+    finally:
+        try:
+            shm.close()
+        except Exception:
+            pass
+
+
+class _WorkerHandle:
+    def __init__(self, index: int, cpu_ids: List[int]):
+        self.index = index
+        self.cpu_ids = cpu_ids
+        self.process = None
+        self.task_queue = None
+        self.ready = False
+        self.in_flight: Dict[int, int] = {}  # request_id -> slot
+        self.restarts = 0
+
+        # Crash backoff (monotonic times): a worker that keeps dying on
+        # import or model load is respawned less and less often
+        self.started_at = 0.0
+        self.crashes = 0  # consecutive, reset once the worker stays up
+        self.restart_at: Optional[float] = None  # set while waiting to respawn
+
+
+class EmbeddingWorkerPool:
+    """
+    Pool of CLIP embedding worker processes.
+
+    Moves frame encoding and CLIP inference out of the observer process
+    so camera threads, Qdrant I/O and the asyncio loop do not compete with
+    inference for the GIL.
+
+    - Each worker loads CLIP once and is pinned to its own subset of cores.
+    - Frames are copied once into a shared memory slot; only the slot index
+      travels over the task queue.
+    - Crashed workers are restarted with exponential backoff per worker
+      (restart_initial_delay doubling up to restart_max_delay, reset once
+      a worker stayed up for restart_reset_seconds); their in-flight
+      requests fail.
+
+    Must never crash the application.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        cores_per_worker: int = 0,
+        slots_per_worker: int = 2,
+        slot_bytes: int = 1920 * 1080 * 3,
+        max_width: int = DEFAULT_MAX_WIDTH,
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        restart_initial_delay: float = 1.0,
+        restart_max_delay: float = 60.0,
+        restart_reset_seconds: float = 60.0,
+    ):
+        self._num_workers = max(1, num_workers)
+        self._slot_bytes = slot_bytes
+        self._slot_count = self._num_workers * max(1, slots_per_worker)
+        self._max_width = max_width
+        self._jpeg_quality = jpeg_quality
+        self._restart_initial_delay = restart_initial_delay
+        self._restart_max_delay = restart_max_delay
+        self._restart_reset_seconds = restart_reset_seconds
+
+        self._ctx = mp.get_context("spawn")
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._result_queue = None
+
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        self._futures: Dict[int, Future] = {}
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._workers = [
+            _WorkerHandle(index, cpu_ids)
+            for index, cpu_ids in enumerate(
+                self._assign_cores(self._num_workers, cores_per_worker)
+            )
+        ]
+
+        self._running = False
+        self._collector_thread = None
+        self._monitor_thread = None
+
+    @staticmethod
+    def _assign_cores(num_workers: int, cores_per_worker: int) -> List[List[int]]:
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+
+        per_worker = cores_per_worker or max(1, len(cores) // num_workers)
+
+        assignments = []
+        for index in range(num_workers):
+            start = (index * per_worker) % len(cores)
+            assignments.append(
+                [cores[(start + i) % len(cores)] for i in range(per_worker)]
+            )
+        return assignments
+
+    # -------- lifecycle --------
+
+    def start(self) -> None:
+        if self._running:
+            return
+
+        logger.log(
+            f"Starting EmbeddingWorkerPool | workers={self._num_workers} "
+            f"slots={self._slot_count}"
+        )
+
+        self._shm = shared_memory.SharedMemory(
+            create=True,
+            size=self._slot_count * self._slot_bytes,
+        )
+        for slot in range(self._slot_count):
+            self._free_slots.put(slot)
+
+        self._result_queue = self._ctx.Queue()
+        self._running = True
+
+        for worker in self._workers:
+            self._spawn(worker)
+
+        self._collector_thread = threading.Thread(
+            target=self._collect_results,
+            name="EmbeddingWorkerPool-collector",
+            daemon=True,
+        )
+        self._collector_thread.start()
+
+        self._monitor_thread = threading.Thread(
+            target=self._monitor_workers,
+            name="EmbeddingWorkerPool-monitor",
+            daemon=True,
+        )
+        self._monitor_thread.start()
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+
+        logger.log("Stopping EmbeddingWorkerPool")
+        self._running = False
+
+        for worker in self._workers:
+            try:
+                worker.task_queue.put(None)
+            except Exception:
+                pass
+
+        for worker in self._workers:
+            try:
+                worker.process.join(timeout=5.0)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+            except Exception as e:
+                logger.error(
+                    f"Error while stopping embedding worker {worker.index}",
+                    exc_info=e,
+                )
+
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("EmbeddingWorkerPool stopped"))
+
+        if self._collector_thread:
+            self._collector_thread.join(timeout=2.0)
+
+        if self._shm:
+            try:
+                self._shm.close()
+                self._shm.unlink()
+            except Exception as e:
+                logger.error("Failed to release embedding shared memory", exc_info=e)
+            self._shm = None
+
+        logger.log("EmbeddingWorkerPool stopped")
+
+    def is_ready(self) -> bool:
+        """
+        True once at least one worker has loaded the model.
+        """
+        return any(worker.ready for worker in self._workers)
+
+    def get_stats(self) -> Dict:
+        """
+        Worker readiness, queue depth and restarts, for health reporting.
+        """
+        with self._lock:
+            pending = len(self._futures)
+            restarting = sum(1 for worker in self._workers if worker.restart_at is not None)
+        return {
+            "workers": len(self._workers),
+            "ready_workers": sum(1 for worker in self._workers if worker.ready),
+            "restarting_workers": restarting,
+            "restarts": sum(worker.restarts for worker in self._workers),
+            "pending": pending,
+        }
+
+    # -------- submission --------
+
+    def submit(self, frame, timeout: float = 5.0) -> Future:
+        """
+        Queue a BGR frame for embedding. Returns a Future of List[float].
+        Blocks up to 'timeout' seconds while all shared memory slots are busy.
+        """
+        if not self._running:
+            raise RuntimeError("EmbeddingWorkerPool is not running")
+
+        if frame.nbytes > self._slot_bytes:
+            frame = self._shrink_to_slot(frame)
+
+        if not frame.flags.c_contiguous:
+            frame = np.ascontiguousarray(frame)
+
+        try:
+            slot = self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError("No free embedding slot (workers overloaded)")
+
+        try:
+            target = np.ndarray(
+                frame.shape,
+                dtype=np.uint8,
+                buffer=self._shm.buf,
+                offset=slot * self._slot_bytes,
+            )
+            np.copyto(target, frame)
+            del target
+
+            future: Future = Future()
+            request_id = next(self._request_ids)
+
+            with self._lock:
+                alive = [
+                    w for w in self._workers
+                    if w.process is not None and w.restart_at is None
+                ]
+                if not alive:
+                    raise RuntimeError("No embedding worker running (restarting)")
+                worker = min(alive, key=lambda w: (not w.ready, len(w.in_flight)))
+                worker.in_flight[request_id] = slot
+                self._futures[request_id] = future
+                worker.task_queue.put((request_id, slot, frame.shape))
+
+            return future
+
+        except Exception:
+            self._free_slots.put(slot)
+            raise
+
+    def embed_frame(self, frame, timeout: float = 30.0) -> List[float]:
+        """
+        Synchronous helper: embed a frame and wait for the result.
+        """
+        with metrics.timer(
+            "observer_embedding_pool_seconds",
+            "Frame embedding round trip through the worker pool",
+        ):
+            return self.submit(frame).result(timeout=timeout)
+
+    def _shrink_to_slot(self, frame):
+        height, width = frame.shape[:2]
+        scale = (self._slot_bytes / float(frame.nbytes)) ** 0.5
+        new_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+    # -------- internal --------
+
+    def _spawn(self, worker: _WorkerHandle) -> None:
+        worker.task_queue = self._ctx.Queue()
+        worker.ready = False
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker.index,
+                self._shm.name,
+                self._slot_bytes,
+                worker.task_queue,
+                self._result_queue,
+                worker.cpu_ids,
+                self._max_width,
+                self._jpeg_quality,
+            ),
+            name=f"EmbeddingWorker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+
+    def _collect_results(self) -> None:
+        """
+        Resolve futures from worker results. Runs in a background thread.
+        """
+        while self._running:
+            try:
+                kind, worker_index, request_id, value = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except Exception as e:
+                if self._running:
+                    logger.error("Embedding result queue failed", exc_info=e)
+                    time.sleep(0.5)
+                continue
+
+            try:
+                worker = self._workers[worker_index]
+
+                if kind == "ready":
+                    worker.ready = True
+                    continue
+
+                with self._lock:
+                    slot = worker.in_flight.pop(request_id, None)
+                    future = self._futures.pop(request_id, None)
+
+                if slot is not None:
+                    self._free_slots.put(slot)
+
+                if future is None or future.done():
+                    continue
+
+                if kind == "result":
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(f"Embedding worker failed: {value}"))
+
+            except Exception as e:
+                logger.error("Failed to handle embedding worker result", exc_info=e)
+
+    def _monitor_workers(self) -> None:
+        """
+        Restart crashed workers with backoff. Runs in a background thread.
+        """
+        while self._running:
+            time.sleep(0.5)
+
+            for worker in self._workers:
+                if not self._running:
+                    return
+
+                try:
+                    if worker.restart_at is not None:
+                        if time.monotonic() >= worker.restart_at:
+                            with self._lock:
+                                worker.restarts += 1
+                                worker.restart_at = None
+                                self._spawn(worker)
+                        continue
+
+                    if worker.process.is_alive():
+                        continue
+
+                    self._on_worker_died(worker)
+
+                except Exception as e:
+                    logger.error(
+                        f"Failed to restart embedding worker {worker.index}",
+                        exc_info=e,
+                    )
+
+    def _on_worker_died(self, worker: _WorkerHandle) -> None:
+        """
+        Fail the in-flight requests of a dead worker and schedule its
+        restart: immediately after a crash of a worker that ran for
+        restart_reset_seconds, otherwise after a doubling delay.
+        """
+        now = time.monotonic()
+        if now - worker.started_at >= self._restart_reset_seconds:
+            worker.crashes = 0
+        worker.crashes += 1
+        delay = 0.0 if worker.crashes == 1 else min(
+            self._restart_initial_delay * 2 ** (worker.crashes - 2),
+            self._restart_max_delay,
+        )
+
+        logger.error(
+            f"Embedding worker {worker.index} died "
+            f"(exitcode={worker.process.exitcode}, crashes={worker.crashes}, "
+            f"restarts={worker.restarts}), restarting in {delay:.1f}s"
+        )
+
+        with self._lock:
+            worker.ready = False
+            worker.restart_at = now + delay
+            lost = worker.in_flight
+            worker.in_flight = {}
+            futures = [self._futures.pop(rid, None) for rid in lost]
+
+        for slot in lost.values():
+            self._free_slots.put(slot)
+        for future in futures:
+            if future is not None and not future.done():
+                future.set_exception(RuntimeError("Embedding worker crashed"))
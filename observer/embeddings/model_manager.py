@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from config import settings
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.startup_profiler import startup_profiler
+
+
+def _load_clip() -> None:
+    from embeddings import clip_embeddings
+
+    if settings.MODEL_WARMUP_ENABLED:
+        clip_embeddings.warm_up()
+    else:
+        clip_embeddings._load_clip()
+
+
+def _load_text() -> None:
+    from embeddings import text_embeddings
+
+    if settings.MODEL_WARMUP_ENABLED:
+        text_embeddings.warm_up()
+    else:
+        text_embeddings._load_text_model()
+
+
+class ModelManager:
+    """
+    Loads embedding models in background threads, so no camera thread
+    waits for torch imports, weight loading or the first (slow)
+    inference.
+
+    States per model: "not_loaded", "loading", "ready", "failed".
+    Pipelines check is_ready() and skip snapshots until their models
+    are ready; is_ready() also starts loading a model nobody preloaded,
+    and retries a failed one after MODEL_LOAD_RETRY_SECONDS.
+    """
+
+    def __init__(self, loaders: Optional[Dict[str, Callable[[], None]]] = None):
+        self._loaders = loaders or {
+            "clip": _load_clip,
+            "text": _load_text,
+        }
+        self._states: Dict[str, str] = {name: "not_loaded" for name in self._loaders}
+        self._failed_at: Dict[str, float] = {}
+        self._ready_events = {name: threading.Event() for name in self._loaders}
+        self._lock = threading.Lock()
+
+    def start(self, names: Iterable[str]) -> None:
+        """
+        Start loading the given models, each in its own thread.
+        """
+        for name in names:
+            self._load_async(name)
+
+    def is_ready(self, name: str) -> bool:
+        if self._ready_events[name].is_set():
+            return True
+
+        self._load_async(name)
+        return False
+
+    def wait_ready(self, name: str, timeout: Optional[float] = None) -> bool:
+        self._load_async(name)
+        return self._ready_events[name].wait(timeout)
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            return self._states[name]
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._states)
+
+    def _load_async(self, name: str) -> None:
+        with self._lock:
+            state = self._states[name]
+            if state in ("loading", "ready"):
+                return
+            if (
+                state == "failed"
+                and time.monotonic() - self._failed_at.get(name, 0.0) < settings.MODEL_LOAD_RETRY_SECONDS
+            ):
+                return
+            self._states[name] = "loading"
+
+        threading.Thread(
+            target=self._load,
+            args=(name,),
+            name=f"ModelLoader-{name}",
+            daemon=True,
+        ).start()
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        logger.log(f"Model loading started | model={name}")
+
+        try:
+            self._loaders[name]()
+        except Exception as e:
+            with self._lock:
+                self._states[name] = "failed"
+                self._failed_at[name] = time.monotonic()
+            logger.error(f"Model loading failed | model={name}", exc_info=e)
+            return
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._states[name] = "ready"
+        self._ready_events[name].set()
+
+        metrics.gauge(
+            "observer_model_load_seconds",
+            "Model load and warm-up time",
+            model=name,
+        ).set(elapsed)
+        startup_profiler.record(f"model {name} load and warm-up", elapsed, start)
+        logger.log(f"Model ready | model={name} seconds={elapsed:.1f}")
+
+
+def image_embedding_ready(embedding_pool=None) -> bool:
+    """
+    True when a frame can be embedded without waiting for a model:
+    a worker process has loaded CLIP, or (no pool) the in-process CLIP
+    model is ready.
+    """
+    if embedding_pool is not None:
+        return embedding_pool.is_ready()
+    return model_manager.is_ready("clip")
+
+
+model_manager = ModelManager()
@@ -1,20 +1,40 @@
 import asyncio
+import hashlib
+import queue
 import threading
-from typing import List
-
-import torch
-from sentence_transformers import SentenceTransformer
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
+from config import settings
 from utils.logger import logger
+from utils.metrics import metrics
+
+# torch / sentence_transformers are imported on first load (seconds of
+# import time), so importing this module is cheap
+if TYPE_CHECKING:
+    import torch
+    from sentence_transformers import SentenceTransformer
 
 
 # Model name (centralized)
 _MODEL_NAME = "BAAI/bge-m3"
 
 # Module-level singleton
-_text_model: SentenceTransformer | None = None
+_text_model: "SentenceTransformer | None" = None
 _model_lock = threading.Lock()
 
+# BGE-M3 sparse (lexical) head: ReLU(Linear(token hidden state)) per token
+_SPARSE_HEAD_FILE = "sparse_linear.pt"
+_sparse_head: "torch.nn.Linear | None" = None
+_sparse_head_failed = False
+
+# Embedding cache: content hash -> (dense, sparse or None if not computed)
+_CacheEntry = Tuple[List[float], Optional[Dict[int, float]]]
+_cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+_cache_lock = threading.Lock()
+
 
 def _load_text_model():
     """
@@ -33,6 +53,8 @@ def _load_text_model():
         try:
             logger.log(f"Loading text embedding model '{_MODEL_NAME}'")
 
+            from sentence_transformers import SentenceTransformer
+
             _text_model = SentenceTransformer(
                 _MODEL_NAME,
                 device="cpu",  # explicit for determinism
@@ -46,42 +68,373 @@ def _load_text_model():
             raise
 
 
-def embed_text_sync(text: str) -> List[float]:
+def _load_sparse_head() -> bool:
     """
-    Synchronous text embedding using BGE-M3.
-    CPU-bound. Must never raise silently.
+    Load the BGE-M3 lexical weight head once (from the model repo).
+    Returns False when unavailable; sparse outputs are then empty.
     """
-    try:
-        _load_text_model()
+    global _sparse_head, _sparse_head_failed
 
-        if not text or not text.strip():
-            raise ValueError("Empty text input")
+    if _sparse_head is not None:
+        return True
+    if _sparse_head_failed:
+        return False
+
+    with _model_lock:
+        if _sparse_head is not None:
+            return True
+
+        try:
+            import torch
+            from huggingface_hub import hf_hub_download
+
+            path = hf_hub_download(_MODEL_NAME, _SPARSE_HEAD_FILE)
+            state = torch.load(path, map_location="cpu")
+
+            head = torch.nn.Linear(state["weight"].shape[1], 1)
+            head.load_state_dict(state)
+            head.eval()
+            _sparse_head = head
+
+            logger.log("Text sparse head loaded successfully")
+            return True
+
+        except Exception as e:
+            logger.error(
+                "Failed to load text sparse head, sparse vectors disabled",
+                exc_info=e,
+            )
+            _sparse_head_failed = True
+            return False
+
+
+def _lexical_weights(token_embeddings, input_ids, attention_mask) -> Dict[int, float]:
+    """
+    Token id -> weight, max over repeated tokens, special tokens skipped
+    (same post-processing as the reference BGE-M3 implementation).
+    """
+    import torch
+
+    tokenizer = _text_model.tokenizer
+    special_ids = {
+        tokenizer.cls_token_id,
+        tokenizer.eos_token_id,
+        tokenizer.pad_token_id,
+        tokenizer.unk_token_id,
+    }
+
+    with torch.no_grad():
+        weights = torch.relu(_sparse_head(token_embeddings.float())).squeeze(-1)
+
+    lexical: Dict[int, float] = {}
+    for token_id, weight, mask in zip(
+        input_ids.tolist(),
+        weights.tolist(),
+        attention_mask.tolist(),
+    ):
+        if not mask or token_id in special_ids or weight <= 0:
+            continue
+        if weight > lexical.get(token_id, 0.0):
+            lexical[token_id] = weight
+
+    return lexical
 
+
+def warm_up() -> None:
+    """
+    Load the model (and the sparse head when hybrid search is on) and run
+    one inference, so the first real text does not pay for lazy
+    initialization. Bypasses the cache. Raises on failure (logged).
+    """
+    _load_text_model()
+    _encode(["warm up"], return_sparse=settings.TEXT_HYBRID_ENABLED)
+
+
+def _cache_key(text: str) -> str:
+    # Whitespace differences do not change the embedding
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str, return_sparse: bool) -> Optional[_CacheEntry]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or (return_sparse and entry[1] is None):
+            return None
+        _cache.move_to_end(key)
+        return entry
+
+
+def _cache_put(key: str, entry: _CacheEntry) -> None:
+    if settings.TEXT_EMBED_CACHE_SIZE <= 0:
+        return
+
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > settings.TEXT_EMBED_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _result(entry: _CacheEntry, return_sparse: bool):
+    # Copies: callers must not be able to change cached vectors
+    if return_sparse:
+        return list(entry[0]), dict(entry[1])
+    return list(entry[0])
+
+
+def _encode(texts: List[str], return_sparse: bool) -> List[_CacheEntry]:
+    """
+    One encode() call for all texts. sentence-transformers sorts them by
+    length and cuts batches of TEXT_EMBED_BATCH_SIZE, so each batch pads
+    to similar lengths.
+    """
+    import torch
+
+    if return_sparse and _load_sparse_head():
         try:
             with torch.no_grad():
-                embedding = _text_model.encode(
-                    text,
+                outputs = _text_model.encode(
+                    texts,
+                    batch_size=settings.TEXT_EMBED_BATCH_SIZE,
+                    output_value=None,  # sentence + token embeddings
+                    convert_to_numpy=False,
+                )
+            entries = []
+            for output in outputs:
+                dense = torch.nn.functional.normalize(
+                    output["sentence_embedding"].float(),
+                    dim=-1,
+                )
+                sparse = _lexical_weights(
+                    output["token_embeddings"],
+                    output["input_ids"],
+                    output["attention_mask"],
+                )
+                entries.append((dense.tolist(), sparse))
+        except Exception as e:
+            raise RuntimeError("Text model inference failed") from e
+
+    else:
+        try:
+            with torch.no_grad():
+                embeddings = _text_model.encode(
+                    texts,
+                    batch_size=settings.TEXT_EMBED_BATCH_SIZE,
                     normalize_embeddings=True,  # required for cosine similarity
                 )
         except Exception as e:
             raise RuntimeError("Text model inference failed") from e
 
-        if embedding is None or len(embedding) == 0:
-            raise RuntimeError("Empty embedding generated")
+        # Sparse head unavailable: cache an empty sparse vector so hybrid
+        # callers hit the cache too
+        sparse = {} if return_sparse else None
+        entries = [(embedding.tolist(), sparse) for embedding in embeddings]
+
+    if len(entries) != len(texts) or any(not dense for dense, _ in entries):
+        raise RuntimeError("Empty embedding generated")
 
-        return embedding.tolist()
+    return entries
+
+
+def embed_texts_batch(
+    texts: List[str],
+    return_sparse: bool = False,
+) -> list:
+    """
+    Embed several texts with BGE-M3, in input order.
+
+    Texts are keyed by content hash: cached ones and duplicates within
+    the call are encoded once. Returns a list of dense vectors, or of
+    (dense, sparse) with return_sparse=True (see embed_text_sync).
+    CPU-bound. Must never raise silently.
+    """
+    try:
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Empty text input")
+
+        keys = [_cache_key(text) for text in texts]
+        entries: Dict[str, _CacheEntry] = {}
+        missing: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in entries or key in missing:
+                continue
+            entry = _cache_get(key, return_sparse)
+            if entry is None:
+                missing[key] = text
+            else:
+                entries[key] = entry
+
+        hits = len(texts) - len(missing)
+        if hits:
+            metrics.counter(
+                "observer_text_embed_cache_total",
+                "Text embedding cache lookups",
+                result="hit",
+            ).inc(hits)
+
+        if missing:
+            metrics.counter(
+                "observer_text_embed_cache_total",
+                "Text embedding cache lookups",
+                result="miss",
+            ).inc(len(missing))
+
+            _load_text_model()
+
+            with metrics.timer(
+                "observer_text_embed_seconds",
+                "Text embedding batch latency",
+            ):
+                encoded = _encode(list(missing.values()), return_sparse)
+
+            for key, entry in zip(missing, encoded):
+                entries[key] = entry
+                _cache_put(key, entry)
+
+        return [_result(entries[key], return_sparse) for key in keys]
 
     except Exception as e:
         logger.error("Text embedding failed", exc_info=e)
         raise
 
 
-async def embed_text(text: str) -> List[float]:
+class _MicroBatcher:
+    """
+    Merges text embedding requests from concurrent callers (camera
+    threads, event loop) into one embed_texts_batch() call: the first
+    request waits up to TEXT_EMBED_BATCH_WAIT_MS for others, up to
+    TEXT_EMBED_BATCH_SIZE texts.
+    """
+
+    def __init__(self, wait_seconds: float, max_batch: int):
+        self._wait_seconds = wait_seconds
+        self._max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Tuple[str, bool, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str, return_sparse: bool) -> Future:
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((text, return_sparse, future))
+        return future
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="TextEmbeddingBatcher",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._wait_seconds
+
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._process(batch)
+
+    @staticmethod
+    def _process(batch: list) -> None:
+        # One forward pass serves both: sparse output is a by-product
+        return_sparse = any(item[1] for item in batch)
+
+        try:
+            results = embed_texts_batch([item[0] for item in batch], return_sparse)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        # texts / batches = mean micro-batch size
+        metrics.counter(
+            "observer_text_embed_batches_total",
+            "Text embedding micro-batches",
+        ).inc()
+        metrics.counter(
+            "observer_text_embed_batched_texts_total",
+            "Texts embedded through micro-batches",
+        ).inc(len(batch))
+
+        for (_, wants_sparse, future), result in zip(batch, results):
+            if return_sparse and not wants_sparse:
+                result = result[0]
+            future.set_result(result)
+
+
+_batcher: Optional[_MicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def _get_batcher() -> Optional[_MicroBatcher]:
+    global _batcher
+
+    if settings.TEXT_EMBED_BATCH_WAIT_MS <= 0:
+        return None
+
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = _MicroBatcher(
+                    wait_seconds=settings.TEXT_EMBED_BATCH_WAIT_MS / 1000.0,
+                    max_batch=settings.TEXT_EMBED_BATCH_SIZE,
+                )
+    return _batcher
+
+
+def embed_text_sync(
+    text: str,
+    return_sparse: bool = False,
+) -> Union[List[float], Tuple[List[float], Dict[int, float]]]:
+    """
+    Synchronous text embedding using BGE-M3.
+
+    With return_sparse=True returns (dense, sparse), where sparse maps
+    token id -> lexical weight (empty if the sparse head is unavailable).
+    Both come from one forward pass.
+
+    Cached texts return at once; others go through the micro-batcher
+    (TEXT_EMBED_BATCH_WAIT_MS) so concurrent callers share a batch.
+    CPU-bound. Must never raise silently.
+    """
+    if text and text.strip():
+        entry = _cache_get(_cache_key(text), return_sparse)
+        if entry is not None:
+            metrics.counter(
+                "observer_text_embed_cache_total",
+                "Text embedding cache lookups",
+                result="hit",
+            ).inc()
+            return _result(entry, return_sparse)
+
+        batcher = _get_batcher()
+        if batcher is not None:
+            # Errors were logged by embed_texts_batch in the batcher thread
+            return batcher.submit(text, return_sparse).result()
+
+    return embed_texts_batch([text], return_sparse)[0]
+
+
+async def embed_text(text: str, return_sparse: bool = False):
     """
     Async wrapper for text embedding.
 
     Safe to await.
-    Offloads CPU-bound work to thread executor.
+    Offloads CPU-bound work to the micro-batcher or a thread executor.
     """
     try:
         loop = asyncio.get_running_loop()
@@ -90,10 +443,15 @@ async def embed_text(text: str) -> List[float]:
         raise
 
     try:
+        batcher = _get_batcher()
+        if batcher is not None and text and text.strip():
+            return await asyncio.wrap_future(batcher.submit(text, return_sparse))
+
         return await loop.run_in_executor(
             None,
             embed_text_sync,
             text,
+            return_sparse,
         )
     except Exception:
         # Error already logged in sync function
@@ -1,10 +1,18 @@
 import os
-from management.supervisor import Supervisor
-from utils.logger import logger
 from dotenv import load_dotenv
 
+# Before any application import: settings.py reads the environment at import
 load_dotenv()
 
+from utils.startup_profiler import startup_profiler
+
+# Before the application imports, so their cost is measured
+startup_profiler.start_from_env()
+
+with startup_profiler.phase("import supervisor"):
+    from management.supervisor import Supervisor
+from utils.logger import logger
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 CONFIG_PATH = os.path.join(
@@ -0,0 +1,91 @@
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+from utils.logger import logger
+
+
+class ConfigWatcher:
+    """
+    Polls a file's mtime/size and calls on_change() when it changes.
+
+    Polling works the same on every platform and with editors that
+    replace the file instead of writing it in place. A change is only
+    reported once the file has been stable for one poll interval, so a
+    half-written file is not picked up.
+
+    Must never crash the application.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[], None],
+        poll_interval: float = 2.0,
+    ):
+        self.path = path
+        self.on_change = on_change
+        self._poll_interval = poll_interval
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch_loop,
+            name="ConfigWatcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+        logger.log(
+            f"ConfigWatcher started | path={self.path} interval={self._poll_interval}s"
+        )
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+
+        self._stop_event.set()
+        self._thread.join(timeout=self._poll_interval + 1.0)
+        self._thread = None
+        logger.log("ConfigWatcher stopped")
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+    def _watch_loop(self) -> None:
+        """
+        Runs in a background thread and must never raise.
+        """
+        applied = self._stat()
+        pending = None
+
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                current = self._stat()
+                if current is None or current == applied:
+                    pending = None
+                    continue
+
+                if current != pending:
+                    # Changed since the last poll: wait until it settles
+                    pending = current
+                    continue
+
+                applied = current
+                pending = None
+
+                logger.log(f"Configuration file changed | path={self.path}")
+                self.on_change()
+
+            except Exception as e:
+                logger.error("ConfigWatcher iteration failed", exc_info=e)
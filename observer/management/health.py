@@ -0,0 +1,375 @@
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+@dataclass
+class ProbeResult:
+    name: str
+    ok: bool
+    latency_ms: float
+    error: Optional[str] = None
+    checked_at: float = 0.0
+
+
+def http_probe(url: str, timeout: float = 3.0, require_ok: bool = True) -> Callable[[], None]:
+    """
+    Probe that GETs 'url' and raises on failure. With require_ok=False any
+    HTTP response below 500 counts as reachable (endpoints that only
+    accept POST).
+    """
+    def probe() -> None:
+        resp = requests.get(url, timeout=timeout)
+        if require_ok and resp.status_code >= 400:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+        if resp.status_code >= 500:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+
+    return probe
+
+
+class HealthMonitor:
+    """
+    Tracks camera, pipeline, dependency and model health, and restarts
+    stalled cameras.
+
+    A background thread evaluates cameras every check_interval and runs
+    dependency probes every probe_interval; the HTTP handlers only read
+    the cached report, so /health and /ready are cheap.
+
+    A camera is stalled when no new frame arrived for stall_seconds (or
+    its loop thread died). Stalled cameras are restarted through
+    CameraManager.restart_camera(), at most once per restart_cooldown,
+    unless they are paused, replaying, or an RTSP source that is already
+    reconnecting on its own. A snapshot stuck in the pipeline is reported
+    but cannot be restarted (the thread is blocked in user code).
+    Pipelines that failed to initialize (missing_pipelines) are reported
+    under pipeline.missing and make the report degraded.
+    Must never raise.
+    """
+
+    def __init__(
+        self,
+        camera_manager,
+        *,
+        embedding_pool=None,
+        probes: Optional[Dict[str, Callable[[], None]]] = None,
+        model_states: Optional[Dict[str, Callable[[], str]]] = None,
+        missing_pipelines: Optional[Callable[[], Dict]] = None,
+        check_interval: float = 5.0,
+        probe_interval: float = 30.0,
+        stall_seconds: float = 30.0,
+        pipeline_stuck_seconds: float = 120.0,
+        auto_restart: bool = True,
+        restart_cooldown: float = 60.0,
+    ):
+        self._camera_manager = camera_manager
+        self._embedding_pool = embedding_pool
+        self._probes = probes or {}
+        self._model_states = model_states or {}
+        self._missing_pipelines = missing_pipelines
+
+        self._check_interval = check_interval
+        self._probe_interval = probe_interval
+        self._stall_seconds = stall_seconds
+        self._pipeline_stuck_seconds = pipeline_stuck_seconds
+        self._auto_restart = auto_restart
+        self._restart_cooldown = restart_cooldown
+
+        self._lock = threading.Lock()
+        self._report: Dict = {"status": "starting", "cameras": {}}
+        self._probe_results: Dict[str, ProbeResult] = {}
+        self._last_probe_at = float("-inf")
+
+        self._last_restart: Dict[str, float] = {}
+        self._restarts: Dict[str, int] = {}
+
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # -------- lifecycle --------
+
+    def start(self) -> None:
+        if self._running:
+            return
+
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="HealthMonitor",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.log(
+            f"HealthMonitor started | stall={self._stall_seconds}s "
+            f"auto_restart={self._auto_restart} probes={sorted(self._probes)}"
+        )
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self._check_interval + 5)
+            self._thread = None
+        logger.log("HealthMonitor stopped")
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                now = time.monotonic()
+                if now - self._last_probe_at >= self._probe_interval:
+                    self._last_probe_at = now
+                    self._run_probes()
+
+                self._evaluate()
+
+            except Exception as e:
+                # Health checks must never die silently
+                logger.error("HealthMonitor iteration failed", exc_info=e)
+
+            self._stop_event.wait(self._check_interval)
+
+    # -------- checks --------
+
+    def _run_probes(self) -> None:
+        for name, probe in self._probes.items():
+            started = time.perf_counter()
+            error = None
+            try:
+                probe()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            result = ProbeResult(
+                name=name,
+                ok=error is None,
+                latency_ms=round(latency_ms, 1),
+                error=error,
+                checked_at=time.time(),
+            )
+
+            previous = self._probe_results.get(name)
+            if previous is not None and previous.ok != result.ok:
+                if result.ok:
+                    logger.log(f"Dependency '{name}' reachable again")
+                else:
+                    logger.warning(f"Dependency '{name}' unreachable | {error}")
+
+            with self._lock:
+                self._probe_results[name] = result
+
+            metrics.gauge(
+                "observer_dependency_up",
+                "1 when the last dependency probe succeeded",
+                dependency=name,
+            ).set(1 if result.ok else 0)
+            metrics.histogram(
+                "observer_dependency_probe_seconds",
+                "Dependency probe latency",
+                dependency=name,
+            ).observe(latency_ms / 1000)
+
+    def _evaluate(self) -> None:
+        cameras = {}
+        stalled: List[str] = []
+        stuck: List[str] = []
+
+        for camera_id, client in self._camera_manager.get_camera_clients().items():
+            health = client.get_health()
+            state = self._camera_state(health)
+            health["state"] = state
+            health["restarts"] = self._restarts.get(camera_id, 0)
+            cameras[camera_id] = health
+
+            if health.get("last_frame_age") is not None:
+                metrics.gauge(
+                    "observer_camera_frame_age_seconds",
+                    "Seconds since the camera produced a frame",
+                    camera=camera_id,
+                ).set(health["last_frame_age"])
+            metrics.gauge(
+                "observer_pipeline_lag_seconds",
+                "Snapshot processing time above the snapshot period (EMA)",
+                camera=camera_id,
+            ).set(health.get("pipeline_lag_seconds", 0.0))
+
+            if state == "stalled":
+                stalled.append(camera_id)
+                self._maybe_restart(camera_id, client, health)
+            elif state == "pipeline_stuck":
+                stuck.append(camera_id)
+
+        pipeline = {
+            "in_flight": sum(
+                1 for health in cameras.values()
+                if health.get("pipeline_busy_seconds", 0.0) > 0
+            ),
+        }
+        if self._embedding_pool is not None:
+            try:
+                pipeline["embedding_pool"] = self._embedding_pool.get_stats()
+            except Exception as e:
+                pipeline["embedding_pool"] = {"error": str(e)}
+
+        missing = {}
+        if self._missing_pipelines is not None:
+            try:
+                missing = self._missing_pipelines()
+            except Exception as e:
+                missing = {"error": {"error": str(e)}}
+            pipeline["missing"] = missing
+
+        models = {}
+        for name, state_fn in self._model_states.items():
+            try:
+                models[name] = state_fn()
+            except Exception as e:
+                models[name] = f"error: {e}"
+
+        with self._lock:
+            dependencies = {
+                name: asdict(result) for name, result in self._probe_results.items()
+            }
+
+        healthy = not stalled and not stuck and not missing
+        self._set_report({
+            "status": "ok" if healthy else "degraded",
+            "healthy": healthy,
+            "checked_at": time.time(),
+            "cameras": cameras,
+            "stalled_cameras": stalled,
+            "stuck_pipelines": stuck,
+            "pipeline": pipeline,
+            "dependencies": dependencies,
+            "models": models,
+        })
+
+    def _camera_state(self, health: Dict) -> str:
+        if not health.get("running"):
+            return "stopped"
+        if health.get("replay"):
+            return "replay"
+        if health.get("finished"):
+            # Non-looping video file at end of stream: restarting would
+            # replay it from the start
+            return "finished"
+        if health.get("paused"):
+            return "paused"
+
+        if health.get("pipeline_busy_seconds", 0.0) > self._pipeline_stuck_seconds:
+            return "pipeline_stuck"
+
+        if not health.get("thread_alive"):
+            return "stalled"
+
+        frame_age = health.get("last_frame_age")
+        if frame_age is None:
+            # No frame yet: give the source stall_seconds to connect
+            if health.get("uptime_seconds", 0.0) > self._stall_seconds:
+                return "stalled"
+            return "starting"
+
+        if frame_age > self._stall_seconds:
+            return "stalled"
+
+        return "ok"
+
+    def _maybe_restart(self, camera_id: str, client, health: Dict) -> None:
+        if not self._auto_restart:
+            return
+
+        # Self-healing sources (RtspCamera) reconnect with their own backoff
+        get_stats = getattr(client.camera_source, "get_stats", None)
+        if get_stats is not None and health.get("thread_alive"):
+            try:
+                if get_stats().get("state") in ("connecting", "reconnecting"):
+                    return
+            except Exception:
+                pass
+
+        now = time.monotonic()
+        if now - self._last_restart.get(camera_id, float("-inf")) < self._restart_cooldown:
+            return
+        self._last_restart[camera_id] = now
+
+        frame_age = health.get("last_frame_age")
+        if not health.get("thread_alive"):
+            reason = "snapshot loop thread not alive"
+        elif frame_age is not None:
+            reason = f"no frame for {frame_age:.0f}s"
+        else:
+            reason = "no frame since start"
+
+        if self._camera_manager.restart_camera(camera_id, reason=reason):
+            self._restarts[camera_id] = self._restarts.get(camera_id, 0) + 1
+            metrics.counter(
+                "observer_camera_restarts_total",
+                "Automatic restarts of stalled cameras",
+                camera=camera_id,
+            ).inc()
+
+    # -------- report --------
+
+    def _set_report(self, report: Dict) -> None:
+        with self._lock:
+            self._report = report
+
+    def get_report(self) -> Dict:
+        with self._lock:
+            return dict(self._report)
+
+    def readiness(self) -> Tuple[bool, List[str]]:
+        """
+        Ready once every active camera produced a frame, dependencies are
+        reachable, no model is loading or failed to load and every
+        configured pipeline is running.
+        """
+        report = self.get_report()
+        reasons = []
+
+        if not self._running:
+            reasons.append("health monitor not running")
+
+        for camera_id, health in report.get("cameras", {}).items():
+            if health.get("state") in ("starting", "stalled"):
+                reasons.append(f"camera {camera_id} {health['state']}")
+
+        for name, result in report.get("dependencies", {}).items():
+            if not result.get("ok"):
+                reasons.append(f"dependency {name} unreachable")
+        if self._probes and not report.get("dependencies"):
+            reasons.append("dependencies not probed yet")
+
+        for name in report.get("pipeline", {}).get("missing", {}):
+            reasons.append(f"pipeline {name} not initialized")
+
+        for name, state in report.get("models", {}).items():
+            if state in ("loading", "failed") or str(state).startswith("error"):
+                reasons.append(f"model {name} {state}")
+
+        return not reasons, reasons
+
+    # -------- HTTP handlers (StatusServer routes) --------
+
+    def health_response(self):
+        report = self.get_report()
+        status = "200 OK" if report.get("status") != "degraded" else "503 Service Unavailable"
+        return status, "application/json", json.dumps(report, default=str)
+
+    def ready_response(self):
+        ready, reasons = self.readiness()
+        status = "200 OK" if ready else "503 Service Unavailable"
+        return status, "application/json", json.dumps({"ready": ready, "reasons": reasons})
@@ -0,0 +1,153 @@
+import time
+from typing import Callable, List, Optional
+
+from config import settings
+from utils.logger import logger
+from vector_store.base import VectorStore
+from vector_store.factory import get_vector_store
+from vector_store.image_index import ImageIndex
+from vector_store.retention import ImageRetention, parse_tiers
+from vector_store.text_index import TextIndex
+
+
+# Per-camera pipeline state that grows with every camera ever seen
+_PER_CAMERA_CACHES = (
+    "prev_frame_embedding",
+    "rolling_embedding",
+    "prev_image_embedding",
+    "prev_rolling_context",
+)
+
+
+class MaintenanceJobs:
+    """
+    Periodic maintenance, run by the Scheduler off the capture threads:
+
+    - retention: thin older image points to per-bucket representatives,
+      expire image/text points older than RETENTION_DAYS
+    - anchor_recompaction: prune weak cycle training anchors (no-op
+      while no camera uses the cycle training pipeline)
+    - qdrant_snapshot: snapshot collections, keep the newest few
+    - cache_cleanup: drop pipeline state of cameras that were removed
+    - text_hybrid_migration: move the legacy dense-only text collection
+      into the hybrid one (no-op once it is empty)
+
+    Qdrant indexes are created lazily on first use, in the job thread.
+    """
+
+    def __init__(self, pipelines: Callable[[], List[object]], camera_manager):
+        # Called on every run: pipelines can be added by a config reload
+        self._pipelines = pipelines
+        self._camera_manager = camera_manager
+        self._qdrant: Optional[VectorStore] = None
+        self._text_index: Optional[TextIndex] = None
+        self._image_retention: Optional[ImageRetention] = None
+
+    def register(self, scheduler) -> None:
+        jitter = settings.SCHEDULER_JITTER_SECONDS
+
+        if settings.RETENTION_DAYS > 0:
+            scheduler.add_interval_job(
+                "retention",
+                self.prune_retention,
+                settings.RETENTION_INTERVAL_SECONDS,
+                jitter=jitter,
+            )
+
+        scheduler.add_interval_job(
+            "anchor_recompaction",
+            self.recompact_anchors,
+            settings.ANCHOR_RECOMPACT_INTERVAL_SECONDS,
+            jitter=jitter,
+        )
+
+        if settings.QDRANT_SNAPSHOT_CRON:
+            scheduler.add_cron_job(
+                "qdrant_snapshot",
+                self.snapshot_collections,
+                settings.QDRANT_SNAPSHOT_CRON,
+                jitter=jitter,
+            )
+
+        scheduler.add_interval_job(
+            "cache_cleanup",
+            self.cleanup_caches,
+            settings.CACHE_CLEANUP_INTERVAL_SECONDS,
+            jitter=jitter,
+        )
+
+        if settings.TEXT_HYBRID_ENABLED:
+            scheduler.add_interval_job(
+                "text_hybrid_migration",
+                self.migrate_text_index,
+                settings.RETENTION_INTERVAL_SECONDS,
+                jitter=jitter,
+                run_on_start=True,
+            )
+
+    # -------- jobs --------
+
+    def prune_retention(self) -> None:
+        cutoff = time.time() - settings.RETENTION_DAYS * 86400
+
+        self._get_image_retention().run()
+        self._get_text_index().delete_older_than(cutoff)
+
+        logger.log(f"Retention pruning done | older_than_days={settings.RETENTION_DAYS}")
+
+    def recompact_anchors(self) -> None:
+        for pipeline in self._pipelines():
+            if hasattr(pipeline, "recompact_anchors"):
+                pipeline.recompact_anchors()
+
+    def snapshot_collections(self) -> None:
+        qdrant = self._get_qdrant()
+        for collection in (ImageIndex.COLLECTION_NAME, TextIndex.COLLECTION_NAME):
+            name = qdrant.create_snapshot(collection, keep=settings.QDRANT_SNAPSHOT_KEEP)
+            logger.log(f"Qdrant snapshot created | collection={collection} snapshot={name}")
+
+    def migrate_text_index(self) -> None:
+        from embeddings.text_embeddings import embed_texts_batch
+
+        self._get_text_index().migrate_legacy(
+            lambda texts: embed_texts_batch(texts, return_sparse=True)
+        )
+
+    def cleanup_caches(self) -> None:
+        active = set(self._camera_manager.get_camera_clients())
+
+        removed = 0
+        for pipeline in self._pipelines():
+            for attribute in _PER_CAMERA_CACHES:
+                cache = getattr(pipeline, attribute, None)
+                if not isinstance(cache, dict):
+                    continue
+                # Snapshot first: camera threads write these dicts concurrently
+                for camera_id in [key for key in list(cache) if key not in active]:
+                    cache.pop(camera_id, None)
+                    removed += 1
+
+        if removed:
+            logger.log(f"Cache cleanup removed {removed} entries of inactive cameras")
+
+    # -------- lazy resources --------
+
+    def _get_qdrant(self) -> VectorStore:
+        if self._qdrant is None:
+            self._qdrant = get_vector_store()
+        return self._qdrant
+
+    def _get_image_retention(self) -> ImageRetention:
+        if self._image_retention is None:
+            self._image_retention = ImageRetention(
+                qdrant=self._get_qdrant(),
+                full_density_hours=settings.RETENTION_FULL_DENSITY_HOURS,
+                tiers=parse_tiers(settings.RETENTION_TIERS),
+                horizon_hours=settings.RETENTION_DAYS * 24,
+            )
+        return self._image_retention
+
+    def _get_text_index(self) -> TextIndex:
+        if self._text_index is None:
+            self._text_index = TextIndex(qdrant=self._get_qdrant())
+        return self._text_index
@@ -0,0 +1,344 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+class IntervalTrigger:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = float(seconds)
+
+    def next_after(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class CronTrigger:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month
+    day-of-week (0 or 7 = Sunday). Fields accept '*', 'a-b', lists and
+    '/step'. When both day fields are restricted, either may match
+    (classic cron semantics). Local time.
+    """
+
+    _FIELDS = (
+        ("minute", 0, 59),
+        ("hour", 0, 23),
+        ("day", 1, 31),
+        ("month", 1, 12),
+        ("weekday", 0, 7),
+    )
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+
+        self.expression = expression
+        values = [
+            self._parse_field(part, low, high)
+            for part, (_, low, high) in zip(parts, self._FIELDS)
+        ]
+        self._minutes, self._hours, self._days, self._months, weekdays = values
+        self._weekdays = {0 if day == 7 else day for day in weekdays}
+
+        self._days_restricted = parts[2] != "*"
+        self._weekdays_restricted = parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+
+        for item in field.split(","):
+            step = 1
+            if "/" in item:
+                item, step_text = item.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: '{field}'")
+
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start_text, end_text = item.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range: '{field}'")
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        # Python: Monday=0; cron: Sunday=0
+        weekday = (moment.weekday() + 1) % 7
+
+        if self._days_restricted and self._weekdays_restricted:
+            return moment.day in self._days or weekday in self._weekdays
+        return moment.day in self._days and weekday in self._weekdays
+
+    def next_after(self, now: datetime) -> datetime:
+        moment = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+
+        while moment < limit:
+            if moment.month not in self._months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+                continue
+
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+
+            if moment.hour not in self._hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+
+            if moment.minute not in self._minutes:
+                moment += timedelta(minutes=1)
+                continue
+
+            return moment
+
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def __str__(self) -> str:
+        return f"cron '{self.expression}'"
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], None],
+        trigger,
+        jitter: float = 0.0,
+        run_on_start: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = max(0.0, jitter)
+        self.run_on_start = run_on_start
+
+        self.running = False
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_duration = 0.0
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def status(self) -> Dict:
+        return {
+            "name": self.name,
+            "trigger": str(self.trigger),
+            "running": self.running,
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            "last_run": self.last_run.isoformat(timespec="seconds") if self.last_run else None,
+            "last_duration_seconds": round(self.last_duration, 3),
+            "last_error": self.last_error,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+        }
+
+
+class Scheduler:
+    """
+    Periodic maintenance jobs on the Supervisor's asyncio loop.
+
+    Each job has its own loop task that sleeps until the next trigger
+    time (plus random jitter, so jobs do not stampede Qdrant together)
+    and runs the blocking job function on a small dedicated thread pool,
+    never on capture threads or the event loop itself. A job never
+    overlaps with itself: the next run is scheduled after the previous
+    one finished, and run_now() skips a job that is still running.
+    Must never raise.
+    """
+
+    def __init__(self, *, loop: asyncio.AbstractEventLoop, max_workers: int = 2):
+        self._loop = loop
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="SchedulerJob",
+        )
+        self._running = False
+
+    # -------- registration --------
+
+    def add_interval_job(
+        self,
+        name: str,
+        func: Callable[[], None],
+        seconds: float,
+        jitter: float = 0.0,
+        run_on_start: bool = False,
+    ) -> None:
+        self._add_job(Job(name, func, IntervalTrigger(seconds), jitter, run_on_start))
+
+    def add_cron_job(
+        self,
+        name: str,
+        func: Callable[[], None],
+        expression: str,
+        jitter: float = 0.0,
+    ) -> None:
+        self._add_job(Job(name, func, CronTrigger(expression), jitter))
+
+    def _add_job(self, job: Job) -> None:
+        if job.name in self._jobs:
+            raise ValueError(f"Duplicate job name '{job.name}'")
+        self._jobs[job.name] = job
+
+        if self._running:
+            self._loop.call_soon_threadsafe(self._start_job_task, job)
+
+    # -------- lifecycle --------
+
+    def start(self) -> None:
+        if self._running:
+            return
+
+        self._running = True
+        for job in self._jobs.values():
+            self._loop.call_soon_threadsafe(self._start_job_task, job)
+
+        logger.log(
+            "Scheduler started | jobs="
+            + ", ".join(f"{job.name} ({job.trigger})" for job in self._jobs.values())
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if not self._running:
+            return
+
+        self._running = False
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self._loop)
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.error("Failed to cancel scheduler tasks", exc_info=e)
+
+        # Running jobs finish on their own; do not block shutdown on them
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.log("Scheduler stopped")
+
+    async def _cancel_tasks(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start_job_task(self, job: Job) -> None:
+        if job.name not in self._tasks:
+            self._tasks[job.name] = self._loop.create_task(
+                self._job_loop(job),
+                name=f"Scheduler-{job.name}",
+            )
+
+    # -------- execution --------
+
+    def _schedule_next(self, job: Job) -> float:
+        now = datetime.now()
+        job.next_run = job.trigger.next_after(now)
+        if job.jitter:
+            job.next_run += timedelta(seconds=random.uniform(0, job.jitter))
+        return max(0.0, (job.next_run - now).total_seconds())
+
+    async def _job_loop(self, job: Job) -> None:
+        try:
+            if job.run_on_start:
+                await self._run_job(job)
+
+            while self._running:
+                await asyncio.sleep(self._schedule_next(job))
+                if not self._running:
+                    break
+                await self._run_job(job)
+
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Scheduler loop for job '{job.name}' failed", exc_info=e)
+
+    async def _run_job(self, job: Job) -> None:
+        if job.running:
+            job.skipped += 1
+            metrics.counter(
+                "observer_job_runs_total",
+                "Scheduled job runs by result",
+                job=job.name,
+                result="skipped",
+            ).inc()
+            return
+
+        job.running = True
+        job.last_run = datetime.now()
+        started = time.perf_counter()
+        result = "ok"
+
+        try:
+            await self._loop.run_in_executor(self._executor, job.func)
+            job.last_error = None
+        except Exception as e:
+            result = "error"
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Scheduled job '{job.name}' failed", exc_info=e)
+        finally:
+            job.running = False
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+
+            metrics.histogram(
+                "observer_job_seconds",
+                "Scheduled job duration",
+                job=job.name,
+            ).observe(job.last_duration)
+            metrics.counter(
+                "observer_job_runs_total",
+                "Scheduled job runs by result",
+                job=job.name,
+                result=result,
+            ).inc()
+
+        logger.log(
+            f"Scheduled job '{job.name}' finished | result={result} "
+            f"duration={job.last_duration:.2f}s"
+        )
+
+    def run_now(self, name: str) -> bool:
+        """
+        Trigger a job immediately (thread-safe). Skipped while it runs.
+        """
+        job = self._jobs.get(name)
+        if job is None or not self._running:
+            return False
+        asyncio.run_coroutine_threadsafe(self._run_job(job), self._loop)
+        return True
+
+    # -------- status --------
+
+    def get_status(self) -> List[Dict]:
+        return [job.status() for job in self._jobs.values()]
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from utils.logger import logger
+
+
+# handler() -> (status, content_type, body)
+RouteHandler = Callable[[], Tuple[str, str, str]]
+
+# async handler(query params) -> (status, content_type, body)
+QueryRouteHandler = Callable[[Dict[str, str]], Awaitable[Tuple[str, str, str]]]
+
+
+class StatusServer:
+    """
+    Minimal HTTP/1.1 GET endpoint for operational status
+    (/metrics, ...), served on the Supervisor's asyncio loop.
+
+    Handlers run in the default executor so slow ones (dependency
+    probes) never block WebSocket traffic on the same loop. Query routes
+    are coroutines taking the query string parameters; they must do
+    their own blocking work off the loop.
+    """
+
+    _READ_TIMEOUT_SECONDS = 5.0
+
+    def __init__(
+        self,
+        *,
+        loop: asyncio.AbstractEventLoop,
+        host: str = "127.0.0.1",
+        port: int = 9108,
+    ):
+        self._loop = loop
+        self._host = host
+        self._port = port
+        self._routes: Dict[str, RouteHandler] = {}
+        self._query_routes: Dict[str, QueryRouteHandler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_route(self, path: str, handler: RouteHandler) -> None:
+        self._routes[path] = handler
+
+    def add_query_route(self, path: str, handler: QueryRouteHandler) -> None:
+        self._query_routes[path] = handler
+
+    def start_threadsafe(self) -> None:
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.start(), self._loop)
+            future.result(timeout=10)
+        except Exception as e:
+            logger.error("Failed to start status server", exc_info=e)
+
+    def stop_threadsafe(self) -> None:
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.stop(), self._loop)
+            future.result(timeout=10)
+        except Exception as e:
+            logger.error("Failed to stop status server", exc_info=e)
+
+    async def start(self) -> None:
+        if self._server:
+            return
+
+        try:
+            self._server = await asyncio.start_server(
+                self._handle_client,
+                self._host,
+                self._port,
+            )
+            logger.log(
+                f"Status server started | http://{self._host}:{self._port} "
+                f"routes={sorted([*self._routes, *self._query_routes])}"
+            )
+        except Exception as e:
+            logger.error("Status server startup failed", exc_info=e)
+
+    async def stop(self) -> None:
+        try:
+            if self._server:
+                self._server.close()
+                await self._server.wait_closed()
+                self._server = None
+                logger.log("Status server stopped")
+        except Exception as e:
+            logger.error("Status server shutdown failed", exc_info=e)
+
+    async def _handle_client(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            raw = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"),
+                timeout=self._READ_TIMEOUT_SECONDS,
+            )
+            request_line = raw.split(b"\r\n", 1)[0].decode("latin-1").split()
+
+            if len(request_line) < 2:
+                status, content_type, body = "400 Bad Request", "text/plain", "Bad request\n"
+            elif request_line[0] not in ("GET", "HEAD"):
+                status, content_type, body = "405 Method Not Allowed", "text/plain", "GET only\n"
+            else:
+                path, _, query = request_line[1].partition("?")
+                handler = self._routes.get(path)
+                query_handler = self._query_routes.get(path)
+                if query_handler is not None:
+                    status, content_type, body = await query_handler(dict(parse_qsl(query)))
+                elif handler is None:
+                    status, content_type, body = "404 Not Found", "text/plain", "Not found\n"
+                else:
+                    status, content_type, body = await self._loop.run_in_executor(None, handler)
+
+            payload = body.encode("utf-8")
+            head = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Cache-Control: no-store\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+            ).encode("ascii")
+
+            if request_line and request_line[0] == "HEAD":
+                payload = b""
+
+            writer.write(head + payload)
+            await writer.drain()
+
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error("Status server request failed", exc_info=e)
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
@@ -1,3 +1,4 @@
+import json
 import signal
 import sys
 import time
@@ -6,17 +7,22 @@ import asyncio
 import threading
 from utils.logger import logger
 from cameras.camera_manager import CameraManager
-from processing.image_pipeline import ImagePipeline
-from processing.cycle_traning_image_pipeline import CycleTrainingImagePipeline
-from processing.cycle_image_pipeline import CycleImagePipeline
+from management.config_watcher import ConfigWatcher
+from management.health import HealthMonitor, http_probe
+from management.maintenance import MaintenanceJobs
+from management.scheduler import Scheduler
+from management.status_server import StatusServer
+from embeddings.model_manager import model_manager
+from embeddings.embedding_workers import EmbeddingWorkerPool
+from processing.pipeline_router import PipelineRouter
+from processing.query_service import QueryService
 from websocket.schemas import StreamConfig
 from websocket.server import WebSocketServer
+from utils.metrics import metrics
+from utils.startup_profiler import startup_profiler
+from vector_store.factory import get_vector_store
 from config import settings
 
-USE_IMAGE_PIPELINE = False
-USE_CYCLE_TRINING_PIPELINE = True
-USE_CYCLE_PIPELINE = False
-
 class Supervisor:
     """
     Top-level application supervisor.
@@ -29,23 +35,36 @@ class Supervisor:
         self.camera_manager = None
         self.qt_app = None
         self._running = False
-        self.image_pipeline = self.get_pipeline_object()
+        self._stopping = False
+        # Replay ended before start() completed: stop once it does
+        self._stop_after_start = False
+        self._state_lock = threading.Lock()
+        self.embedding_pool = self._create_embedding_pool()
+        self.pipeline_router = PipelineRouter(
+            embedding_pool=self.embedding_pool,
+            event_callback=self._publish_pipeline_event,
+        )
         self._loop = None
         self._loop_thread = None
         self.websocket_server = None
+        self.config_watcher = None
+        self.status_server = None
+        self.health_monitor = None
+        self.scheduler = None
+        self.query_service = None
+
+    def _create_embedding_pool(self):
+        if settings.EMBEDDING_WORKERS <= 0:
+            return None
+
+        return EmbeddingWorkerPool(
+            num_workers=settings.EMBEDDING_WORKERS,
+            cores_per_worker=settings.EMBEDDING_WORKER_CORES,
+        )
 
-    def get_pipeline_object(self):
-        if USE_IMAGE_PIPELINE:
-            return ImagePipeline()
-        elif USE_CYCLE_TRINING_PIPELINE:
-            return CycleTrainingImagePipeline()
-        elif USE_CYCLE_PIPELINE:
-            return CycleImagePipeline(
-                event_callback=self._publish_pipeline_event,
-            )
-    
     def start(self):
         logger.log("Supervisor starting")
+        startup_profiler.checkpoint()
 
         try:
             # -------------------------------------------------
@@ -64,22 +83,50 @@ class Supervisor:
             )
             self._loop_thread.start()
 
+            if settings.METRICS_ENABLED:
+                metrics.enabled = True
+                metrics.start_summary_logger(settings.METRICS_SUMMARY_INTERVAL_SECONDS)
+
+            startup_profiler.checkpoint("event loop")
+
+            # -------------------------------------------------
+            # 2. Start embedding worker processes (optional)
+            # -------------------------------------------------
+            if self.embedding_pool:
+                self.embedding_pool.start()
+
+            startup_profiler.checkpoint("embedding workers")
+
             # -------------------------------------------------
-            # 2. Initialize CameraManager (sync world)
+            # 3. Initialize CameraManager (sync world), the pipelines
+            #    of its cameras, and load the models they need in the
+            #    background (with warm-up)
             # -------------------------------------------------
             self.camera_manager = CameraManager(
                 config_path=self.cameras_config_path,
                 on_camera_snapshot=self.on_camera_snapshot,
+                on_replay_finished=self._on_replay_finished,
+                wait_replay_ready=self.pipeline_router.wait_ready,
             )
 
             self.camera_manager.load()
+
+            with startup_profiler.phase("pipeline init"):
+                self.pipeline_router.configure(
+                    self.camera_manager.get_camera_configs().values()
+                )
+
+            model_manager.start(self._required_models())
+
             self.camera_manager.start()
 
             # Qt app (if exists)
             self.qt_app = self.camera_manager._qt_app
 
+            startup_profiler.checkpoint("camera manager")
+
             # -------------------------------------------------
-            # 3. Initialize local WebSocket streaming endpoint
+            # 4. Initialize local WebSocket streaming endpoint
             # -------------------------------------------------
             if settings.WEBSOCKET_ENABLED:
                 self.websocket_server = WebSocketServer(
@@ -91,12 +138,81 @@ class Supervisor:
                         default_display_fps=settings.WEBSOCKET_DISPLAY_FPS,
                         jpeg_quality=settings.WEBSOCKET_JPEG_QUALITY,
                         max_width=settings.WEBSOCKET_MAX_WIDTH,
+                        compression_enabled=settings.WEBSOCKET_COMPRESSION_ENABLED,
+                        compression_level=settings.WEBSOCKET_COMPRESSION_LEVEL,
+                        compression_min_bytes=settings.WEBSOCKET_COMPRESSION_MIN_BYTES,
+                        event_flush_interval=settings.WEBSOCKET_EVENT_FLUSH_MS / 1000.0,
                     ),
                 )
                 self.websocket_server.start_threadsafe()
 
-            self._running = True
+            startup_profiler.checkpoint("websocket server")
+
+            # -------------------------------------------------
+            # 5. Watch camera configuration for hot reload
+            # -------------------------------------------------
+            if settings.CAMERA_CONFIG_WATCH_ENABLED:
+                self.config_watcher = ConfigWatcher(
+                    path=self.cameras_config_path,
+                    on_change=self._reload_cameras,
+                    poll_interval=settings.CAMERA_CONFIG_POLL_SECONDS,
+                )
+                self.config_watcher.start()
+
+            startup_profiler.checkpoint("config watcher")
+
+            # -------------------------------------------------
+            # 6. Health monitoring (stalled camera restarts)
+            # -------------------------------------------------
+            if settings.HEALTH_ENABLED:
+                self.health_monitor = self._create_health_monitor()
+                self.health_monitor.start()
+
+            startup_profiler.checkpoint("health monitor")
+
+            # -------------------------------------------------
+            # 7. Periodic maintenance jobs (retention, snapshots, ...)
+            # -------------------------------------------------
+            if settings.SCHEDULER_ENABLED:
+                self.scheduler = Scheduler(loop=self._loop)
+                MaintenanceJobs(
+                    pipelines=self.pipeline_router.get_pipelines,
+                    camera_manager=self.camera_manager,
+                ).register(self.scheduler)
+                self.scheduler.start()
+
+            startup_profiler.checkpoint("scheduler")
+
+            # -------------------------------------------------
+            # 8. Local HTTP status endpoint (/metrics, /health, /ready, /jobs, /search)
+            # -------------------------------------------------
+            if settings.STATUS_HTTP_ENABLED:
+                self.status_server = StatusServer(
+                    loop=self._loop,
+                    host=settings.STATUS_HTTP_HOST,
+                    port=settings.STATUS_HTTP_PORT,
+                )
+                self.status_server.add_route("/metrics", self._metrics_response)
+                if self.health_monitor:
+                    self.status_server.add_route("/health", self.health_monitor.health_response)
+                    self.status_server.add_route("/ready", self.health_monitor.ready_response)
+                if self.scheduler:
+                    self.status_server.add_route("/jobs", self._jobs_response)
+                if settings.QUERY_ENABLED:
+                    self.query_service = QueryService(store=get_vector_store())
+                    self.status_server.add_query_route("/search", self.query_service.http_response)
+                self.status_server.start_threadsafe()
+
+            startup_profiler.checkpoint("status server")
+
+            with self._state_lock:
+                self._running = True
+                stop_now = self._stop_after_start
             logger.log("Supervisor started")
+            startup_profiler.finish()
+
+            if stop_now:
+                self._stop_in_background()
 
         except Exception as e:
             # -------------------------------------------------
@@ -117,11 +233,38 @@ class Supervisor:
 
 
     def stop(self):
-        if not self._running:
-            return
+        with self._state_lock:
+            if not self._running or self._stopping:
+                return
+            self._stopping = True
 
         logger.log("Supervisor stopping")
 
+        try:
+            if self.config_watcher:
+                self.config_watcher.stop()
+        except Exception as e:
+            logger.error("Error while stopping ConfigWatcher", exc_info=e)
+
+        try:
+            if self.scheduler:
+                self.scheduler.stop()
+        except Exception as e:
+            logger.error("Error while stopping Scheduler", exc_info=e)
+
+        try:
+            if self.health_monitor:
+                self.health_monitor.stop()
+        except Exception as e:
+            logger.error("Error while stopping HealthMonitor", exc_info=e)
+
+        try:
+            if self.status_server:
+                self.status_server.stop_threadsafe()
+            metrics.stop_summary_logger()
+        except Exception as e:
+            logger.error("Error while stopping status endpoint", exc_info=e)
+
         try:
             if self.websocket_server:
                 self.websocket_server.stop_threadsafe()
@@ -135,6 +278,12 @@ class Supervisor:
             # Non-fatal: shutdown must continue even if a subsystem fails
             logger.error("Error while stopping CameraManager", exc_info=e)
 
+        try:
+            if self.embedding_pool:
+                self.embedding_pool.stop()
+        except Exception as e:
+            logger.error("Error while stopping EmbeddingWorkerPool", exc_info=e)
+
         self._running = False
         logger.log("Supervisor stopped")
 
@@ -144,19 +293,114 @@ class Supervisor:
         except Exception as e:
             logger.error("Error while stopping Supervisor event loop", exc_info=e)
 
+        try:
+            # Returns main.py from qt_app.exec() (dev UI)
+            if self.camera_manager:
+                self.camera_manager.quit_ui()
+        except Exception as e:
+            logger.error("Error while quitting dev UI", exc_info=e)
+
     def on_camera_snapshot(self, snapshot_event):
         """
         Entry point for all camera snapshot events.
         This callback must never raise.
         """
         try:
-            self.image_pipeline.process_snapshot(snapshot_event)
+            self.pipeline_router.process_snapshot(snapshot_event)
         except Exception as e:
             logger.error("Snapshot processing failed", exc_info=e)
 
+    def _reload_cameras(self) -> bool:
+        """
+        Config watcher callback: apply camera changes, then route the
+        cameras to their (possibly changed) pipelines.
+        """
+        reloaded = self.camera_manager.reload()
+        if reloaded:
+            self.pipeline_router.configure(
+                self.camera_manager.get_camera_configs().values()
+            )
+            model_manager.start(self._required_models())
+        return reloaded
+
+    def _required_models(self):
+        models = set(self.pipeline_router.required_models())
+        if self.embedding_pool:
+            # Worker processes load their own CLIP
+            models.discard("clip")
+        return sorted(models)
+
+    def _create_health_monitor(self) -> HealthMonitor:
+        timeout = settings.HEALTH_PROBE_TIMEOUT_SECONDS
+        probes = {
+            # Cloud Function only accepts POST: any non-5xx reply is reachable
+            "vlm": http_probe(settings.VLM_BASE_URL, timeout, require_ok=False),
+        }
+        if settings.VECTOR_STORE_BACKEND == "qdrant":
+            probes["qdrant"] = http_probe(settings.QDRANT_HEALTH_URL, timeout)
+
+        return HealthMonitor(
+            self.camera_manager,
+            embedding_pool=self.embedding_pool,
+            probes=probes,
+            model_states={
+                "clip": lambda: model_manager.state("clip"),
+                "text": lambda: model_manager.state("text"),
+            },
+            missing_pipelines=self.pipeline_router.missing_pipelines,
+            check_interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+            probe_interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            stall_seconds=settings.CAMERA_STALL_SECONDS,
+            pipeline_stuck_seconds=settings.PIPELINE_STUCK_SECONDS,
+            auto_restart=settings.CAMERA_AUTO_RESTART,
+            restart_cooldown=settings.CAMERA_RESTART_COOLDOWN_SECONDS,
+        )
+
+    @staticmethod
+    def _metrics_response():
+        return (
+            "200 OK",
+            "text/plain; version=0.0.4",
+            metrics.render_prometheus(),
+        )
+
+    def _jobs_response(self):
+        return (
+            "200 OK",
+            "application/json",
+            json.dumps(self.scheduler.get_status()),
+        )
+
+    def _on_replay_finished(self):
+        """
+        All replay cameras reached end of stream: shut down so offline
+        runs terminate. If start() has not completed yet (short file, slow
+        startup), it stops once it does. Must never raise.
+        """
+        try:
+            with self._state_lock:
+                if not self._running:
+                    self._stop_after_start = True
+                    logger.log("All replay cameras finished, stopping after startup")
+                    return
+
+            logger.log("All replay cameras finished, stopping Supervisor")
+            self._stop_in_background()
+        except Exception as e:
+            logger.error("Failed to stop Supervisor after replay", exc_info=e)
+
+    def _stop_in_background(self):
+        # stop() joins the camera threads: never run it on one of them
+        threading.Thread(
+            target=self.stop,
+            name="Supervisor-replay-stop",
+            daemon=True,
+        ).start()
+
     def _publish_pipeline_event(self, event):
         """
         Thread-safe bridge from processing pipelines to websocket clients.
+        Events are buffered by the server's EventBus, not sent inline.
         Must never raise.
         """
         try:
@@ -176,8 +420,7 @@ class Supervisor:
 
         logger.log("Supervisor running")
 
-        self._running = True
-
+        # start() set _running; stop() (signal, replay end) clears it
         while self._running:
             try:
                 time.sleep(1)
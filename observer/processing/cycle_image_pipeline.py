@@ -10,10 +10,12 @@ import numpy as np
 
 from config import settings
 from utils.logger import logger
+from utils.metrics import count_gate_decision
 from cameras.camera_events import SnapshotEvent
+from cameras.frame_context import FrameContext
 from cloud.vlm_client import VLMClient
-from embeddings.clip_embeddings import embed_image_sync
-from vector_store.qdrant_wrapper import QdrantClientWrapper
+from embeddings.model_manager import image_embedding_ready
+from vector_store.factory import get_vector_store
 from vector_store.image_index import ImageIndex
 from websocket.schemas import make_event
 
@@ -41,13 +43,18 @@ class CycleImagePipeline:
     - Detect anomalies based on similarity drop
     """
 
+    # Loaded by the Supervisor at startup (in-process embedding)
+    REQUIRED_MODELS = ("clip",)
+
     def __init__(
         self,
         anomaly_threshold: float = 0.97,
         static_frame_threshold: float = 0.995,
         event_callback: Optional[Callable[[dict], None]] = None,
+        embedding_pool=None,
     ):
-        qdrant_client = QdrantClientWrapper()
+        qdrant_client = get_vector_store()
+        self._embedding_pool = embedding_pool
 
         self._image_index = ImageIndex(
             qdrant=qdrant_client,
@@ -73,7 +80,13 @@ class CycleImagePipeline:
         Must never raise.
         """
 
-        curr_embedding = self._get_curr_embedding(event)
+        if event.frame is None:
+            return
+
+        # Embedded once, and reused for the VLM evidence below
+        context = self._frame_context(event)
+
+        curr_embedding = self._get_curr_embedding(event, context)
         if not curr_embedding:
             return
 
@@ -83,7 +96,9 @@ class CycleImagePipeline:
             new_embedding=curr_embedding,
             threshold=self._static_frame_threshold,
         ):
+            count_gate_decision("static_frame", "skip", event.camera_id)
             return
+        count_gate_decision("static_frame", "pass", event.camera_id)
 
         self.prev_frame_embedding[event.camera_id] = curr_embedding
 
@@ -96,8 +111,10 @@ class CycleImagePipeline:
         )
 
         if not matches:
+            count_gate_decision("anomaly", "no_match", event.camera_id)
             self._report_anomaly(
                 event,
+                context,
                 reason="no_similar_vectors",
                 similarity=0.0,
             )
@@ -124,20 +141,28 @@ class CycleImagePipeline:
             )
         )
 
+        count_gate_decision(
+            "anomaly",
+            "normal" if similarity >= self._anomaly_threshold else "anomaly",
+            event.camera_id,
+        )
+
         if similarity < self._anomaly_threshold:
             self._report_anomaly(
                 event,
+                context,
                 reason="similarity_drop",
                 similarity=similarity,
                 anchor_id=anchor_id,
             )
             return
 
-        self._ensure_anchor_description(event, anchor_id)
+        self._ensure_anchor_description(event, context, anchor_id)
 
     def _report_anomaly(
         self,
         event: SnapshotEvent,
+        context: FrameContext,
         reason: str,
         similarity: float,
         anchor_id: Optional[int] = None,
@@ -157,6 +182,7 @@ class CycleImagePipeline:
 
         explanation = self._explain_anomaly(
             event=event,
+            context=context,
             reason=reason,
             similarity=similarity,
             anchor_id=anchor_id,
@@ -174,6 +200,8 @@ class CycleImagePipeline:
                     "anchor_id": anchor_id,
                     "detailed_explanation": explanation["detailed_explanation"],
                     "explanation_status": explanation["status"],
+                    # Capture time of the main-stream frame the VLM saw
+                    "evidence_timestamp": event.evidence_timestamp,
                 },
                 timestamp=event.timestamp,
             )
@@ -189,6 +217,7 @@ class CycleImagePipeline:
     def _explain_anomaly(
         self,
         event: SnapshotEvent,
+        context: FrameContext,
         reason: str,
         similarity: float,
         anchor_id: Optional[int] = None,
@@ -200,7 +229,7 @@ class CycleImagePipeline:
         }
 
         try:
-            image_buffer = self._frame_to_jpeg(event.frame)
+            image_buffer = self._evidence_jpeg(event, context)
             if not image_buffer:
                 fallback["status"] = "missing_image"
                 return fallback
@@ -228,6 +257,7 @@ class CycleImagePipeline:
                     "camera_id": event.camera_id,
                     "anchor_id": anchor_id,
                     "timestamp": event.timestamp,
+                    "evidence_timestamp": event.evidence_timestamp,
                     "technical_reason": reason,
                     "purpose": "cycle_anomaly_explanation",
                 },
@@ -349,6 +379,7 @@ class CycleImagePipeline:
     def _ensure_anchor_description(
         self,
         event: SnapshotEvent,
+        context: FrameContext,
         anchor_id,
     ) -> None:
         try:
@@ -363,7 +394,7 @@ class CycleImagePipeline:
             if os.path.exists(description_path):
                 return
 
-            image_buffer = self._frame_to_jpeg(event.frame)
+            image_buffer = self._evidence_jpeg(event, context)
             if not image_buffer:
                 return
 
@@ -382,6 +413,7 @@ class CycleImagePipeline:
                     "camera_id": event.camera_id,
                     "anchor_id": anchor_id,
                     "timestamp": event.timestamp,
+                    "evidence_timestamp": event.evidence_timestamp,
                     "purpose": "cycle_anchor_description",
                 },
             )
@@ -485,59 +517,51 @@ class CycleImagePipeline:
             file.write("\n")
         os.replace(temp_path, path)
 
-    def _get_curr_embedding(self, event: SnapshotEvent):
-        frame = event.frame
-        if frame is None:
+    def _get_curr_embedding(self, event: SnapshotEvent, context: FrameContext):
+        # Models load in the background: skip instead of blocking this camera thread
+        if not image_embedding_ready(self._embedding_pool):
+            count_gate_decision("models_ready", "skip", event.camera_id)
             return None
 
-        image_buffer = self._frame_to_jpeg(frame)
-        if not image_buffer:
-            return None
+        # Memoized per frame: usually computed by the router pre-stage
+        return context.embedding(self._embedding_pool)
 
-        try:
-            return embed_image_sync(image_buffer)
-        except Exception as e:
-            logger.error(
-                f"CLIP embedding failed | camera={event.camera_id}",
-                exc_info=e,
+    def _evidence_jpeg(self, event: SnapshotEvent, context: FrameContext) -> Optional[bytes]:
+        """
+        JPEG for VLM calls: the main-stream frame on dual-stream cameras,
+        otherwise the analysis JPEG (already encoded for the embedding).
+        """
+        high_res_frame = event.get_high_res_frame()
+        if high_res_frame is not None:
+            # An injected anomaly image replaces the main-stream frame too
+            evidence = (
+                FrameContext(high_res_frame, event.camera_id)
+                if context is event.context
+                else context
             )
-            return None
+            image_buffer = evidence.jpeg(
+                max_width=settings.VLM_EVIDENCE_MAX_WIDTH,
+                jpeg_quality=settings.VLM_EVIDENCE_JPEG_QUALITY,
+            )
+            if image_buffer:
+                return image_buffer
 
-    def _frame_to_jpeg(
-            self,
-            frame,
-            max_width: int = 384,
-            jpeg_quality: int = 60,
-        ) -> Optional[bytes]:
-            """
-            Convert OpenCV frame to lightweight JPEG bytes.
-            """
-            try:
-                image = self.get_anomaly_image()
-                if image is not None:
-                    # Convert PIL Image to OpenCV format
-                    frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-
-                # Resize applies to BOTH cases
-                height, width = frame.shape[:2]
-                if width > max_width:
-                    scale = max_width / float(width)
-                    new_size = (max_width, int(height * scale))
-                    frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
-
-                success, buffer = cv2.imencode(
-                    ".jpg",
-                    frame,
-                    [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality],
-                )
-                if not success:
-                    return None
-
-                return buffer.tobytes()
-
-            except Exception as e:
-                logger.error("JPEG encoding failed", exc_info=e)
-                return None
+        return context.jpeg()
+
+    def _frame_context(self, event: SnapshotEvent) -> FrameContext:
+        """
+        The event's frame context, or one of the injected anomaly image
+        (dev), which replaces the frame.
+        """
+        try:
+            image = self.get_anomaly_image()
+            if image is not None:
+                # Convert PIL Image to OpenCV format
+                frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+                return FrameContext(frame, event.camera_id)
+        except Exception as e:
+            logger.error("Failed to load injected anomaly image", exc_info=e)
+        return event.context
 
     def get_anomaly_image(self) -> None:
         # Find all .jpg files in the directory
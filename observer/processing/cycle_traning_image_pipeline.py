@@ -1,17 +1,24 @@
 # cycle_traning_image_pipeline.py
 
 import cv2
-from typing import Optional
 import os
+import threading
 from datetime import datetime
-import torch
+from typing import TYPE_CHECKING
 
 from utils.logger import logger
+from utils.metrics import count_gate_decision
 from cameras.camera_events import SnapshotEvent
-from embeddings.clip_embeddings import embed_image_sync, merge_embeddings
-from vector_store.qdrant_wrapper import QdrantClientWrapper
+from embeddings.clip_embeddings import merge_embeddings
+from embeddings.model_manager import image_embedding_ready
+from vector_store.factory import get_vector_store
 from vector_store.image_index import ImageIndex
 
+# torch is imported on first merge, not on the startup path (this is the
+# default pipeline, built during pipeline init)
+if TYPE_CHECKING:
+    import torch
+
 
 class CycleTrainingImagePipeline:
     """
@@ -23,8 +30,12 @@ class CycleTrainingImagePipeline:
     - No VLM, no runtime similarity search
     """
 
-    def __init__(self):
-        qdrant_client = QdrantClientWrapper()
+    # Loaded by the Supervisor at startup (in-process embedding)
+    REQUIRED_MODELS = ("clip",)
+
+    def __init__(self, embedding_pool=None):
+        qdrant_client = get_vector_store()
+        self._embedding_pool = embedding_pool
 
         self._image_index = ImageIndex(
             qdrant=qdrant_client,
@@ -36,12 +47,16 @@ class CycleTrainingImagePipeline:
         self.prev_frame_embedding: dict[str, list[float]] = {}
 
         # Rolling merged embeddings (stabilized representation)
-        self.rolling_embedding: dict[str, torch.Tensor] = {}
+        self.rolling_embedding: dict[str, "torch.Tensor"] = {}
 
         # Anchor and ingestion counters
         self._next_anchor_id: int = 1
         self._ingest_seq: int = 1
 
+        # Anchor assignment vs. scheduled recompaction (renumbers anchors)
+        self._anchor_lock = threading.Lock()
+        self._recompacted_at_seq: int = 1
+
         # Training control
         self._max_training_vectors: int = 5000
         self._pruned: bool = False
@@ -56,15 +71,6 @@ class CycleTrainingImagePipeline:
         Must never raise.
         """
 
-        # Stop training and prune once max size is reached
-        if not self._pruned and self._ingest_seq % 1000 == 0:
-            self._next_anchor_id = (
-                self._image_index.delete_anchors_below_average_vector_count()
-            )
-            self._ingest_seq += 1
-            #self._pruned = True
-            #self._image_index.print_anchor_distribution()
-
         # If already pruned, stop training completely
         if self._pruned:
             return
@@ -80,12 +86,16 @@ class CycleTrainingImagePipeline:
             new_embedding=curr_embedding,
             threshold=0.99,
         ):
+            count_gate_decision("static_frame", "skip", event.camera_id)
             return
+        count_gate_decision("static_frame", "pass", event.camera_id)
 
         # Update static frame reference
         self.prev_frame_embedding[event.camera_id] = curr_embedding
 
         # Rolling merge (stabilized embedding)
+        import torch
+
         curr_tensor = torch.tensor(curr_embedding)
 
         prev_rolling = self.rolling_embedding.get(event.camera_id)
@@ -96,6 +106,13 @@ class CycleTrainingImagePipeline:
 
         self.rolling_embedding[event.camera_id] = merged_tensor
 
+        with self._anchor_lock:
+            self._ingest(event, curr_embedding)
+
+    def _ingest(self, event: SnapshotEvent, curr_embedding) -> None:
+        """
+        Assign an anchor and store the embedding. Caller holds _anchor_lock.
+        """
         # Determine anchor_id via similarity search
         anchor_id = None
 
@@ -152,6 +169,25 @@ class CycleTrainingImagePipeline:
             f"ingest_seq={ingest_seq} anchor_id={anchor_id} score={score:.3f}"
         )
 
+    def recompact_anchors(self, min_new_ingests: int = 1000) -> None:
+        """
+        Delete weak anchors and renumber the rest (scheduled maintenance
+        job, formerly run inline every 1000 ingests). Skipped until
+        min_new_ingests vectors arrived since the last recompaction.
+        """
+        with self._anchor_lock:
+            if self._pruned:
+                return
+            if self._ingest_seq - self._recompacted_at_seq < min_new_ingests:
+                return
+
+            self._next_anchor_id = (
+                self._image_index.delete_anchors_below_average_vector_count()
+            )
+            self._recompacted_at_seq = self._ingest_seq
+            #self._pruned = True
+            #self._image_index.print_anchor_distribution()
+
     def _get_dynamic_similarity_threshold(self) -> float:
         base_threshold = 0.988
         step = 0.003
@@ -171,51 +207,13 @@ class CycleTrainingImagePipeline:
         if frame is None:
             return None
 
-        image_buffer = self._frame_to_jpeg(frame)
-        if not image_buffer:
+        # Models load in the background: skip instead of blocking this camera thread
+        if not image_embedding_ready(self._embedding_pool):
+            count_gate_decision("models_ready", "skip", event.camera_id)
             return None
 
-        try:
-            curr_embedding = embed_image_sync(image_buffer)
-        except Exception as e:
-            logger.error(
-                f"CLIP embedding failed | camera={event.camera_id}",
-                exc_info=e,
-            )
-            return None
-        
-        return curr_embedding
-
-    def _frame_to_jpeg(
-        self,
-        frame,
-        max_width: int = 384,
-        jpeg_quality: int = 60,
-    ) -> Optional[bytes]:
-        """
-        Convert OpenCV frame to lightweight JPEG bytes.
-        """
-        try:
-            height, width = frame.shape[:2]
-
-            if width > max_width:
-                scale = max_width / float(width)
-                new_size = (max_width, int(height * scale))
-                frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
-
-            success, buffer = cv2.imencode(
-                ".jpg",
-                frame,
-                [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality],
-            )
-            if not success:
-                return None
-
-            return buffer.tobytes()
-
-        except Exception as e:
-            logger.error("JPEG encoding failed", exc_info=e)
-            return None
+        # Memoized per frame: usually computed by the router pre-stage
+        return event.context.embedding(self._embedding_pool)
 
     def _is_similar_to_previous_frame(
         self,
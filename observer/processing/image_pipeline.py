@@ -1,19 +1,16 @@
-import cv2
-import tiktoken
-from typing import Optional
-
 from utils.logger import logger
+from utils.metrics import count_gate_decision
 from cameras.camera_events import SnapshotEvent
-from embeddings.clip_embeddings import embed_image_sync
+from cameras.frame_context import FrameContext
+from embeddings.model_manager import image_embedding_ready, model_manager
 from embeddings.text_embeddings import embed_text_sync
 
-from vector_store.qdrant_wrapper import QdrantClientWrapper
+from vector_store.factory import get_vector_store
 from vector_store.image_index import ImageIndex
 from vector_store.text_index import TextIndex
 from cloud.vlm_client import VLMClient
 from config import settings
 from prompts.image_analysis_prompt import build_image_analysis_prompt
-from firebase.storage_service import FirebaseStorageService
 
 class ImagePipeline:
     """
@@ -28,8 +25,12 @@ class ImagePipeline:
         -> if no similar image found -> store embedding in Qdrant
     """
 
-    def __init__(self):
-        qdrant_client = QdrantClientWrapper()
+    # Loaded by the Supervisor at startup (in-process embedding)
+    REQUIRED_MODELS = ("clip", "text")
+
+    def __init__(self, embedding_pool=None):
+        qdrant_client = get_vector_store()
+        self._embedding_pool = embedding_pool
 
         self._image_index = ImageIndex(
             qdrant=qdrant_client,
@@ -42,7 +43,9 @@ class ImagePipeline:
         self.prev_image_embedding: dict[str, list[float]] = {}
         self.prev_rolling_context: dict[str, str] = {}
         self._vlm = VLMClient(base_url=settings.VLM_BASE_URL)
-        self._firebase_storage = FirebaseStorageService()
+        # Created on first use: importing and initializing firebase_admin
+        # is slow and the upload is currently disabled
+        self._firebase_storage = None
 
     def process_snapshot(self, event: SnapshotEvent) -> None:
         """
@@ -55,25 +58,16 @@ class ImagePipeline:
         if frame is None:
             return
 
-        # 2. Convert frame to JPEG buffer
-        image_buffer = self._frame_to_jpeg(frame)
-        if not image_buffer:
-            return
-
-        # 3. Generate CLIP embedding
-        try:
-            embedding = embed_image_sync(image_buffer)
-        except Exception as e:
-            logger.error(
-                f"CLIP embedding failed | camera={event.camera_id}",
-                exc_info=e,
-            )
+        # Models load in the background: skip instead of blocking this camera thread
+        if not (image_embedding_ready(self._embedding_pool) and model_manager.is_ready("text")):
+            count_gate_decision("models_ready", "skip", event.camera_id)
             return
 
+        # 2-3. JPEG buffer and CLIP embedding (memoized per frame: the
+        #      router pre-stage usually computed them already)
+        embedding = event.context.embedding(self._embedding_pool)
         if not embedding:
-            logger.error(
-                f"Empty embedding generated | camera={event.camera_id}"
-            )
+            # Failure already logged by the frame context
             return
 
         # 4. Similaryty against previos embeddings
@@ -82,7 +76,9 @@ class ImagePipeline:
             new_embedding=embedding)
         if matches:
             # Similar image already exists -> no write, no VLM
+            count_gate_decision("static_frame", "skip", event.camera_id)
             return
+        count_gate_decision("static_frame", "pass", event.camera_id)
 
         # 5. Similarity search (vector db)
         matches = self._image_index.search_similar_last_minute(
@@ -91,10 +87,26 @@ class ImagePipeline:
         )
         if matches:
             # Similar image already exists -> no write, no VLM
+            count_gate_decision("recent_similar", "skip", event.camera_id)
             return
-        
+        count_gate_decision("recent_similar", "pass", event.camera_id)
+
+        # Dual-stream cameras: describe the main-stream frame instead
+        image_buffer = None
+        high_res_frame = event.get_high_res_frame()
+        if high_res_frame is not None:
+            image_buffer = FrameContext(high_res_frame, event.camera_id).jpeg(
+                max_width=settings.VLM_EVIDENCE_MAX_WIDTH,
+                jpeg_quality=settings.VLM_EVIDENCE_JPEG_QUALITY,
+            )
+
+        if not image_buffer:
+            image_buffer = event.context.jpeg()
+            if not image_buffer:
+                return
+
         # 6. Upload image to Firebase Storage (temp)
-        #temp_image_url = self._firebase_storage.upload_temp_image(image_buffer)
+        #temp_image_url = self._get_firebase_storage().upload_temp_image(image_buffer)
 
         # 7. Analyze the image with VLM
         static_prompt, dynamic_prompt = build_image_analysis_prompt(
@@ -120,6 +132,7 @@ class ImagePipeline:
             metadata={
                 "camera_id": event.camera_id,
                 "timestamp": event.timestamp,
+                "evidence_timestamp": event.evidence_timestamp,
             },
         )
 
@@ -127,7 +140,7 @@ class ImagePipeline:
         
         # Clean up temp image
         #if temp_image_url:
-            #self._firebase_storage.delete_by_url(temp_image_url)
+            #self._get_firebase_storage().delete_by_url(temp_image_url)
 
         # 8. No similar image found -> store embedding
         point_id = self._image_index.add(
@@ -142,8 +155,15 @@ class ImagePipeline:
             )
 
         # 9. text embedding (async, fire-and-forget)
+        text_embedding, text_sparse = None, None
         try:
-            text_embedding = embed_text_sync(analysis["frame_description"])
+            if settings.TEXT_HYBRID_ENABLED:
+                text_embedding, text_sparse = embed_text_sync(
+                    analysis["frame_description"],
+                    return_sparse=True,
+                )
+            else:
+                text_embedding = embed_text_sync(analysis["frame_description"])
         except Exception as e:
             logger.error(
                 f"Text embedding failed | camera={event.camera_id}",
@@ -162,13 +182,22 @@ class ImagePipeline:
                     "camera_id": event.camera_id,
                     "timestamp": event.timestamp,
                 },
+                sparse=text_sparse,
             )
 
         print("Frame description: " + analysis["frame_description"])
         print("Rolling context: " + analysis["rolling_context"])
 
+    def _get_firebase_storage(self):
+        if self._firebase_storage is None:
+            from firebase.storage_service import FirebaseStorageService
+            self._firebase_storage = FirebaseStorageService()
+        return self._firebase_storage
+
     def count_tokens(self, text: str) -> int:
         try:
+            import tiktoken
+
             enc = tiktoken.get_encoding("o200k_base")
             tokens = enc.encode(text)
             return len(tokens)
@@ -176,42 +205,6 @@ class ImagePipeline:
             logger.error("tiktoken error:", repr(e))
             raise
 
-    def _frame_to_jpeg(
-        self,
-        frame,
-        max_width: int = 384,
-        jpeg_quality: int = 60,
-    ) -> Optional[bytes]:
-        """
-        Convert OpenCV frame (BGR numpy array) to resized JPEG bytes.
-        Optimized for VLM usage.
-        """
-        try:
-            height, width = frame.shape[:2]
-
-            # Resize if needed (keep aspect ratio)
-            if width > max_width:
-                scale = max_width / float(width)
-                new_size = (max_width, int(height * scale))
-                frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
-
-            encode_params = [
-                int(cv2.IMWRITE_JPEG_QUALITY),
-                jpeg_quality,
-            ]
-
-            success, buffer = cv2.imencode(".jpg", frame, encode_params)
-            if not success:
-                return None
-
-            image_bytes = buffer.tobytes()
-            #print(f"JPEG bytes being sent: {len(image_bytes)/1024:.1f} KB")
-            return image_bytes
-
-        except Exception as e:
-            logger.error("Failed to encode frame to JPEG", exc_info=e)
-            return None
-        
     def _is_similar_to_previous_image(
         self,
         camera_id: str,
@@ -0,0 +1,320 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from cameras.camera_events import SnapshotEvent
+from config import settings
+from embeddings.model_manager import image_embedding_ready, model_manager
+from utils.logger import logger
+
+
+# Names usable in the "pipelines" list of a camera config
+PIPELINE_NAMES = ("image", "cycle", "cycle_training")
+
+
+def parse_pipeline_names(value) -> Tuple[str, ...]:
+    """
+    Pipeline names from a camera config list or a comma-separated
+    string. Unknown names raise ValueError.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+
+    names = []
+    for name in value or ():
+        name = str(name).strip()
+        if not name:
+            continue
+        if name not in PIPELINE_NAMES:
+            raise ValueError(
+                f"Unknown pipeline '{name}', expected one of {PIPELINE_NAMES}"
+            )
+        if name not in names:
+            names.append(name)
+    return tuple(names)
+
+
+class PipelineRouter:
+    """
+    Routes each camera's snapshots to the pipelines listed in its config
+    ("pipelines" in cameras_config.json, DEFAULT_PIPELINES otherwise).
+
+    One instance per pipeline type is shared by all cameras routed to it,
+    and only the types in use are imported. Before the pipelines run, a
+    pre-stage computes the CLIP embedding of the frame once into the
+    event's FrameContext, so a camera with several pipelines is not
+    encoded and embedded once per pipeline.
+
+    A pipeline that fails to initialize is left out of the routes and
+    retried from process_snapshot() with exponential backoff
+    (PIPELINE_RETRY_SECONDS, up to PIPELINE_RETRY_MAX_SECONDS); see
+    missing_pipelines() for health reporting.
+    """
+
+    def __init__(
+        self,
+        embedding_pool=None,
+        event_callback: Optional[Callable[[dict], None]] = None,
+    ):
+        self._embedding_pool = embedding_pool
+        self._event_callback = event_callback
+        self._default = parse_pipeline_names(settings.DEFAULT_PIPELINES)
+
+        self._pipelines: Dict[str, object] = {}
+        # camera_id -> ((name, pipeline), ...); replaced, never mutated
+        self._routes: Dict[str, Tuple[Tuple[str, object], ...]] = {}
+        self._lock = threading.Lock()
+
+        # Serializes route rebuilds: configure() and snapshot-path retries
+        self._configure_lock = threading.Lock()
+        self._camera_configs: List[Dict] = []
+        # name -> {"attempts", "error", "retry_at" (monotonic)}
+        self._failed: Dict[str, Dict] = {}
+        # camera_id -> names left out of its route
+        self._missing: Dict[str, Tuple[str, ...]] = {}
+
+    def configure(self, camera_configs: Iterable[Dict]) -> None:
+        """
+        (Re)build the routes from the enabled camera configs, creating
+        pipelines on first use. A camera with an invalid "pipelines"
+        list gets the default ones; a pipeline that fails to initialize
+        is left out until a retry succeeds. Pipelines that failed before
+        are retried at once. Never raises.
+        """
+        camera_configs = list(camera_configs)
+        with self._configure_lock:
+            self._camera_configs = camera_configs
+            self._build_routes(force_retry=True)
+
+    def process_snapshot(self, event: SnapshotEvent) -> None:
+        """
+        Run the pre-stage, then every pipeline of the camera in order.
+        A failing pipeline does not stop the others. Never raises.
+        """
+        if self._failed:
+            self._retry_failed()
+
+        route = self._routes.get(event.camera_id)
+        if not route:
+            return
+
+        self._prepare(event, route)
+
+        for name, pipeline in route:
+            try:
+                pipeline.process_snapshot(event)
+            except Exception as e:
+                logger.error(
+                    f"Pipeline failed | pipeline={name} camera={event.camera_id}",
+                    exc_info=e,
+                )
+
+    def missing_pipelines(self) -> Dict[str, Dict]:
+        """
+        Pipelines configured for a camera but not running because they
+        failed to initialize: name -> cameras, attempts, last error and
+        seconds until the next retry. Empty when all are running.
+        """
+        now = time.monotonic()
+        with self._lock:
+            missing = {}
+            for camera_id, names in self._missing.items():
+                for name in names:
+                    failure = self._failed.get(name, {})
+                    entry = missing.setdefault(name, {
+                        "cameras": [],
+                        "attempts": failure.get("attempts", 0),
+                        "error": failure.get("error"),
+                        "retry_in_seconds": round(max(0.0, failure.get("retry_at", now) - now), 1),
+                    })
+                    entry["cameras"].append(camera_id)
+            return missing
+
+    def wait_ready(self, camera_id: str, timeout: float) -> bool:
+        """
+        Block until the models of the camera's pipelines are loaded, at
+        most timeout seconds. False on timeout or while the camera has no
+        route yet. Used by replay sources, which must not run past frames
+        the pipelines would skip; live cameras keep the per-pipeline
+        gates. Never raises.
+        """
+        route = self._routes.get(camera_id)
+        if route is None:
+            time.sleep(timeout)
+            return False
+
+        deadline = time.monotonic() + timeout
+        models = set()
+        for _, pipeline in route:
+            models.update(getattr(pipeline, "REQUIRED_MODELS", ()))
+
+        try:
+            for name in sorted(models):
+                remaining = max(0.0, deadline - time.monotonic())
+                if name == "clip" and self._embedding_pool is not None:
+                    # Worker processes have no ready event: poll
+                    while not self._embedding_pool.is_ready():
+                        if time.monotonic() >= deadline:
+                            return False
+                        time.sleep(0.1)
+                elif not model_manager.wait_ready(name, remaining):
+                    return False
+        except Exception as e:
+            logger.error(f"Model wait failed | camera={camera_id}", exc_info=e)
+            return False
+        return True
+
+    def get_pipelines(self) -> List[object]:
+        """
+        Pipeline instances created so far (in use or used before a reload).
+        """
+        with self._lock:
+            return list(self._pipelines.values())
+
+    def required_models(self) -> List[str]:
+        models = set()
+        for pipeline in self.get_pipelines():
+            models.update(getattr(pipeline, "REQUIRED_MODELS", ()))
+        return sorted(models)
+
+    # -------- internals --------
+
+    def _build_routes(self, force_retry: bool = False) -> None:
+        # Caller holds _configure_lock
+        routes = {}
+        missing = {}
+        for cam_cfg in self._camera_configs:
+            camera_id = cam_cfg.get("camera_id")
+            route = []
+            for name in self._pipeline_names(cam_cfg):
+                pipeline = self._get_pipeline(name, force_retry)
+                if pipeline is not None:
+                    route.append((name, pipeline))
+                else:
+                    missing.setdefault(camera_id, []).append(name)
+            routes[camera_id] = tuple(route)
+
+        with self._lock:
+            changed = {
+                camera_id: [name for name, _ in route]
+                for camera_id, route in routes.items()
+                if self._routes.get(camera_id) != route
+            }
+            self._routes = routes
+            self._missing = {camera_id: tuple(names) for camera_id, names in missing.items()}
+            # No camera uses it anymore: stop retrying
+            wanted = {name for names in missing.values() for name in names}
+            self._failed = {
+                name: failure for name, failure in self._failed.items() if name in wanted
+            }
+
+        for camera_id, names in changed.items():
+            logger.log(f"Camera pipelines | camera={camera_id} pipelines={names}")
+
+    def _retry_failed(self) -> None:
+        """
+        Snapshot path: rebuild the routes once a failed pipeline is due
+        for a retry. Only one camera thread retries, the others go on.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = any(failure["retry_at"] <= now for failure in self._failed.values())
+        if not due or not self._configure_lock.acquire(blocking=False):
+            return
+
+        try:
+            self._build_routes()
+        except Exception as e:
+            logger.error("Pipeline retry failed", exc_info=e)
+        finally:
+            self._configure_lock.release()
+
+    def _pipeline_names(self, cam_cfg: Dict) -> Tuple[str, ...]:
+        if "pipelines" not in cam_cfg:
+            return self._default
+
+        try:
+            return parse_pipeline_names(cam_cfg["pipelines"])
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                f"Invalid pipelines for camera '{cam_cfg.get('camera_id')}', "
+                f"using {list(self._default)}: {e}"
+            )
+            return self._default
+
+    def _get_pipeline(self, name: str, force_retry: bool = False):
+        """
+        Shared pipeline instance, created on first use. None if it fails
+        to initialize, or failed before and its retry is not due yet
+        (unless force_retry).
+        """
+        with self._lock:
+            pipeline = self._pipelines.get(name)
+            failure = self._failed.get(name)
+        if pipeline is not None:
+            return pipeline
+        if failure and not force_retry and time.monotonic() < failure["retry_at"]:
+            return None
+
+        try:
+            pipeline = self._create_pipeline(name)
+        except Exception as e:
+            attempts = (failure or {}).get("attempts", 0) + 1
+            delay = min(
+                settings.PIPELINE_RETRY_SECONDS * 2 ** (attempts - 1),
+                settings.PIPELINE_RETRY_MAX_SECONDS,
+            )
+            logger.error(
+                f"Failed to create pipeline '{name}' "
+                f"(attempt {attempts}, retry in {delay:.0f}s)",
+                exc_info=e,
+            )
+            with self._lock:
+                self._failed[name] = {
+                    "attempts": attempts,
+                    "error": str(e),
+                    "retry_at": time.monotonic() + delay,
+                }
+            return None
+
+        with self._lock:
+            # Route rebuilds hold _configure_lock, so no other instance
+            # can appear meanwhile
+            self._pipelines[name] = pipeline
+            self._failed.pop(name, None)
+        if failure:
+            logger.log(f"Pipeline '{name}' created after {failure['attempts']} failed attempts")
+        return pipeline
+
+    def _create_pipeline(self, name: str):
+        # Only the pipelines in use are imported (and their dependencies:
+        # tiktoken, torch, ...)
+        if name == "image":
+            from processing.image_pipeline import ImagePipeline
+            return ImagePipeline(embedding_pool=self._embedding_pool)
+        if name == "cycle_training":
+            from processing.cycle_traning_image_pipeline import CycleTrainingImagePipeline
+            return CycleTrainingImagePipeline(embedding_pool=self._embedding_pool)
+        if name == "cycle":
+            from processing.cycle_image_pipeline import CycleImagePipeline
+            return CycleImagePipeline(
+                event_callback=self._event_callback,
+                embedding_pool=self._embedding_pool,
+            )
+        raise ValueError(f"Unknown pipeline '{name}'")
+
+    def _prepare(self, event: SnapshotEvent, route) -> None:
+        """
+        Shared pre-stage: CLIP embedding of the frame, memoized in
+        event.context for the pipelines (with the JPEG it was computed
+        from, in-process embedding only). Skipped while CLIP is loading:
+        each pipeline then applies its own gate. Never raises.
+        """
+        if event.frame is None:
+            return
+        if not any("clip" in getattr(pipeline, "REQUIRED_MODELS", ()) for _, pipeline in route):
+            return
+        if not image_embedding_ready(self._embedding_pool):
+            return
+
+        event.context.embedding(self._embedding_pool)
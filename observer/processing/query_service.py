@@ -0,0 +1,401 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from embeddings.model_manager import model_manager
+from utils.logger import logger
+from utils.metrics import metrics
+from vector_store.base import VectorStore
+from vector_store.image_index import ImageIndex
+from vector_store.text_index import TextIndex
+
+
+# Rank offset of the image/text fusion (the usual RRF constant: two
+# unrelated rankings, so a flatter curve than the hybrid text search)
+_RRF_K = 60
+
+_UNITS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+}
+
+_LAST_N = re.compile(r"\b(?:in the |during the )?(?:last|past)\s+(\d+)?\s*(minute|hour|day|week)s?\b")
+_TODAY = re.compile(r"\btoday\b")
+_YESTERDAY = re.compile(r"\byesterday\b")
+_THIS_WEEK = re.compile(r"\bthis week\b")
+
+
+def parse_time_range(
+    question: str,
+    now: Optional[float] = None,
+) -> Tuple[str, Optional[float], Optional[float]]:
+    """
+    Extract a time expression ("today", "yesterday", "this week",
+    "last 3 hours", "past day") from the question.
+
+    Returns (question without the expression, since, until); since and
+    until are None when there is no expression. Local time.
+    """
+    now = time.time() if now is None else now
+    text = question.lower()
+
+    midnight = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    match = _LAST_N.search(text)
+    if match:
+        amount = int(match.group(1) or 1)
+        since, until = now - amount * _UNITS[match.group(2)], now
+    elif _YESTERDAY.search(text):
+        match = _YESTERDAY.search(text)
+        since = (midnight - timedelta(days=1)).timestamp()
+        until = midnight.timestamp()
+    elif _TODAY.search(text):
+        match = _TODAY.search(text)
+        since, until = midnight.timestamp(), now
+    elif _THIS_WEEK.search(text):
+        match = _THIS_WEEK.search(text)
+        since = (midnight - timedelta(days=midnight.weekday())).timestamp()
+        until = now
+    else:
+        return question, None, None
+
+    stripped = (question[:match.start()] + question[match.end():]).strip(" ?.,")
+    return stripped or question, since, until
+
+
+class _EmbeddingCache:
+    """
+    Small thread-safe LRU of query embeddings, keyed by (model, text).
+    Operators repeat the same few questions; a hit skips the encoder.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._items: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[str], object]):
+        key = (model, " ".join(text.lower().split()))
+
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                metrics.counter(
+                    "observer_query_cache_total",
+                    "Query embedding cache lookups",
+                    model=model,
+                    result="hit",
+                ).inc()
+                return self._items[key]
+
+        metrics.counter(
+            "observer_query_cache_total",
+            "Query embedding cache lookups",
+            model=model,
+            result="miss",
+        ).inc()
+
+        # Computed outside the lock: two encoders must not serialize
+        value = compute(text)
+
+        if self._max_size > 0:
+            with self._lock:
+                self._items[key] = value
+                self._items.move_to_end(key)
+                while len(self._items) > self._max_size:
+                    self._items.popitem(last=False)
+
+        return value
+
+
+class QueryService:
+    """
+    Natural-language search over camera history.
+
+    A question runs two searches concurrently:
+    - CLIP text -> image embeddings (ImageIndex), what the frame shows
+    - BGE-M3 (hybrid dense + lexical) over VLM descriptions (TextIndex),
+      what the VLM said about it
+
+    Hits are fused with reciprocal rank fusion per image point (text
+    points link to it through ref_id), then grouped per camera into
+    episodes of frames closer than QUERY_CLUSTER_GAP_SECONDS.
+
+    Time expressions in the question ("today", "last 2 hours") become a
+    store-side timestamp filter. Query embeddings are cached.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        embed_clip_text: Optional[Callable[[str], List[float]]] = None,
+        embed_text: Optional[Callable[[str], tuple]] = None,
+    ):
+        self._store = store
+        self._embed_clip_text = embed_clip_text
+        self._embed_text = embed_text
+        # Models behind the default encoders, loaded on demand
+        self._models = [
+            name
+            for name, encoder in (("clip", embed_clip_text), ("text", embed_text))
+            if encoder is None
+        ]
+        self._cache = _EmbeddingCache(settings.QUERY_CACHE_SIZE)
+        self._image_index: Optional[ImageIndex] = None
+        self._text_index: Optional[TextIndex] = None
+        self._init_lock = threading.Lock()
+
+    # -------- HTTP --------
+
+    async def http_response(self, params: Dict[str, str]) -> Tuple[str, str, str]:
+        """
+        GET /search?q=...&camera_id=...&since=...&until=...&limit=...
+        (since/until: unix seconds). Must never raise.
+        """
+        try:
+            question = (params.get("q") or "").strip()
+            if not question:
+                return "400 Bad Request", "application/json", json.dumps({"error": "missing q"})
+
+            # Not ready yet: start loading instead of holding the request
+            loading = [name for name in self._models if not model_manager.is_ready(name)]
+            if loading:
+                return "503 Service Unavailable", "application/json", json.dumps({
+                    "error": "models loading",
+                    "models": {name: model_manager.state(name) for name in loading},
+                })
+
+            result = await self.search(
+                question,
+                camera_id=params.get("camera_id") or None,
+                since=float(params["since"]) if params.get("since") else None,
+                until=float(params["until"]) if params.get("until") else None,
+                limit=int(params["limit"]) if params.get("limit") else None,
+            )
+            return "200 OK", "application/json", json.dumps(result, default=str)
+
+        except ValueError as e:
+            return "400 Bad Request", "application/json", json.dumps({"error": str(e)})
+        except Exception as e:
+            logger.error("Search request failed", exc_info=e)
+            return "500 Internal Server Error", "application/json", json.dumps({"error": "search failed"})
+
+    # -------- search --------
+
+    async def search(
+        self,
+        question: str,
+        camera_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Dict:
+        """
+        Explicit since/until override a time expression in the question.
+        """
+        start = time.perf_counter()
+        limit = limit or settings.QUERY_LIMIT
+
+        text, parsed_since, parsed_until = parse_time_range(question)
+        if since is None and until is None:
+            since, until = parsed_since, parsed_until
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._ensure_indexes)
+
+        image_hits, text_hits = await asyncio.wait_for(
+            asyncio.gather(
+                loop.run_in_executor(None, self._search_images, text, camera_id, since, until),
+                loop.run_in_executor(None, self._search_texts, text, camera_id, since, until),
+            ),
+            timeout=settings.QUERY_TIMEOUT_SECONDS,
+        )
+
+        frames = self._fuse(image_hits, text_hits)
+        episodes = self._cluster(frames)[:limit]
+
+        elapsed = time.perf_counter() - start
+        metrics.histogram(
+            "observer_query_seconds",
+            "Natural-language search latency",
+        ).observe(elapsed)
+
+        return {
+            "query": question,
+            "since": since,
+            "until": until,
+            "camera_id": camera_id,
+            "took_ms": round(elapsed * 1000, 1),
+            "episodes": episodes,
+        }
+
+    def _search_images(self, text, camera_id, since, until) -> list:
+        try:
+            embedding = self._cache.get_or_compute("clip", text, self._clip_encoder())
+        except Exception as e:
+            # Text search alone still answers the question
+            logger.warning(f"CLIP query embedding failed, image search skipped | error={e}")
+            return []
+
+        return self._image_index.search_history(
+            embedding,
+            limit=settings.QUERY_CANDIDATES,
+            camera_id=camera_id,
+            since=since,
+            until=until,
+            score_threshold=settings.QUERY_IMAGE_SCORE_THRESHOLD,
+        )
+
+    def _search_texts(self, text, camera_id, since, until) -> list:
+        try:
+            dense, sparse = self._cache.get_or_compute("text", text, self._text_encoder())
+        except Exception as e:
+            logger.warning(f"Text query embedding failed, text search skipped | error={e}")
+            return []
+
+        return self._text_index.search_relevant(
+            dense,
+            sparse=sparse,
+            camera_id=camera_id,
+            since=since,
+            until=until,
+        )
+
+    # -------- fusion --------
+
+    @staticmethod
+    def _fuse(image_hits: list, text_hits: list) -> List[Dict]:
+        frames: Dict[str, Dict] = {}
+
+        def frame_for(key, payload) -> Dict:
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = {
+                    "id": key,
+                    "camera_id": payload.get("camera_id"),
+                    "timestamp": payload.get("timestamp"),
+                    "timestamp_str": payload.get("timestamp_str"),
+                    "frame_description": None,
+                    "score": 0.0,
+                    "matched": [],
+                }
+            if not frame["frame_description"] and payload.get("frame_description"):
+                frame["frame_description"] = payload["frame_description"]
+            return frame
+
+        for rank, hit in enumerate(image_hits):
+            frame = frame_for(str(hit.id), hit.payload or {})
+            frame["score"] += 1.0 / (rank + _RRF_K)
+            frame["image_score"] = round(float(hit.score), 4)
+            frame["matched"].append("image")
+
+        for rank, hit in enumerate(text_hits):
+            payload = hit.payload or {}
+            # ref_id is the image point the description was written for
+            frame = frame_for(str(payload.get("ref_id") or hit.id), payload)
+            frame["score"] += 1.0 / (rank + _RRF_K)
+            if "text" not in frame["matched"]:
+                frame["matched"].append("text")
+            if payload.get("rolling_context"):
+                frame["rolling_context"] = payload["rolling_context"]
+
+        return [frame for frame in frames.values() if frame["timestamp"] is not None]
+
+    @staticmethod
+    def _cluster(frames: List[Dict]) -> List[Dict]:
+        """
+        Consecutive hits of one camera closer than the gap form one
+        episode, scored by its best frame; best episodes first.
+        """
+        gap = settings.QUERY_CLUSTER_GAP_SECONDS
+        episodes: List[Dict] = []
+        current: Dict[str, Dict] = {}
+
+        for frame in sorted(frames, key=lambda f: (str(f["camera_id"]), f["timestamp"])):
+            episode = current.get(frame["camera_id"])
+            if episode is None or frame["timestamp"] - episode["end"] > gap:
+                episode = {
+                    "camera_id": frame["camera_id"],
+                    "start": frame["timestamp"],
+                    "end": frame["timestamp"],
+                    "score": 0.0,
+                    "frames": [],
+                }
+                current[frame["camera_id"]] = episode
+                episodes.append(episode)
+
+            episode["end"] = frame["timestamp"]
+            episode["score"] = max(episode["score"], frame["score"])
+            episode["frames"].append(frame)
+
+        for episode in episodes:
+            episode["start_str"] = datetime.fromtimestamp(episode["start"]).strftime("%Y-%m-%d %H:%M:%S")
+            episode["end_str"] = datetime.fromtimestamp(episode["end"]).strftime("%Y-%m-%d %H:%M:%S")
+            episode["frames"].sort(key=lambda f: f["score"], reverse=True)
+            episode["frames"] = episode["frames"][:settings.QUERY_FRAMES_PER_EPISODE]
+            for frame in episode["frames"]:
+                frame["score"] = round(frame["score"], 6)
+            episode["score"] = round(episode["score"], 6)
+
+        episodes.sort(key=lambda e: e["score"], reverse=True)
+        return episodes
+
+    # -------- lazy resources --------
+
+    def _clip_encoder(self) -> Callable[[str], List[float]]:
+        if self._embed_clip_text is None:
+            from embeddings.clip_embeddings import embed_clip_text_sync
+            self._embed_clip_text = embed_clip_text_sync
+        return self._embed_clip_text
+
+    def _text_encoder(self) -> Callable[[str], tuple]:
+        if self._embed_text is None:
+            from embeddings.text_embeddings import embed_text_sync
+
+            if settings.TEXT_HYBRID_ENABLED:
+                self._embed_text = lambda text: embed_text_sync(text, return_sparse=True)
+            else:
+                self._embed_text = lambda text: (embed_text_sync(text), {})
+        return self._embed_text
+
+    def _ensure_indexes(self) -> None:
+        """
+        Indexes are created on the first query, in an executor thread:
+        the embedding models and collections are not needed at startup.
+        """
+        if self._image_index is not None and self._text_index is not None:
+            return
+
+        with self._init_lock:
+            if self._image_index is None:
+                self._image_index = ImageIndex(qdrant=self._store)
+                self._payload_indexes(
+                    ImageIndex.COLLECTION_NAME,
+                    {"timestamp": "float", "camera_id": "keyword", "type": "keyword", "pipeline": "keyword"},
+                )
+            if self._text_index is None:
+                self._text_index = TextIndex(
+                    qdrant=self._store,
+                    score_threshold=settings.QUERY_TEXT_SCORE_THRESHOLD,
+                    top_k=settings.QUERY_CANDIDATES,
+                )
+                self._payload_indexes(
+                    TextIndex.COLLECTION_NAME,
+                    {"timestamp": "float", "camera_id": "keyword", "source": "keyword"},
+                )
+
+    def _payload_indexes(self, collection_name: str, fields: Dict[str, str]) -> None:
+        for field_name, schema in fields.items():
+            try:
+                self._store.ensure_payload_index(collection_name, field_name, schema)
+            except Exception:
+                # Already logged; filtered search still works, only slower
+                pass
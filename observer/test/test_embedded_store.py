@@ -0,0 +1,69 @@
+from vector_store.embedded_store import _Collection
+
+
+# Operations past this many log entries can trigger compaction
+COMPACT_AFTER = 10000
+
+
+def _open(directory) -> _Collection:
+    return _Collection(
+        directory=str(directory),
+        vector_size=4,
+        distance="Cosine",
+        hnsw_threshold=10 ** 9,
+    )
+
+
+def _reopen(collection: _Collection, directory) -> _Collection:
+    collection.close()
+    return _open(directory)
+
+
+def test_delete_that_compacts_survives_reopen(tmp_path):
+    collection = _open(tmp_path)
+    for i in range(COMPACT_AFTER + 1):
+        collection.upsert(f"p{i}", [1.0, 0.0, 0.0, float(i)], {"n": i})
+
+    # Log of 10002 entries for 2001 points: this delete compacts
+    log_entries = collection._log_entries
+    assert collection.delete([f"p{i}" for i in range(8000)]) == 8000
+    assert collection._log_entries < log_entries
+
+    collection = _reopen(collection, tmp_path)
+    assert len(collection) == 2001
+    assert "p0" not in collection._slot_of
+    assert "p8000" in collection._slot_of
+
+    collection.close()
+
+
+def test_upsert_that_compacts_survives_reopen(tmp_path):
+    collection = _open(tmp_path)
+    for i in range(COMPACT_AFTER):
+        collection.upsert("p0", [1.0, 0.0, 0.0, 0.0], {"n": i})
+
+    # 10001st entry for 2 points: this upsert compacts
+    collection.upsert("p1", [0.0, 1.0, 0.0, 0.0], {"n": -1})
+    assert collection._log_entries == 2
+
+    collection = _reopen(collection, tmp_path)
+    assert len(collection) == 2
+    assert collection._payloads[collection._slot_of["p0"]] == {"n": COMPACT_AFTER - 1}
+    assert collection._payloads[collection._slot_of["p1"]] == {"n": -1}
+
+    collection.close()
+
+
+def test_set_payload_that_compacts_survives_reopen(tmp_path):
+    collection = _open(tmp_path)
+    collection.upsert("p0", [1.0, 0.0, 0.0, 0.0], {"n": 0})
+
+    # The last call is the 10001st entry for 1 point: it compacts
+    for i in range(1, COMPACT_AFTER + 1):
+        collection.set_payload(["p0"], {"n": i})
+    assert collection._log_entries == 1
+
+    collection = _reopen(collection, tmp_path)
+    assert collection._payloads[collection._slot_of["p0"]] == {"n": COMPACT_AFTER}
+
+    collection.close()
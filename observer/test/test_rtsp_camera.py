@@ -0,0 +1,290 @@
+import shutil
+import socket
+import subprocess
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from cameras.camera_sources import rtsp_camera
+from cameras.camera_sources.rtsp_camera import RtspCamera
+
+
+FRAME_SHAPE = (36, 64, 3)
+
+
+class _FakeCapture:
+    """
+    Stand-in for cv2.VideoCapture that produces frames at a fixed rate.
+
+    frames: number of frames grab() delivers before the stream drops
+    (None: endless). decodable: False makes every retrieve() fail, like a
+    stream whose packets arrive but never decode.
+    """
+
+    def __init__(self, fps: float = 200.0, frames=None, decodable: bool = True):
+        self._interval = 1.0 / fps
+        self._remaining = frames
+        self._decodable = decodable
+        self._value = 0
+        self.grabs = 0
+        self.retrieves = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def set(self, prop, value):
+        return True
+
+    def grab(self):
+        time.sleep(self._interval)
+        if self._remaining is not None:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+        self.grabs += 1
+        self._value = (self._value + 1) % 256
+        return True
+
+    def retrieve(self, image=None):
+        self.retrieves += 1
+        if not self._decodable:
+            return False, None
+        if image is None:
+            image = np.empty(FRAME_SHAPE, dtype=np.uint8)
+        image[:] = self._value
+        return True, image
+
+    def release(self):
+        self.released = True
+
+
+class _ScriptedRtspCamera(RtspCamera):
+    """
+    RtspCamera whose connects return the scripted captures in order
+    (None: connect failure). Records every backoff delay it waits.
+    """
+
+    def __init__(self, captures, **kwargs):
+        kwargs.setdefault("reconnect_initial_delay", 0.01)
+        kwargs.setdefault("reconnect_max_delay", 0.1)
+        super().__init__(url="rtsp://user:pw@camera.test/stream", **kwargs)
+        self._script = list(captures)
+        self.opened = []
+        self.delays = []
+
+    def _open_capture(self):
+        if not self._script:
+            return None
+        cap = self._script.pop(0)
+        self.opened.append(cap)
+        return cap
+
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = super()._backoff_delay(attempt)
+        self.delays.append(delay)
+        return delay
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(rtsp_camera.random, "uniform", lambda a, b: 1.0)
+
+
+@pytest.fixture
+def cameras():
+    started = []
+    yield started
+    for camera in started:
+        camera.stop()
+
+
+def test_backoff_delay_doubles_up_to_cap(no_jitter):
+    camera = RtspCamera(
+        url="rtsp://camera.test/stream",
+        reconnect_initial_delay=1.0,
+        reconnect_max_delay=30.0,
+    )
+
+    delays = [camera._backoff_delay(attempt) for attempt in range(8)]
+
+    assert delays == [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0, 30.0]
+    # Huge attempt counts must not overflow
+    assert camera._backoff_delay(10_000) == 30.0
+
+
+def test_backoff_delay_is_jittered():
+    camera = RtspCamera(url="rtsp://camera.test/stream", reconnect_initial_delay=1.0)
+
+    delays = {camera._backoff_delay(2) for _ in range(50)}
+
+    assert all(3.2 <= delay <= 4.8 for delay in delays)
+    assert len(delays) > 1
+
+
+def test_reconnect_backs_off_until_frames_arrive(no_jitter, cameras):
+    dead = _FakeCapture(frames=0)
+    short = _FakeCapture(frames=5)
+    endless = _FakeCapture()
+    camera = _ScriptedRtspCamera([None, None, None, dead, short, endless])
+    cameras.append(camera)
+
+    camera.start()
+
+    assert _wait_for(lambda: camera.opened[-1:] == [endless] and endless.grabs > 0)
+    stats = camera.get_stats()
+
+    # Three failed connects and a stream that died without a frame keep
+    # doubling the delay (capped); a stream that delivered resets it.
+    assert camera.delays == pytest.approx([0.01, 0.02, 0.04, 0.1, 0.01])
+    assert stats["state"] == "streaming"
+    assert stats["connects"] == 3
+    assert stats["reconnects"] == 2
+    assert dead.released and short.released
+    assert _wait_for(lambda: camera.get_snapshot() is not None)
+
+
+def test_stall_triggers_reconnect(cameras):
+    corrupt = _FakeCapture(decodable=False)
+    healthy = _FakeCapture()
+    camera = _ScriptedRtspCamera([corrupt, healthy], stall_timeout=0.2)
+    cameras.append(camera)
+
+    started = time.monotonic()
+    camera.start()
+
+    assert _wait_for(lambda: camera.opened[-1:] == [healthy] and healthy.grabs > 0)
+    elapsed = time.monotonic() - started
+    stats = camera.get_stats()
+
+    assert stats["stalls"] == 1
+    assert stats["reconnects"] == 1
+    assert stats["decode_errors"] > 0
+    assert corrupt.released
+    # Grabs keep succeeding, so only the stall timeout ends the stream
+    assert elapsed >= 0.2
+
+    assert _wait_for(lambda: camera.get_snapshot() is not None)
+    assert camera.get_stats()["stalls"] == 1
+
+
+def test_slow_consumer_skips_decodes(cameras):
+    capture = _FakeCapture(fps=200.0)
+    camera = _ScriptedRtspCamera([capture])
+    cameras.append(camera)
+    camera.set_consumer_fps("slow", 2.0)
+
+    camera.start()
+    time.sleep(1.0)
+    stats = camera.get_stats()
+
+    # 2 fps with 2x headroom: about 4 decodes per second plus the first
+    # frame, while every packet is still grabbed
+    assert stats["frames_grabbed"] > 50
+    assert 2 <= stats["frames_decoded"] <= 8
+    assert capture.retrieves == stats["frames_decoded"]
+
+
+def test_without_consumers_every_frame_is_decoded(cameras):
+    capture = _FakeCapture(fps=100.0)
+    camera = _ScriptedRtspCamera([capture])
+    cameras.append(camera)
+
+    camera.start()
+    assert _wait_for(lambda: capture.grabs >= 20)
+    camera.stop()
+    stats = camera.get_stats()
+
+    assert stats["frames_decoded"] == stats["frames_grabbed"]
+
+
+def test_decode_on_demand_decodes_requested_frames_only(cameras):
+    capture = _FakeCapture(fps=200.0)
+    camera = _ScriptedRtspCamera([capture], decode_on_demand=True)
+    cameras.append(camera)
+
+    camera.start()
+    assert _wait_for(lambda: camera.get_snapshot() is not None)
+    time.sleep(0.2)
+    assert camera.get_stats()["frames_decoded"] == 1
+
+    frame = camera.get_fresh_frame(timeout=2.0)
+
+    assert frame is not None
+    assert camera.get_stats()["frames_decoded"] == 2
+    assert camera.get_stats()["frames_grabbed"] > 20
+
+
+# -------- file-backed RTSP stream --------
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _write_test_video(path, fps: int = 10, seconds: int = 2) -> None:
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (160, 120)
+    )
+    try:
+        for index in range(fps * seconds):
+            frame = np.full((120, 160, 3), (index * 10) % 256, dtype=np.uint8)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_file_backed_rtsp_stream(tmp_path):
+    video = tmp_path / "clip.mp4"
+    _write_test_video(video)
+    url = f"rtsp://127.0.0.1:{_free_port()}/live"
+
+    server = subprocess.Popen(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-re", "-stream_loop", "-1", "-i", str(video),
+            "-c:v", "mpeg4", "-f", "rtsp", "-rtsp_flags", "listen", url,
+        ],
+        stdin=subprocess.DEVNULL,
+    )
+    camera = RtspCamera(
+        url=url,
+        open_timeout=5.0,
+        read_timeout=5.0,
+        reconnect_initial_delay=0.2,
+        reconnect_max_delay=1.0,
+    )
+    try:
+        camera.set_consumer_fps("slow", 1.0)
+        camera.start()
+
+        # The camera retries until the listening server is up
+        assert _wait_for(lambda: camera.get_snapshot() is not None, timeout=20.0)
+        frame = camera.get_snapshot()
+        assert frame.shape == (120, 160, 3)
+
+        time.sleep(2.0)
+        stats = camera.get_stats()
+        assert stats["state"] == "streaming"
+        assert stats["frames_decoded"] < stats["frames_grabbed"]
+    finally:
+        camera.stop()
+        server.terminate()
+        try:
+            server.wait(timeout=5.0)
+        except subprocess.TimeoutExpired:
+            server.kill()
@@ -1,104 +1,408 @@
+import atexit
+import json
 import os
+import queue
+import random
 import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 from threading import Lock
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
 class _Logger:
     """
-    Simple, crash-safe, file-based logger.
+    Crash-safe, asynchronous file logger.
     Designed for 24/7 edge and long-running services.
     Must never raise exceptions.
+
+    Records are formatted in the calling thread and handed to a queue;
+    a background thread writes them in batches to a persistent file handle
+    (and stdout), rotating per day and by size.
+
+    Repeated messages are rate limited per (level, message) so an error
+    storm (e.g. a camera failing on every frame) collapses into a few
+    lines plus a "suppressed" summary. Each level can also be sampled.
+
+    Configured from the environment only (LOG_*), since config.settings
+    itself logs and may fail to import.
     """
 
     BASE_LOG_DIR = r"c:\smart-boss-files\logs"
 
+    # Records accepted per (level, message) within one rate limit window
+    RATE_LIMIT_BURST = 10
+    RATE_LIMIT_WINDOW_SECONDS = 60.0
+    _RATE_LIMIT_MAX_KEYS = 2000
+
+    _BATCH_MAX_RECORDS = 500
+
     def __init__(self):
         self._lock = Lock()
 
-    def _ensure_log_dir_exists(self):
+        self.log_dir = os.getenv("LOG_DIR") or self.BASE_LOG_DIR
+        self.json_lines = os.getenv("LOG_FORMAT", "text").strip().lower() == "json"
+        self.to_stdout = _env_bool("LOG_STDOUT", True)
+        self.max_bytes = int(_env_float("LOG_MAX_BYTES", 50 * 1024 * 1024))
+        self.flush_interval = _env_float("LOG_FLUSH_INTERVAL_SECONDS", 0.5)
+        self.rate_limit_burst = int(_env_float("LOG_RATE_LIMIT_BURST", self.RATE_LIMIT_BURST))
+        self.rate_limit_window = _env_float(
+            "LOG_RATE_LIMIT_WINDOW_SECONDS",
+            self.RATE_LIMIT_WINDOW_SECONDS,
+        )
+        self.sample_rates = {
+            level: min(1.0, max(0.0, _env_float(f"LOG_SAMPLE_{level.upper()}", 1.0)))
+            for level in ("log", "warning", "error")
+        }
+
+        self._queue = queue.Queue(maxsize=int(_env_float("LOG_QUEUE_SIZE", 10000)))
+        self._dropped = 0
+
+        # key -> [window_start, count, suppressed]
+        self._rate_state = {}
+
+        self._writer = None
+        self._writer_pid = None
+        self._stop_event = threading.Event()
+
+        # Writer-thread only
+        self._file = None
+        self._file_day = None
+        self._file_size = 0
+
+        atexit.register(self.close)
+
+    # -------- configuration --------
+
+    def configure(
+        self,
+        log_dir=None,
+        json_lines=None,
+        to_stdout=None,
+        max_bytes=None,
+        sample_rates=None,
+        rate_limit_burst=None,
+        rate_limit_window=None,
+    ):
+        """
+        Override the environment configuration at runtime.
+        Takes effect for the next written batch.
+        """
         try:
-            os.makedirs(self.BASE_LOG_DIR, exist_ok=True)
+            with self._lock:
+                if log_dir is not None:
+                    self.log_dir = log_dir
+                    self._file_day = None  # reopen in the new directory
+                if json_lines is not None:
+                    self.json_lines = bool(json_lines)
+                    self._file_day = None
+                if to_stdout is not None:
+                    self.to_stdout = bool(to_stdout)
+                if max_bytes is not None:
+                    self.max_bytes = int(max_bytes)
+                if sample_rates:
+                    self.sample_rates.update(sample_rates)
+                if rate_limit_burst is not None:
+                    self.rate_limit_burst = int(rate_limit_burst)
+                if rate_limit_window is not None:
+                    self.rate_limit_window = float(rate_limit_window)
         except Exception:
-            # Absolutely nothing should break logging
             pass
 
-    def _get_log_file_path(self) -> str:
-        today = datetime.now().strftime("%Y-%m-%d")
-        return os.path.join(self.BASE_LOG_DIR, f"{today}-logs.txt")
+    # -------- caller side --------
+
+    def _format_exception(self, exc_info) -> str:
+        try:
+            if isinstance(exc_info, BaseException):
+                tb = "".join(
+                    traceback.format_exception(
+                        type(exc_info),
+                        exc_info,
+                        exc_info.__traceback__,
+                    )
+                )
+            else:
+                tb = "".join(traceback.format_exception(*exc_info))
+            return tb.rstrip()
+        except Exception:
+            return "<<Failed to format exception>>"
+
+    def _format_record(self, now: float, level: str, message: str, exc_text=None, fields=None) -> str:
+        if self.json_lines:
+            record = {
+                "ts": datetime.fromtimestamp(now).isoformat(timespec="milliseconds"),
+                "level": level,
+                "thread": threading.current_thread().name,
+                "message": message,
+            }
+            if fields:
+                record.update(fields)
+            if exc_text:
+                record["exception"] = exc_text
+            return json.dumps(record, default=str, ensure_ascii=False) + "\n"
+
+        timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        line = f"[{timestamp}] [{level.upper()}] {message}"
+        if fields:
+            line += " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if exc_text:
+            line += "\n" + exc_text
+        return line + "\n"
+
+    def _admit(self, now: float, level: str, message: str):
+        """
+        Rate limit by (level, message). Returns (accepted, suppressed_count)
+        where suppressed_count is reported once when a new window opens.
+        """
+        if self.rate_limit_burst <= 0:
+            return True, 0
+
+        key = (level, message)
+
+        with self._lock:
+            state = self._rate_state.get(key)
+
+            if state is None:
+                if len(self._rate_state) >= self._RATE_LIMIT_MAX_KEYS:
+                    self._rate_state.clear()
+                self._rate_state[key] = [now, 1, 0]
+                return True, 0
+
+            if now - state[0] >= self.rate_limit_window:
+                suppressed = state[2]
+                state[0], state[1], state[2] = now, 1, 0
+                return True, suppressed
+
+            if state[1] < self.rate_limit_burst:
+                state[1] += 1
+                return True, 0
 
-    def _format_message(self, level: str, message: str) -> str:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return f"[{timestamp}] [{level.upper()}] {message}"
+            state[2] += 1
+            return False, 0
 
-    def _write(self, level: str, message: str, exc_info=None):
+    def _write(self, level: str, message: str, exc_info=None, fields=None):
         try:
-            self._ensure_log_dir_exists()
+            rate = self.sample_rates.get(level, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                return
 
-            log_lines = []
+            now = time.time()
 
-            base_line = self._format_message(level, message)
-            log_lines.append(base_line)
+            accepted, suppressed = self._admit(now, level, message)
+            if not accepted:
+                return
 
-            if exc_info:
-                try:
-                    if isinstance(exc_info, BaseException):
-                        tb = "".join(
-                            traceback.format_exception(
-                                type(exc_info),
-                                exc_info,
-                                exc_info.__traceback__,
-                            )
-                        )
-                    else:
-                        tb = "".join(traceback.format_exception(*exc_info))
-                    log_lines.append(tb.rstrip())
-                except Exception:
-                    log_lines.append("<<Failed to format exception>>")
+            if suppressed:
+                message = f"{message} (suppressed {suppressed} similar in last window)"
 
-            final_text = "\n".join(log_lines) + "\n"
+            exc_text = self._format_exception(exc_info) if exc_info else None
+            text = self._format_record(now, level, message, exc_text, fields)
 
-            # Always print to stdout (useful for Docker / services)
-            try:
-                sys.stdout.write(final_text)
-                sys.stdout.flush()
-            except Exception:
-                pass
+            self._ensure_writer()
 
-            # File write must be thread-safe
-            with self._lock:
-                try:
-                    with open(
-                        self._get_log_file_path(),
-                        "a",
-                        encoding="utf-8",
-                        buffering=1,
-                    ) as f:
-                        f.write(final_text)
-                        f.flush()
-                except Exception:
-                    # Disk errors must never propagate
-                    pass
+            try:
+                self._queue.put_nowait(text)
+            except queue.Full:
+                # Never block a camera thread on logging
+                self._dropped += 1
 
         except Exception:
             # Ultimate safety net: logger must never crash
             pass
 
-    def log(self, message: str):
-        self._write("log", message)
+    def log(self, message: str, **fields):
+        self._write("log", message, fields=fields)
 
-    def warning(self, message: str):
-        self._write("warning", message)
+    def warning(self, message: str, **fields):
+        self._write("warning", message, fields=fields)
 
-    def error(self, message: str, exc_info=None):
+    def error(self, message: str, exc_info=None, **fields):
         """
         Log an error.
         exc_info can be:
         - an Exception instance
         - sys.exc_info()
+        Extra keyword fields are added to the record.
+        """
+        self._write("error", message, exc_info=exc_info, fields=fields)
+
+    # -------- writer side --------
+
+    def _ensure_writer(self):
+        # Restart after fork: threads do not survive into the child
+        pid = os.getpid()
+        if self._writer is not None and self._writer_pid == pid:
+            return
+
+        with self._lock:
+            if self._writer is not None and self._writer_pid == pid:
+                return
+            if self._writer_pid is not None and self._writer_pid != pid:
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._file = None
+                self._file_day = None
+            self._stop_event.clear()
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name="LoggerWriter",
+                daemon=True,
+            )
+            self._writer_pid = pid
+            self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                continue
+
+            batch = [first]
+            try:
+                while len(batch) < self._BATCH_MAX_RECORDS:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            self._write_batch(batch)
+
+        self._close_file()
+
+    def _write_batch(self, batch):
+        try:
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                batch.append(
+                    self._format_record(
+                        time.time(),
+                        "warning",
+                        f"Logger queue full, dropped {dropped} records",
+                    )
+                )
+
+            text = "".join(batch)
+
+            # Always print to stdout (useful for Docker / services)
+            if self.to_stdout:
+                try:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                except Exception:
+                    pass
+
+            try:
+                f = self._current_file(len(text))
+                if f is not None:
+                    f.write(text)
+                    f.flush()
+                    self._file_size += len(text)
+            except Exception:
+                # Disk errors must never propagate
+                self._close_file()
+
+        except Exception:
+            pass
+
+    def _log_file_path(self, day: str) -> str:
+        extension = "jsonl" if self.json_lines else "txt"
+        return os.path.join(self.log_dir, f"{day}-logs.{extension}")
+
+    def _current_file(self, incoming: int):
+        """
+        Open handle for today's log file, rotated when the day changes or
+        the file would grow past max_bytes.
+        """
+        day = datetime.now().strftime("%Y-%m-%d")
+
+        if self._file is not None and self._file_day == day:
+            if self.max_bytes <= 0 or self._file_size + incoming <= self.max_bytes:
+                return self._file
+            self._close_file()
+            self._rotate_by_size(self._log_file_path(day))
+
+        elif self._file is not None:
+            self._close_file()
+
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+        except Exception:
+            # Absolutely nothing should break logging
+            pass
+
+        path = self._log_file_path(day)
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_day = day
+        self._file_size = self._file.tell()
+        return self._file
+
+    def _rotate_by_size(self, path: str):
+        """
+        Move a full log file aside as <name>.1, <name>.2, ... (first free index).
+        """
+        try:
+            base, extension = os.path.splitext(path)
+            index = 1
+            while os.path.exists(f"{base}.{index}{extension}"):
+                index += 1
+            os.replace(path, f"{base}.{index}{extension}")
+        except Exception:
+            pass
+
+    def _close_file(self):
+        try:
+            if self._file is not None:
+                self._file.close()
+        except Exception:
+            pass
+        self._file = None
+        self._file_day = None
+
+    # -------- lifecycle --------
+
+    def flush(self, timeout: float = 5.0):
         """
-        self._write("error", message, exc_info=exc_info)
+        Block until queued records are written (best effort).
+        """
+        try:
+            deadline = time.time() + timeout
+            while not self._queue.empty() and time.time() < deadline:
+                time.sleep(0.01)
+        except Exception:
+            pass
+
+    def close(self, timeout: float = 5.0):
+        """
+        Write pending records and stop the writer thread.
+        Logging afterwards starts a new writer.
+        """
+        try:
+            writer = self._writer
+            if writer is None or self._writer_pid != os.getpid():
+                return
+            self._stop_event.set()
+            writer.join(timeout)
+            with self._lock:
+                if self._writer is writer:
+                    self._writer = None
+        except Exception:
+            pass
 
 
 # Singleton logger instance
@@ -0,0 +1,376 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.logger import logger
+
+
+class _NoopMetric:
+    """
+    Returned while metrics are disabled: every operation is a no-op,
+    so instrumented hot paths only pay for one attribute check.
+    """
+
+    def inc(self, value: float = 1.0) -> None:
+        pass
+
+    def dec(self, value: float = 1.0) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopMetric()
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, value: float = 1.0) -> None:
+        with self._lock:
+            self.value += value
+
+
+class Gauge:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, value: float = 1.0) -> None:
+        with self._lock:
+            self.value += value
+
+    def dec(self, value: float = 1.0) -> None:
+        self.inc(-value)
+
+
+class Histogram:
+    """
+    HDR-style latency histogram in seconds: fixed log-linear buckets
+    (SUB_BUCKETS per doubling, ~19% relative error) from MIN_VALUE up,
+    so recording is O(1) and percentiles need no stored samples.
+    """
+
+    MIN_VALUE = 1e-5      # 10 us
+    SUB_BUCKETS = 4       # buckets per doubling
+    BUCKET_COUNT = 96     # up to ~ 10us * 2^24 = 168 s
+
+    # Prometheus 'le' bounds: every EXPORT_STRIDE-th bucket (x4 steps)
+    EXPORT_STRIDE = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (self.BUCKET_COUNT + 1)  # last slot: overflow
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def upper_bound(cls, index: int) -> float:
+        return cls.MIN_VALUE * 2 ** ((index + 1) / cls.SUB_BUCKETS)
+
+    @classmethod
+    def _index(cls, value: float) -> int:
+        if value <= cls.MIN_VALUE:
+            return 0
+        index = int(math.log2(value / cls.MIN_VALUE) * cls.SUB_BUCKETS)
+        return min(index, cls.BUCKET_COUNT)
+
+    def observe(self, value: float) -> None:
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> Tuple[List[int], int, float, float]:
+        with self._lock:
+            return list(self.counts), self.count, self.sum, self.max
+
+    @classmethod
+    def percentile(cls, counts: List[int], total: int, q: float) -> float:
+        if total <= 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return cls.upper_bound(index)
+        return cls.upper_bound(cls.BUCKET_COUNT)
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.children: Dict[LabelKey, object] = {}
+
+
+_KINDS = {
+    "counter": Counter,
+    "gauge": Gauge,
+    "histogram": Histogram,
+}
+
+
+class MetricsRegistry:
+    """
+    In-process metrics: counters, gauges and latency histograms, keyed
+    by name and labels (e.g. camera=...).
+
+    Disabled by default; while disabled every accessor returns a shared
+    no-op, so instrumentation can stay in hot paths.
+    Exposed in Prometheus text format and as a periodic summary log line.
+    Must never raise.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+        # Histogram snapshots at the last summary line (windowed percentiles)
+        self._summary_marks: Dict[Tuple[str, LabelKey], List[int]] = {}
+        self._summary_thread: Optional[threading.Thread] = None
+        self._summary_stop = threading.Event()
+
+    # -------- accessors --------
+
+    def _child(self, kind: str, name: str, help_text: str, labels: dict):
+        try:
+            key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+            family = self._families.get(name)
+            if family is not None:
+                child = family.children.get(key)
+                if child is not None:
+                    return child
+
+            with self._lock:
+                family = self._families.get(name)
+                if family is None:
+                    family = _Family(name, kind, help_text)
+                    self._families[name] = family
+                elif family.kind != kind:
+                    logger.warning(f"Metric {name} is a {family.kind}, not a {kind}")
+                    return _NOOP
+                if help_text and not family.help:
+                    family.help = help_text
+
+                child = family.children.get(key)
+                if child is None:
+                    child = _KINDS[kind]()
+                    family.children[key] = child
+                return child
+
+        except Exception as e:
+            logger.error(f"Metric lookup failed | name={name}", exc_info=e)
+            return _NOOP
+
+    def counter(self, name: str, help: str = "", **labels):
+        if not self.enabled:
+            return _NOOP
+        return self._child("counter", name, help, labels)
+
+    def gauge(self, name: str, help: str = "", **labels):
+        if not self.enabled:
+            return _NOOP
+        return self._child("gauge", name, help, labels)
+
+    def histogram(self, name: str, help: str = "", **labels):
+        if not self.enabled:
+            return _NOOP
+        return self._child("histogram", name, help, labels)
+
+    def timer(self, name: str, help: str = "", **labels):
+        """
+        Context manager recording the block duration (seconds) into
+        histogram 'name'.
+        """
+        if not self.enabled:
+            return _NOOP
+        histogram = self._child("histogram", name, help, labels)
+        if histogram is _NOOP:
+            return _NOOP
+        return _Timer(histogram)
+
+    # -------- exposition --------
+
+    def _families_snapshot(self) -> List[Tuple[_Family, List[Tuple[LabelKey, object]]]]:
+        with self._lock:
+            return [
+                (family, list(family.children.items()))
+                for family in sorted(self._families.values(), key=lambda f: f.name)
+            ]
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key)
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(
+                k,
+                v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+            )
+            for k, v in pairs
+        )
+        return "{" + body + "}"
+
+    def render_prometheus(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        try:
+            for family, children in self._families_snapshot():
+                if family.help:
+                    lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+
+                for key, child in children:
+                    if family.kind != "histogram":
+                        lines.append(
+                            f"{family.name}{self._format_labels(key)} {child.value:g}"
+                        )
+                        continue
+
+                    counts, total, total_sum, _ = child.snapshot()
+                    cumulative = 0
+                    for index, count in enumerate(counts[:-1]):
+                        cumulative += count
+                        if (index + 1) % Histogram.EXPORT_STRIDE == 0:
+                            le = f"{Histogram.upper_bound(index):.6g}"
+                            lines.append(
+                                f"{family.name}_bucket"
+                                f"{self._format_labels(key, ('le', le))} {cumulative}"
+                            )
+                    lines.append(
+                        f"{family.name}_bucket"
+                        f"{self._format_labels(key, ('le', '+Inf'))} {total}"
+                    )
+                    lines.append(f"{family.name}_sum{self._format_labels(key)} {total_sum:.6f}")
+                    lines.append(f"{family.name}_count{self._format_labels(key)} {total}")
+
+        except Exception as e:
+            logger.error("Metrics rendering failed", exc_info=e)
+
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self) -> str:
+        """
+        One-line digest: histogram count/p50/p99 since the previous
+        summary, and counter totals.
+        """
+        parts = []
+        try:
+            for family, children in self._families_snapshot():
+                for key, child in children:
+                    labels = ",".join(v for _, v in key)
+                    name = f"{family.name}[{labels}]" if labels else family.name
+
+                    if family.kind == "histogram":
+                        counts, _, _, _ = child.snapshot()
+                        mark_key = (family.name, key)
+                        previous = self._summary_marks.get(mark_key)
+                        self._summary_marks[mark_key] = counts
+                        if previous:
+                            counts = [c - p for c, p in zip(counts, previous)]
+                        total = sum(counts)
+                        if not total:
+                            continue
+                        p50 = Histogram.percentile(counts, total, 0.50) * 1000
+                        p99 = Histogram.percentile(counts, total, 0.99) * 1000
+                        parts.append(f"{name} n={total} p50={p50:.3g}ms p99={p99:.3g}ms")
+
+                    elif family.kind == "counter":
+                        parts.append(f"{name}={child.value:g}")
+
+        except Exception as e:
+            logger.error("Metrics summary failed", exc_info=e)
+
+        return " | ".join(parts)
+
+    def start_summary_logger(self, interval_seconds: float) -> None:
+        if interval_seconds <= 0 or self._summary_thread is not None:
+            return
+
+        self._summary_stop.clear()
+        self._summary_thread = threading.Thread(
+            target=self._summary_loop,
+            args=(interval_seconds,),
+            name="MetricsSummary",
+            daemon=True,
+        )
+        self._summary_thread.start()
+
+    def stop_summary_logger(self) -> None:
+        self._summary_stop.set()
+        thread = self._summary_thread
+        self._summary_thread = None
+        if thread:
+            thread.join(timeout=2)
+
+    def _summary_loop(self, interval_seconds: float) -> None:
+        while not self._summary_stop.wait(interval_seconds):
+            line = self.summary_line()
+            if line:
+                logger.log(f"Metrics | {line}")
+
+
+# Singleton registry (enabled by the Supervisor)
+metrics = MetricsRegistry()
+
+
+def count_gate_decision(gate: str, decision: str, camera: Optional[str]) -> None:
+    """
+    Count a pipeline gate outcome (e.g. gate="static_frame", decision="skip").
+    """
+    metrics.counter(
+        "observer_gate_decisions_total",
+        "Pipeline gate outcomes",
+        camera=camera,
+        gate=gate,
+        decision=decision,
+    ).inc()
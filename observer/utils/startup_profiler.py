@@ -0,0 +1,243 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+from typing import Dict, List, Optional
+
+from utils.logger import logger
+
+
+# Reported as loaded / not loaded: the imports worth avoiding at startup
+_HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "tiktoken",
+    "PySide6",
+    "firebase_admin",
+    "qdrant_client",
+    "hnswlib",
+)
+
+# Per-module loaders only: patching a shared loader would time every
+# module it loads as one
+_TIMED_LOADERS = (SourceFileLoader, SourcelessFileLoader, ExtensionFileLoader)
+
+
+class _ImportTimer:
+    """
+    sys.meta_path hook that times module execution, like
+    'python -X importtime': cumulative (with nested imports) and self
+    time per module.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = {}  # name -> [cumulative, self]
+        self._local = threading.local()
+        self._finding = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+
+        if isinstance(spec.loader, _TIMED_LOADERS):
+            self._wrap(spec.loader, fullname)
+        return spec
+
+    def _wrap(self, loader, fullname: str) -> None:
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            stack = self._stack()
+            stack.append(0.0)  # time spent in nested imports
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.timings[fullname] = [elapsed, elapsed - nested]
+
+        loader.exec_module = timed_exec_module
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class StartupProfiler:
+    """
+    Startup timings for STARTUP_PROFILE=true: module import times and
+    named init phases (Supervisor.start steps, model loading), written as
+    a JSON report when startup finishes and again for later phases
+    (background model loads).
+
+    Reads its own environment variables: it starts before settings.py
+    (and everything else) is imported.
+
+    Disabled (the default), every method is a no-op.
+    """
+
+    DEFAULT_REPORT_PATH = "c:/smart-boss-files/startup_profile.json"
+
+    def __init__(self):
+        self.enabled = False
+        self._start = time.perf_counter()
+        self._phases: List[Dict] = []
+        self._import_timer: Optional[_ImportTimer] = None
+        self._report_path: Optional[str] = None
+        self._finished = False
+        self._last_checkpoint: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def start_from_env(self) -> None:
+        if os.getenv("STARTUP_PROFILE", "false").lower() == "true":
+            self.start(os.getenv("STARTUP_PROFILE_PATH") or self.DEFAULT_REPORT_PATH)
+
+    def start(self, report_path: str) -> None:
+        """
+        Install the import hook. Call before the application imports.
+        """
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self._start = time.perf_counter()
+        self._report_path = report_path
+        self._import_timer = _ImportTimer()
+        sys.meta_path.insert(0, self._import_timer)
+
+    def checkpoint(self, name: Optional[str] = None) -> None:
+        """
+        Record the time since the previous checkpoint as phase 'name',
+        for sequential steps without a with-block each. Without a name,
+        only sets the starting point.
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        last = self._last_checkpoint or self._start
+        self._last_checkpoint = now
+        if name:
+            self.record(name, now - last, last)
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, start)
+
+    def record(self, name: str, seconds: float, started: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+
+        started = time.perf_counter() - seconds if started is None else started
+        with self._lock:
+            self._phases.append({
+                "name": name,
+                "start_s": round(started - self._start, 4),
+                "seconds": round(seconds, 4),
+                "thread": threading.current_thread().name,
+            })
+            finished = self._finished
+
+        if finished:
+            self._write()
+
+    def finish(self) -> None:
+        """
+        Startup done: write the report. The import hook stays installed,
+        so imports of models loading in the background are reported when
+        their phase is recorded.
+        """
+        if not self.enabled or self._finished:
+            return
+
+        self._finished = True
+        report = self._write()
+        if report:
+            slowest = ", ".join(
+                f"{item['module']}={item['cumulative_s']:.2f}s"
+                for item in report["imports"][:5]
+            )
+            logger.log(
+                f"Startup profile | total={report['total_s']:.2f}s "
+                f"slowest_imports=[{slowest}] report={self._report_path}"
+            )
+
+    def _report(self) -> Dict:
+        timings = dict(self._import_timer.timings) if self._import_timer else {}
+        imports = sorted(
+            (
+                {
+                    "module": name,
+                    "cumulative_s": round(cumulative, 4),
+                    "self_s": round(self_time, 4),
+                }
+                for name, (cumulative, self_time) in timings.items()
+            ),
+            key=lambda item: item["cumulative_s"],
+            reverse=True,
+        )
+
+        with self._lock:
+            phases = list(self._phases)
+
+        return {
+            "total_s": round(time.perf_counter() - self._start, 4),
+            "phases": phases,
+            "heavy_modules_loaded": {
+                name: name in sys.modules for name in _HEAVY_MODULES
+            },
+            "imports": imports[:200],
+        }
+
+    def _write(self) -> Optional[Dict]:
+        """
+        Must never raise: profiling must not affect startup.
+        """
+        try:
+            report = self._report()
+            directory = os.path.dirname(self._report_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            temp_path = f"{self._report_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            os.replace(temp_path, self._report_path)
+            return report
+
+        except Exception as e:
+            logger.error("Failed to write startup profile", exc_info=e)
+            return None
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,168 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Record:
+    """
+    A stored point as returned by scroll() (mirrors qdrant_client's Record).
+    """
+    id: Any
+    payload: Optional[dict] = None
+    vector: Optional[list] = None
+
+
+@dataclass
+class ScoredPoint(Record):
+    score: float = 0.0
+
+
+@dataclass
+class QueryResult:
+    """
+    search() result (mirrors qdrant_client's QueryResponse).
+    """
+    points: List[ScoredPoint] = field(default_factory=list)
+
+
+class VectorStore:
+    """
+    Interface of a vector store backend, used by ImageIndex, TextIndex,
+    retention and maintenance jobs.
+
+    Backends:
+    - QdrantClientWrapper: Qdrant server (vector_store/qdrant_wrapper.py)
+    - EmbeddedVectorStore: in-process, memory-mapped files
+      (vector_store/embedded_store.py)
+
+    Filters use one dict format on every backend:
+        {"must": [cond, ...], "must_not": [cond, ...]}
+    where cond is {"key": k, "range": {"gt"|"gte"|"lt"|"lte": x}} or
+    {"key": k, "match": {"value": v}}.
+
+    search() returns an object with .points (id, score, payload);
+    scroll() returns (points, next_offset), next_offset None at the end.
+
+    Hybrid collections hold a named dense vector and a named sparse vector
+    (token id -> weight); hybrid_search() fuses both rankings with
+    reciprocal rank fusion, so its scores are ranks, not similarities.
+    """
+
+    DENSE_VECTOR = "dense"
+    SPARSE_VECTOR = "sparse"
+
+    def ensure_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any = "Cosine",
+        profile=None,
+        migrate: bool = True,
+    ) -> None:
+        raise NotImplementedError
+
+    def ensure_hybrid_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any = "Cosine",
+        profile=None,
+        migrate: bool = True,
+    ) -> None:
+        raise NotImplementedError
+
+    def collection_exists(self, collection_name: str) -> bool:
+        raise NotImplementedError
+
+    def upsert(
+        self,
+        collection_name: str,
+        vector: List[float],
+        payload: Optional[dict] = None,
+        point_id: Optional[str] = None,
+    ) -> Optional[str]:
+        raise NotImplementedError
+
+    def upsert_hybrid(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        payload: Optional[dict] = None,
+        point_id: Optional[str] = None,
+    ) -> Optional[str]:
+        raise NotImplementedError
+
+    def search(
+        self,
+        collection_name: str,
+        vector: List[float],
+        limit: int,
+        score_threshold: Optional[float] = None,
+        filter: Optional[dict] = None,
+    ):
+        raise NotImplementedError
+
+    def hybrid_search(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        limit: int,
+        prefetch_limit: int = 50,
+        filter: Optional[dict] = None,
+        dense_score_threshold: Optional[float] = None,
+        sparse_score_threshold: Optional[float] = None,
+    ):
+        raise NotImplementedError
+
+    def scroll(
+        self,
+        collection_name: str,
+        limit: int = 1000,
+        offset=None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        filter: Optional[dict] = None,
+    ):
+        raise NotImplementedError
+
+    def count(self, collection_name: str, filter: Optional[dict] = None) -> int:
+        raise NotImplementedError
+
+    def delete_points(
+        self,
+        collection_name: str,
+        point_ids: list,
+        batch_size: int = 1000,
+    ) -> None:
+        raise NotImplementedError
+
+    def delete_by_filter(self, collection_name: str, filter: dict) -> None:
+        raise NotImplementedError
+
+    def set_payload_by_point_ids(
+        self,
+        collection_name: str,
+        point_ids: list,
+        payload: dict,
+    ) -> None:
+        raise NotImplementedError
+
+    def ensure_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: str,
+    ) -> None:
+        """
+        Backends that filter without indexes may ignore this.
+        """
+
+    def create_snapshot(self, collection_name: str, keep: int = 3) -> Optional[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Flush and release resources. Idempotent.
+        """
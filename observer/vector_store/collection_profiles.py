@@ -0,0 +1,72 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from config import settings
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """
+    Storage layout of a Qdrant collection.
+
+    quantization: None, "int8" (scalar) or "binary". Quantized vectors
+    stay in RAM for the HNSW traversal; the float32 originals can live
+    on disk (mmap) and are only read to rescore the top
+    limit * oversampling candidates.
+    """
+    name: str
+    quantization: Optional[str] = None
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_on_disk: bool = False
+    search_hnsw_ef: int = 0  # 0 = Qdrant default
+    rescore: bool = True
+    oversampling: float = 1.0
+    quantile: float = 0.99  # int8 only: clip outliers when calibrating
+
+
+PROFILES = {
+    # Previous behaviour: plain float32, everything in RAM
+    "memory": CollectionProfile(name="memory"),
+
+    # ~4x less RAM for vectors, near-lossless with rescoring
+    "scalar": CollectionProfile(
+        name="scalar",
+        quantization="int8",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        oversampling=1.5,
+    ),
+
+    # ~32x less RAM for vectors; needs more oversampling to keep recall
+    "binary": CollectionProfile(
+        name="binary",
+        quantization="binary",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        oversampling=3.0,
+    ),
+}
+
+
+def get_profile(name: Optional[str]) -> CollectionProfile:
+    """
+    Profile by name (empty = "memory"), with the HNSW settings from the
+    environment applied. Raises ValueError for unknown names.
+    """
+    profile = PROFILES.get((name or "memory").strip().lower())
+    if profile is None:
+        raise ValueError(
+            f"Unknown Qdrant collection profile '{name}' "
+            f"(expected one of: {', '.join(PROFILES)})"
+        )
+
+    return replace(
+        profile,
+        hnsw_m=settings.QDRANT_HNSW_M,
+        hnsw_ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+        hnsw_on_disk=settings.QDRANT_HNSW_ON_DISK,
+        search_hnsw_ef=settings.QDRANT_SEARCH_HNSW_EF,
+    )
@@ -0,0 +1,936 @@
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from vector_store.base import QueryResult, Record, ScoredPoint, VectorStore
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+_SUPPORTED_DISTANCES = ("Cosine", "Dot")
+
+# Rank offset of reciprocal rank fusion (same as Qdrant's RRF)
+RRF_K = 2
+
+
+def _distance_name(distance: Any) -> str:
+    # Accepts "Cosine" or a qdrant Distance enum member
+    name = str(getattr(distance, "value", distance))
+    if name not in _SUPPORTED_DISTANCES:
+        raise ValueError(
+            f"Embedded vector store supports {_SUPPORTED_DISTANCES} distances, not '{name}'"
+        )
+    return name
+
+
+def _json_default(value):
+    # numpy scalars in payloads (e.g. scores computed with numpy)
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _condition_matches(payload: dict, cond: dict) -> bool:
+    value = payload.get(cond.get("key"))
+
+    range_cond = cond.get("range")
+    if range_cond:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return False
+        if range_cond.get("gt") is not None and not value > range_cond["gt"]:
+            return False
+        if range_cond.get("gte") is not None and not value >= range_cond["gte"]:
+            return False
+        if range_cond.get("lt") is not None and not value < range_cond["lt"]:
+            return False
+        if range_cond.get("lte") is not None and not value <= range_cond["lte"]:
+            return False
+        return True
+
+    match_cond = cond.get("match")
+    if match_cond and "value" in match_cond:
+        expected = match_cond["value"]
+        # Like Qdrant, an array payload matches when any element matches
+        if isinstance(value, list):
+            return expected in value
+        return value == expected
+
+    return False
+
+
+def filter_matches(payload: Optional[dict], filter: Optional[dict]) -> bool:
+    """
+    Evaluate a VectorStore filter dict against one payload.
+    """
+    if not filter:
+        return True
+    payload = payload or {}
+    return (
+        all(_condition_matches(payload, cond) for cond in filter.get("must", []))
+        and not any(_condition_matches(payload, cond) for cond in filter.get("must_not", []))
+    )
+
+
+class _Collection:
+    """
+    One collection on disk:
+
+    - meta.json: vector size, distance, hybrid flag
+    - vectors.f32: float32 rows in a memory-mapped file, one slot per point
+      (Cosine vectors are stored normalized)
+    - points.jsonl: append-only log of point ids, slots, payloads and
+      sparse vectors, replayed on open and compacted when mostly garbage
+    - hnsw.bin: HNSW graph over the slots, saved on close
+
+    A vector is written before its log entry, so a crash between the two
+    only loses that point. Callers hold the lock.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(
+        self,
+        directory: str,
+        vector_size: int,
+        distance: str,
+        hnsw_threshold: int,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 100,
+        hnsw_ef: int = 0,
+        hybrid: bool = False,
+    ):
+        self.directory = directory
+        self.vector_size = vector_size
+        self.distance = distance
+        self.hybrid = hybrid
+        self.lock = threading.RLock()
+
+        self._hnsw_threshold = hnsw_threshold
+        self._hnsw_m = hnsw_m
+        self._hnsw_ef_construct = hnsw_ef_construct
+        self._hnsw_ef = hnsw_ef
+        self._hnsw = None
+        self._hnsw_dirty = False
+
+        self._ids: List[Optional[str]] = []
+        self._payloads: List[Optional[dict]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._free: List[int] = []
+
+        # Sparse vectors (hybrid only) and their inverted index:
+        # token id -> {slot: weight}
+        self._sparse: List[Optional[Dict[int, float]]] = []
+        self._postings: Dict[int, Dict[int, float]] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.memmap] = None
+        self._log = None
+        self._log_entries = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    # -------- files --------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self) -> None:
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["vector_size"] != self.vector_size:
+                raise ValueError(
+                    f"Embedded collection at {self.directory} has vector size "
+                    f"{meta['vector_size']}, expected {self.vector_size}"
+                )
+            if meta.get("hybrid", False) != self.hybrid:
+                raise ValueError(
+                    f"Embedded collection at {self.directory} has hybrid="
+                    f"{meta.get('hybrid', False)}, expected {self.hybrid}"
+                )
+            self.distance = meta.get("distance", self.distance)
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "vector_size": self.vector_size,
+                        "distance": self.distance,
+                        "hybrid": self.hybrid,
+                    },
+                    f,
+                )
+
+        capacity = self._INITIAL_CAPACITY
+        vectors_path = self._path("vectors.f32")
+        if os.path.exists(vectors_path):
+            row_bytes = self.vector_size * 4
+            capacity = max(capacity, os.path.getsize(vectors_path) // row_bytes)
+        self._map_vectors(capacity)
+
+        self._replay_log()
+        self._log = open(self._path("points.jsonl"), "a", encoding="utf-8")
+        if self._log.tell() > 0 and not self._log_ends_with_newline():
+            # Do not glue new entries onto a torn last line
+            self._log.write("\n")
+
+        self._load_hnsw()
+
+    def _map_vectors(self, capacity: int) -> None:
+        path = self._path("vectors.f32")
+        size = capacity * self.vector_size * 4
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+
+        self._vectors = np.memmap(
+            path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.vector_size),
+        )
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self._alive)] = self._alive[:capacity]
+        self._alive = alive
+
+    def _replay_log(self) -> None:
+        path = self._path("points.jsonl")
+        if not os.path.exists(path):
+            return
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                self._apply(entry)
+                self._log_entries += 1
+
+        self._free = [
+            slot for slot in range(len(self._ids)) if self._ids[slot] is None
+        ]
+
+    def _log_ends_with_newline(self) -> bool:
+        with open(self._path("points.jsonl"), "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _apply(self, entry: dict) -> None:
+        op = entry.get("op")
+
+        if op == "put":
+            slot = entry["slot"]
+            while len(self._ids) <= slot:
+                self._add_slot()
+            if slot >= len(self._alive):
+                self._map_vectors(max(slot + 1, len(self._alive) * 2))
+            self._ids[slot] = entry["id"]
+            self._payloads[slot] = entry.get("payload") or {}
+            self._slot_of[entry["id"]] = slot
+            self._alive[slot] = True
+
+            sparse = entry.get("sparse")
+            self._set_sparse(slot, dict(zip(sparse["i"], sparse["v"])) if sparse else None)
+
+        elif op == "del":
+            for point_id in entry["ids"]:
+                slot = self._slot_of.pop(point_id, None)
+                if slot is not None:
+                    self._ids[slot] = None
+                    self._payloads[slot] = None
+                    self._alive[slot] = False
+                    self._set_sparse(slot, None)
+
+        elif op == "set":
+            for point_id in entry["ids"]:
+                slot = self._slot_of.get(point_id)
+                if slot is not None:
+                    self._payloads[slot].update(entry["payload"])
+
+    def _append(self, entry: dict) -> None:
+        self._log.write(json.dumps(entry, default=_json_default) + "\n")
+        self._log.flush()
+        self._log_entries += 1
+
+    def _maybe_compact(self) -> None:
+        """
+        Rewrite the log once it is mostly superseded entries. Called after
+        an operation is applied in memory: the rewritten log is built from
+        memory and must include that operation.
+        """
+        if self._log_entries > 10000 and self._log_entries > 4 * len(self._slot_of):
+            self.compact()
+
+    def compact(self) -> None:
+        tmp_path = self._path("points.jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for point_id, slot in self._slot_of.items():
+                f.write(
+                    json.dumps(
+                        self._put_entry(point_id, slot, self._payloads[slot], self._sparse[slot]),
+                        default=_json_default,
+                    )
+                    + "\n"
+                )
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log.close()
+        os.replace(tmp_path, self._path("points.jsonl"))
+        self._log = open(self._path("points.jsonl"), "a", encoding="utf-8")
+        self._log_entries = len(self._slot_of)
+
+    def flush(self) -> None:
+        self._vectors.flush()
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._save_hnsw()
+
+    def close(self) -> None:
+        if self._log is None:
+            return
+        self.flush()
+        self._log.close()
+        self._log = None
+        self._vectors = None
+        self._hnsw = None
+
+    # -------- points --------
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def _prepare(self, vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if array.shape[0] != self.vector_size:
+            raise ValueError(
+                f"Vector size {array.shape[0]} does not match collection size {self.vector_size}"
+            )
+        if self.distance == "Cosine":
+            norm = float(np.linalg.norm(array))
+            if norm > 0:
+                array = array / norm
+        return array
+
+    def _add_slot(self) -> None:
+        self._ids.append(None)
+        self._payloads.append(None)
+        self._sparse.append(None)
+
+    @staticmethod
+    def _put_entry(point_id: str, slot: int, payload: dict, sparse) -> dict:
+        entry = {"op": "put", "id": point_id, "slot": slot, "payload": payload}
+        if sparse:
+            entry["sparse"] = {"i": list(sparse), "v": list(sparse.values())}
+        return entry
+
+    def _set_sparse(self, slot: int, sparse: Optional[Dict[int, float]]) -> None:
+        previous = self._sparse[slot]
+        if previous:
+            for token in previous:
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(slot, None)
+                    if not postings:
+                        del self._postings[token]
+
+        if sparse:
+            sparse = {int(token): float(weight) for token, weight in sparse.items()}
+            for token, weight in sparse.items():
+                self._postings.setdefault(token, {})[slot] = weight
+
+        self._sparse[slot] = sparse or None
+
+    def upsert(
+        self,
+        point_id: str,
+        vector,
+        payload: dict,
+        sparse: Optional[Dict[int, float]] = None,
+    ) -> None:
+        array = self._prepare(vector)
+
+        slot = self._slot_of.get(point_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._ids)
+                self._add_slot()
+                if slot >= len(self._alive):
+                    self._map_vectors(len(self._alive) * 2)
+
+        self._vectors[slot] = array
+        self._append(self._put_entry(point_id, slot, payload, sparse))
+
+        self._ids[slot] = point_id
+        self._payloads[slot] = dict(payload)
+        self._slot_of[point_id] = slot
+        self._alive[slot] = True
+        self._set_sparse(slot, sparse)
+
+        if self._hnsw is not None:
+            self._hnsw_add(np.asarray([slot]))
+
+        self._maybe_compact()
+
+    def delete(self, point_ids: list) -> int:
+        point_ids = [point_id for point_id in point_ids if point_id in self._slot_of]
+        if not point_ids:
+            return 0
+
+        self._append({"op": "del", "ids": point_ids})
+        for point_id in point_ids:
+            slot = self._slot_of.pop(point_id)
+            self._ids[slot] = None
+            self._payloads[slot] = None
+            self._alive[slot] = False
+            self._set_sparse(slot, None)
+            self._free.append(slot)
+            if self._hnsw is not None:
+                self._hnsw.mark_deleted(slot)
+                self._hnsw_dirty = True
+
+        self._maybe_compact()
+        return len(point_ids)
+
+    def set_payload(self, point_ids: list, payload: dict) -> None:
+        point_ids = [point_id for point_id in point_ids if point_id in self._slot_of]
+        if not point_ids:
+            return
+
+        self._append({"op": "set", "ids": point_ids, "payload": payload})
+        for point_id in point_ids:
+            self._payloads[self._slot_of[point_id]].update(payload)
+
+        self._maybe_compact()
+
+    def matching_slots(
+        self,
+        filter: Optional[dict],
+        start: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        slots = []
+        for slot in range(start, len(self._ids)):
+            if self._ids[slot] is not None and filter_matches(self._payloads[slot], filter):
+                slots.append(slot)
+                if limit is not None and len(slots) >= limit:
+                    break
+        return slots
+
+    def point_id(self, slot: int) -> str:
+        return self._ids[slot]
+
+    def record(self, slot: int, with_payload: bool, with_vectors: bool, cls=Record, **extra):
+        vector = None
+        if with_vectors:
+            vector = self._vectors[slot].tolist()
+            if self.hybrid:
+                # Named vectors, like Qdrant
+                vector = {"dense": vector, "sparse": dict(self._sparse[slot] or {})}
+
+        return cls(
+            id=self._ids[slot],
+            payload=dict(self._payloads[slot]) if with_payload else None,
+            vector=vector,
+            **extra,
+        )
+
+    # -------- search --------
+
+    def search(self, vector, limit: int, candidates: Optional[List[int]] = None) -> List[tuple]:
+        """
+        Top 'limit' (slot, score) pairs, best first. 'candidates'
+        restricts the search to those slots (filtered search, exact).
+        """
+        count = len(self._slot_of)
+        if count == 0 or limit <= 0:
+            return []
+
+        query = self._prepare(vector)
+
+        if candidates is not None:
+            if not candidates:
+                return []
+            slots = np.asarray(candidates)
+            scores = np.asarray(self._vectors[slots] @ query)
+            order = np.argsort(-scores)[:limit]
+            return [(int(slots[i]), float(scores[i])) for i in order]
+
+        limit = min(limit, count)
+
+        if self._hnsw is None and count >= self._hnsw_threshold:
+            self._build_hnsw()
+
+        if self._hnsw is not None:
+            try:
+                self._hnsw.set_ef(max(self._hnsw_ef or 0, limit * 2, 64))
+                labels, distances = self._hnsw.knn_query(query, k=limit)
+                # 'ip' space: distance = 1 - dot product
+                return [
+                    (int(slot), 1.0 - float(distance))
+                    for slot, distance in zip(labels[0], distances[0])
+                ]
+            except RuntimeError:
+                # Too few reachable elements (many deletions): exact search
+                pass
+
+        used = len(self._ids)
+        scores = np.asarray(self._vectors[:used] @ query)
+        scores[~self._alive[:used]] = -np.inf
+
+        if limit < used:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(used)
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(slot), float(scores[slot])) for slot in top if self._alive[slot]]
+
+    def sparse_search(
+        self,
+        sparse: Dict[int, float],
+        limit: int,
+        candidates: Optional[set] = None,
+    ) -> List[tuple]:
+        """
+        Top 'limit' (slot, dot product) pairs over the inverted index.
+        """
+        scores: Dict[int, float] = {}
+        for token, weight in sparse.items():
+            for slot, stored in self._postings.get(int(token), {}).items():
+                if candidates is None or slot in candidates:
+                    scores[slot] = scores.get(slot, 0.0) + weight * stored
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return best[:limit]
+
+    # -------- HNSW --------
+
+    def _build_hnsw(self) -> None:
+        if hnswlib is None:
+            if self._hnsw_threshold > 0:
+                logger.warning(
+                    f"hnswlib not installed, embedded collection {self.directory} "
+                    f"keeps exact search at {len(self._slot_of)} points"
+                )
+                # Do not warn on every search
+                self._hnsw_threshold = float("inf")
+            return
+
+        started = time.perf_counter()
+        index = hnswlib.Index(space="ip", dim=self.vector_size)
+        index.init_index(
+            max_elements=len(self._alive),
+            ef_construction=self._hnsw_ef_construct,
+            M=self._hnsw_m,
+        )
+        self._hnsw = index
+        self._hnsw_add(np.flatnonzero(self._alive))
+        self._hnsw_dirty = True
+
+        logger.log(
+            f"Embedded HNSW index built | collection={os.path.basename(self.directory)} "
+            f"points={len(self._slot_of)} seconds={time.perf_counter() - started:.1f}"
+        )
+
+    def _hnsw_add(self, slots: np.ndarray) -> None:
+        if len(slots) == 0:
+            return
+        if self._hnsw.get_max_elements() < len(self._alive):
+            self._hnsw.resize_index(len(self._alive))
+        self._hnsw.add_items(np.asarray(self._vectors[slots]), slots)
+        self._hnsw_dirty = True
+
+    def _save_hnsw(self) -> None:
+        if self._hnsw is None or not self._hnsw_dirty:
+            return
+        self._hnsw.save_index(self._path("hnsw.bin"))
+        with open(self._path("hnsw.json"), "w", encoding="utf-8") as f:
+            json.dump({"points": len(self._slot_of), "log_entries": self._log_entries}, f)
+        self._hnsw_dirty = False
+
+    def _load_hnsw(self) -> None:
+        index_path, state_path = self._path("hnsw.bin"), self._path("hnsw.json")
+        if hnswlib is None or not os.path.exists(index_path) or not os.path.exists(state_path):
+            return
+
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # Only valid if nothing changed after it was saved
+            if state.get("points") != len(self._slot_of) or state.get("log_entries") != self._log_entries:
+                return
+
+            index = hnswlib.Index(space="ip", dim=self.vector_size)
+            index.load_index(index_path, max_elements=len(self._alive))
+            self._hnsw = index
+        except Exception as e:
+            logger.warning(f"Embedded HNSW index not loaded, rebuilding on demand | {e}")
+            self._hnsw = None
+
+
+class EmbeddedVectorStore(VectorStore):
+    """
+    In-process vector store for single-box deployments and benchmarks:
+    no server, one directory per collection under 'path'.
+
+    Search is exact (numpy dot products over memory-mapped vectors) until
+    a collection reaches hnsw_threshold points, then an HNSW graph is used
+    (requires hnswlib; otherwise search stays exact). Filters are
+    evaluated in Python, so payload indexes are not needed. Quantization
+    profiles do not apply; their HNSW settings do.
+    Thread-safe: one lock per collection. Must be the only process
+    using 'path'.
+    """
+
+    def __init__(self, path: str, hnsw_threshold: int = 20000):
+        self._path = path
+        self._hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        os.makedirs(path, exist_ok=True)
+        atexit.register(self.close)
+
+        logger.log(f"Embedded vector store opened | path={path} hnsw_threshold={hnsw_threshold}")
+
+    def _collection(self, collection_name: str) -> _Collection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            raise KeyError(f"Collection '{collection_name}' does not exist")
+        return collection
+
+    # -------- VectorStore --------
+
+    def ensure_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any = "Cosine",
+        profile=None,
+        migrate: bool = True,
+    ) -> None:
+        self._ensure(collection_name, vector_size, distance, profile, hybrid=False)
+
+    def ensure_hybrid_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any = "Cosine",
+        profile=None,
+        migrate: bool = True,
+    ) -> None:
+        self._ensure(collection_name, vector_size, distance, profile, hybrid=True)
+
+    def _ensure(self, collection_name: str, vector_size: int, distance, profile, hybrid: bool) -> None:
+        with self._lock:
+            if collection_name in self._collections:
+                return
+
+            try:
+                collection = _Collection(
+                    directory=os.path.join(self._path, collection_name),
+                    vector_size=int(vector_size),
+                    distance=_distance_name(distance),
+                    hnsw_threshold=self._hnsw_threshold,
+                    hnsw_m=profile.hnsw_m if profile else 16,
+                    hnsw_ef_construct=profile.hnsw_ef_construct if profile else 100,
+                    hnsw_ef=profile.search_hnsw_ef if profile else 0,
+                    hybrid=hybrid,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to ensure embedded collection '{collection_name}'",
+                    exc_info=e,
+                )
+                raise
+
+            self._collections[collection_name] = collection
+            logger.log(
+                f"Embedded collection ready: {collection_name} | points={len(collection)}"
+            )
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self._collections or os.path.exists(
+            os.path.join(self._path, collection_name, "meta.json")
+        )
+
+    def upsert(
+        self,
+        collection_name: str,
+        vector: List[float],
+        payload: Optional[dict] = None,
+        point_id: Optional[str] = None,
+    ) -> Optional[str]:
+        return self.upsert_hybrid(collection_name, vector, {}, payload, point_id)
+
+    def upsert_hybrid(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        payload: Optional[dict] = None,
+        point_id: Optional[str] = None,
+    ) -> Optional[str]:
+        try:
+            pid = point_id or str(uuid4())
+            collection = self._collection(collection_name)
+
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="upsert",
+                collection=collection_name,
+            ):
+                with collection.lock:
+                    collection.upsert(pid, dense, payload or {}, sparse or None)
+
+            return pid
+
+        except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="upsert",
+                collection=collection_name,
+            ).inc()
+            logger.error(
+                f"Embedded upsert failed | collection={collection_name}",
+                exc_info=e,
+            )
+            return None
+
+    def search(
+        self,
+        collection_name: str,
+        vector: List[float],
+        limit: int,
+        score_threshold: Optional[float] = None,
+        filter: Optional[dict] = None,
+    ):
+        try:
+            collection = self._collection(collection_name)
+
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="search",
+                collection=collection_name,
+            ):
+                with collection.lock:
+                    candidates = collection.matching_slots(filter) if filter else None
+                    return QueryResult(
+                        points=[
+                            collection.record(slot, True, False, cls=ScoredPoint, score=score)
+                            for slot, score in collection.search(vector, limit, candidates)
+                            if score_threshold is None or score >= score_threshold
+                        ]
+                    )
+
+        except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="search",
+                collection=collection_name,
+            ).inc()
+            logger.error(
+                f"Embedded search failed | collection={collection_name}",
+                exc_info=e,
+            )
+            return QueryResult()
+
+    def hybrid_search(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        limit: int,
+        prefetch_limit: int = 50,
+        filter: Optional[dict] = None,
+        dense_score_threshold: Optional[float] = None,
+        sparse_score_threshold: Optional[float] = None,
+    ):
+        """
+        Dense and sparse candidates fused with reciprocal rank fusion,
+        scored like Qdrant's RRF: sum of 1 / (rank + RRF_K), rank from 0.
+        """
+        try:
+            collection = self._collection(collection_name)
+
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="hybrid_search",
+                collection=collection_name,
+            ):
+                with collection.lock:
+                    candidates = collection.matching_slots(filter) if filter else None
+
+                    rankings = [
+                        [
+                            slot
+                            for slot, score in collection.search(dense, prefetch_limit, candidates)
+                            if dense_score_threshold is None or score >= dense_score_threshold
+                        ]
+                    ]
+                    if sparse:
+                        rankings.append([
+                            slot
+                            for slot, score in collection.sparse_search(
+                                sparse,
+                                prefetch_limit,
+                                set(candidates) if candidates is not None else None,
+                            )
+                            if sparse_score_threshold is None or score >= sparse_score_threshold
+                        ])
+
+                    fused: Dict[int, float] = {}
+                    for ranking in rankings:
+                        for rank, slot in enumerate(ranking):
+                            fused[slot] = fused.get(slot, 0.0) + 1.0 / (rank + RRF_K)
+
+                    best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+                    return QueryResult(
+                        points=[
+                            collection.record(slot, True, False, cls=ScoredPoint, score=score)
+                            for slot, score in best
+                        ]
+                    )
+
+        except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="hybrid_search",
+                collection=collection_name,
+            ).inc()
+            logger.error(
+                f"Embedded hybrid search failed | collection={collection_name}",
+                exc_info=e,
+            )
+            return QueryResult()
+
+    def scroll(
+        self,
+        collection_name: str,
+        limit: int = 1000,
+        offset=None,
+        with_payload: bool = True,
+        with_vectors: bool = False,
+        filter: Optional[dict] = None,
+    ):
+        """
+        Offsets are slot numbers; points come in slot order.
+        """
+        collection = self._collection(collection_name)
+
+        with collection.lock:
+            # One extra match tells where the next page starts
+            slots = collection.matching_slots(filter, start=offset or 0, limit=limit + 1)
+            page = slots[:limit]
+            next_offset = slots[limit] if len(slots) > limit else None
+            return [
+                collection.record(slot, with_payload, with_vectors) for slot in page
+            ], next_offset
+
+    def count(self, collection_name: str, filter: Optional[dict] = None) -> int:
+        collection = self._collection(collection_name)
+        with collection.lock:
+            if not filter:
+                return len(collection)
+            return len(collection.matching_slots(filter))
+
+    def delete_points(
+        self,
+        collection_name: str,
+        point_ids: list,
+        batch_size: int = 1000,
+    ) -> None:
+        collection = self._collection(collection_name)
+        with collection.lock:
+            collection.delete(list(point_ids))
+
+    def delete_by_filter(self, collection_name: str, filter: dict) -> None:
+        collection = self._collection(collection_name)
+        with collection.lock:
+            collection.delete(
+                [collection.point_id(slot) for slot in collection.matching_slots(filter)]
+            )
+
+    def set_payload_by_point_ids(
+        self,
+        collection_name: str,
+        point_ids: list,
+        payload: dict,
+    ) -> None:
+        if not point_ids:
+            return
+        collection = self._collection(collection_name)
+        with collection.lock:
+            collection.set_payload(list(point_ids), payload)
+
+    def create_snapshot(self, collection_name: str, keep: int = 3) -> Optional[str]:
+        """
+        Copy the collection files to <path>/snapshots/<collection>/<name>
+        and delete all but the newest 'keep'.
+        """
+        collection = self._collection(collection_name)
+        name = time.strftime("%Y%m%d-%H%M%S")
+        snapshots_dir = os.path.join(self._path, "snapshots", collection_name)
+        target = os.path.join(snapshots_dir, name)
+
+        try:
+            with collection.lock:
+                collection.compact()
+                collection.flush()
+                shutil.copytree(collection.directory, target, dirs_exist_ok=True)
+
+            existing = sorted(os.listdir(snapshots_dir))
+            for old in existing[:-keep] if keep > 0 else []:
+                shutil.rmtree(os.path.join(snapshots_dir, old), ignore_errors=True)
+
+            return name
+
+        except Exception as e:
+            logger.error(
+                f"Embedded snapshot failed | collection={collection_name}",
+                exc_info=e,
+            )
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+            for name, collection in self._collections.items():
+                try:
+                    with collection.lock:
+                        collection.close()
+                except Exception as e:
+                    logger.error(f"Failed to close embedded collection '{name}'", exc_info=e)
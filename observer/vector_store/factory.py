@@ -0,0 +1,40 @@
+import threading
+from typing import Optional
+
+from config import settings
+from vector_store.base import VectorStore
+
+_store: Optional[VectorStore] = None
+_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """
+    Process-wide vector store for VECTOR_STORE_BACKEND ("qdrant" or
+    "embedded"), created on first use. Shared, because an embedded store
+    must be opened once per directory.
+    """
+    global _store
+
+    with _lock:
+        if _store is None:
+            backend = settings.VECTOR_STORE_BACKEND
+
+            if backend == "qdrant":
+                from vector_store.qdrant_wrapper import QdrantClientWrapper
+                _store = QdrantClientWrapper(
+                    host=settings.QDRANT_HOST,
+                    port=settings.QDRANT_PORT,
+                )
+            elif backend == "embedded":
+                from vector_store.embedded_store import EmbeddedVectorStore
+                _store = EmbeddedVectorStore(
+                    path=settings.EMBEDDED_STORE_PATH,
+                    hnsw_threshold=settings.EMBEDDED_HNSW_THRESHOLD,
+                )
+            else:
+                raise ValueError(
+                    f"Unknown VECTOR_STORE_BACKEND '{backend}' (expected qdrant or embedded)"
+                )
+
+        return _store
@@ -1,13 +1,13 @@
 from typing import List, Optional
-from time import time, perf_counter
+from time import time
 from datetime import datetime
 from typing import List, Optional
 
-from qdrant_client.models import Distance # type: ignore[unused-import]
 from config import settings
 
 from utils.logger import logger
-from vector_store.qdrant_wrapper import QdrantClientWrapper
+from vector_store.base import VectorStore
+from vector_store.collection_profiles import get_profile
 
 class ImageIndex:
     """
@@ -17,11 +17,11 @@ class ImageIndex:
 
     COLLECTION_NAME = settings.VECTOR_STORE_NAMESPACE
     VECTOR_SIZE = settings.VECTOR_SIZE  # CLIP ViT-B/16
-    DISTANCE = Distance.COSINE
+    DISTANCE = "Cosine"  # backend-neutral name (qdrant Distance.COSINE)
 
     def __init__(
         self,
-        qdrant: QdrantClientWrapper,
+        qdrant: VectorStore,
         score_threshold: float = 0.85,
         top_k: int = 3,
     ):
@@ -34,6 +34,8 @@ class ImageIndex:
             collection_name=self.COLLECTION_NAME,
             vector_size=self.VECTOR_SIZE,
             distance=self.DISTANCE,
+            profile=get_profile(settings.QDRANT_IMAGE_PROFILE),
+            migrate=settings.QDRANT_MIGRATE_COLLECTIONS,
         )
 
         
@@ -117,6 +119,54 @@ class ImageIndex:
             )
             return []
 
+    def search_history(
+        self,
+        embedding: List[float],
+        limit: int,
+        camera_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        """
+        Search runtime image points (no training anchors, no CLIP text
+        entries), filtered by the store before the top-k cut.
+
+        Used for CLIP text-to-image queries, so the threshold is
+        separate: text-image cosine scores are much lower than
+        image-image ones.
+        """
+        must = [{"key": "type", "match": {"value": "clip_image"}}]
+        if camera_id:
+            must.append({"key": "camera_id", "match": {"value": camera_id}})
+
+        time_range = {}
+        if since is not None:
+            time_range["gte"] = since
+        if until is not None:
+            time_range["lte"] = until
+        if time_range:
+            must.append({"key": "timestamp", "range": time_range})
+
+        try:
+            response = self._qdrant.search(
+                collection_name=self.COLLECTION_NAME,
+                vector=embedding,
+                limit=limit,
+                score_threshold=score_threshold,
+                filter={
+                    "must": must,
+                    "must_not": [
+                        {"key": "pipeline", "match": {"value": "cycle_training"}}
+                    ],
+                },
+            )
+            return response.points
+
+        except Exception as e:
+            logger.error("ImageIndex history search failed", exc_info=e)
+            return []
+
     def add(
         self,
         embedding: List[float],
@@ -144,18 +194,11 @@ class ImageIndex:
         if metadata:
             payload.update(metadata)
 
-        start_ts = perf_counter()
-        try:
-            result = self._qdrant.upsert(
-                collection_name=self.COLLECTION_NAME,
-                vector=embedding,
-                payload=payload,
-            )
-            return result
-        finally:
-            elapsed_ms = (perf_counter() - start_ts) * 1000
-            #print(f"Vector DB upsert time: {elapsed_ms:.2f} ms | camera={camera_id}")
-            
+        return self._qdrant.upsert(
+            collection_name=self.COLLECTION_NAME,
+            vector=embedding,
+            payload=payload,
+        )
 
     def add_clip_text(
         self,
@@ -192,6 +235,33 @@ class ImageIndex:
             payload=payload,
         )
 
+    def delete_older_than(self, cutoff_ts: float) -> None:
+        """
+        Delete runtime points with timestamp < cutoff_ts.
+        Cycle training points are the learned model and are never expired.
+        """
+        self._qdrant.delete_by_filter(
+            collection_name=self.COLLECTION_NAME,
+            filter={
+                "must": [
+                    {
+                        "key": "timestamp",
+                        "range": {
+                            "lt": cutoff_ts
+                        },
+                    }
+                ],
+                "must_not": [
+                    {
+                        "key": "pipeline",
+                        "match": {
+                            "value": "cycle_training"
+                        },
+                    }
+                ],
+            },
+        )
+
     def delete_by_ingest_percent(self, percent: float, ingest_seq: int) -> None:
         """
         Delete oldest vectors by ingest_seq percentage.
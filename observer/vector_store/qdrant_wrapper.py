@@ -1,21 +1,48 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import uuid4
 from typing import Any
-from qdrant_client.http.models import Filter, FieldCondition, MatchValue, Range
 
 from utils.logger import logger
+from utils.metrics import metrics
+from vector_store.base import VectorStore
+from vector_store.collection_profiles import CollectionProfile
 
 try:
     from qdrant_client import QdrantClient
+    from qdrant_client.http.models import Filter, FieldCondition, MatchValue, Range
     from qdrant_client.models import VectorParams, Distance, PointStruct, Prefetch, SearchRequest
+    from qdrant_client.models import PayloadSchemaType, PointIdsList
+    from qdrant_client.models import (
+        BinaryQuantization,
+        BinaryQuantizationConfig,
+        CollectionParamsDiff,
+        Disabled,
+        HnswConfigDiff,
+        QuantizationSearchParams,
+        ScalarQuantization,
+        ScalarQuantizationConfig,
+        ScalarType,
+        SearchParams,
+        VectorParamsDiff,
+    )
+    from qdrant_client.models import (
+        Fusion,
+        FusionQuery,
+        SparseIndexParams,
+        SparseVector,
+        SparseVectorParams,
+    )
 except ImportError:
     QdrantClient = None
     VectorParams = None
     Distance = None
     PointStruct = None
+    PayloadSchemaType = None
+    PointIdsList = None
+    Filter = None
 
 
-class QdrantClientWrapper:
+class QdrantClientWrapper(VectorStore):
     """
     Low-level, safe wrapper around Qdrant.
     Responsible ONLY for raw vector DB operations.
@@ -39,30 +66,91 @@ class QdrantClientWrapper:
             logger.error("Failed to initialize Qdrant client", exc_info=e)
             raise
 
+        # Storage profile per collection (search-time quantization params)
+        self._profiles: Dict[str, CollectionProfile] = {}
+
     def ensure_collection(
         self,
         collection_name: str,
         vector_size: int,
-        distance: Any = Distance.COSINE,
+        distance: Any = "Cosine",
+        profile: Optional[CollectionProfile] = None,
+        migrate: bool = True,
+    ) -> None:
+        """
+        Ensure a collection exists with the given vector configuration
+        and storage profile (quantization, on-disk storage, HNSW).
+
+        An existing collection whose layout differs from the profile is
+        updated in place when 'migrate' is set (Qdrant rebuilds segments
+        in the background; searches keep working meanwhile). Idempotent:
+        nothing is sent when the layout already matches.
+        """
+        self._ensure(collection_name, vector_size, distance, profile, migrate, hybrid=False)
+
+    def ensure_hybrid_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any = "Cosine",
+        profile: Optional[CollectionProfile] = None,
+        migrate: bool = True,
     ) -> None:
         """
-        Ensure a collection exists with the given vector configuration.
-        Idempotent.
+        Like ensure_collection(), with a named dense vector and a named
+        sparse vector.
         """
+        self._ensure(collection_name, vector_size, distance, profile, migrate, hybrid=True)
+
+    def _ensure(
+        self,
+        collection_name: str,
+        vector_size: int,
+        distance: Any,
+        profile: Optional[CollectionProfile],
+        migrate: bool,
+        hybrid: bool,
+    ) -> None:
+        if profile is not None:
+            self._profiles[collection_name] = profile
+        if isinstance(distance, str):
+            distance = Distance(distance)
+
         try:
-            collections = self._client.get_collections().collections
-            if any(c.name == collection_name for c in collections):
+            if self.collection_exists(collection_name):
+                if profile is not None:
+                    self._migrate_collection(collection_name, vector_size, profile, migrate, hybrid)
                 return
 
-            self._client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance=distance,
-                ),
+            dense_params = VectorParams(
+                size=vector_size,
+                distance=distance,
+                on_disk=profile.on_disk_vectors if profile else None,
             )
+            options = {}
+            if hybrid:
+                options["vectors_config"] = {self.DENSE_VECTOR: dense_params}
+                options["sparse_vectors_config"] = {
+                    self.SPARSE_VECTOR: SparseVectorParams(
+                        index=SparseIndexParams(
+                            on_disk=profile.on_disk_vectors if profile else None,
+                        ),
+                    ),
+                }
+            else:
+                options["vectors_config"] = dense_params
+
+            if profile is not None:
+                options["hnsw_config"] = self._hnsw_config(profile)
+                options["quantization_config"] = self._quantization_config(profile)
+                options["on_disk_payload"] = profile.on_disk_payload
 
-            logger.log(f"Qdrant collection created: {collection_name}")
+            self._client.create_collection(collection_name=collection_name, **options)
+
+            logger.log(
+                f"Qdrant collection created: {collection_name} "
+                f"| profile={profile.name if profile else 'default'} hybrid={hybrid}"
+            )
 
         except Exception as e:
             logger.error(
@@ -71,6 +159,133 @@ class QdrantClientWrapper:
             )
             raise
 
+    def collection_exists(self, collection_name: str) -> bool:
+        collections = self._client.get_collections().collections
+        return any(c.name == collection_name for c in collections)
+
+    def _migrate_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        profile: CollectionProfile,
+        migrate: bool,
+        hybrid: bool = False,
+    ) -> None:
+        config = self._client.get_collection(collection_name=collection_name).config
+        vectors = config.params.vectors
+
+        # Unnamed vs named (hybrid) layout cannot be converted in place
+        vector_name = self.DENSE_VECTOR if hybrid else ""
+        if isinstance(vectors, dict) != hybrid or (hybrid and vector_name not in vectors):
+            logger.error(
+                f"Qdrant collection '{collection_name}' vector layout does not match "
+                f"(hybrid={hybrid}), profile '{profile.name}' not applied"
+            )
+            return
+        if hybrid:
+            vectors = vectors[vector_name]
+        if vectors.size != vector_size:
+            logger.error(
+                f"Qdrant collection '{collection_name}' has vector size {vectors.size}, "
+                f"expected {vector_size}; recreate it to change the embedding model"
+            )
+            return
+
+        changes = {}
+
+        if bool(vectors.on_disk) != profile.on_disk_vectors:
+            changes["vectors_config"] = {
+                vector_name: VectorParamsDiff(on_disk=profile.on_disk_vectors),
+            }
+
+        if bool(config.params.on_disk_payload) != profile.on_disk_payload:
+            changes["collection_params"] = CollectionParamsDiff(
+                on_disk_payload=profile.on_disk_payload,
+            )
+
+        hnsw = config.hnsw_config
+        if (
+            hnsw.m != profile.hnsw_m
+            or hnsw.ef_construct != profile.hnsw_ef_construct
+            or bool(hnsw.on_disk) != profile.hnsw_on_disk
+        ):
+            changes["hnsw_config"] = self._hnsw_config(profile)
+
+        if self._quantization_kind(config.quantization_config) != profile.quantization:
+            changes["quantization_config"] = (
+                self._quantization_config(profile) or Disabled.DISABLED
+            )
+
+        if not changes:
+            return
+
+        if not migrate:
+            logger.warning(
+                f"Qdrant collection '{collection_name}' differs from profile "
+                f"'{profile.name}' ({', '.join(changes)}); migration disabled"
+            )
+            return
+
+        self._client.update_collection(collection_name=collection_name, **changes)
+        logger.log(
+            f"Qdrant collection migrated: {collection_name} | profile={profile.name} "
+            f"changed={', '.join(changes)}"
+        )
+
+    @staticmethod
+    def _hnsw_config(profile: CollectionProfile):
+        return HnswConfigDiff(
+            m=profile.hnsw_m,
+            ef_construct=profile.hnsw_ef_construct,
+            on_disk=profile.hnsw_on_disk,
+        )
+
+    @staticmethod
+    def _quantization_config(profile: CollectionProfile):
+        if profile.quantization == "int8":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=profile.quantile,
+                    always_ram=True,
+                ),
+            )
+        if profile.quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True),
+            )
+        return None
+
+    @staticmethod
+    def _quantization_kind(quantization) -> Optional[str]:
+        if getattr(quantization, "scalar", None) is not None:
+            return "int8"
+        if getattr(quantization, "binary", None) is not None:
+            return "binary"
+        if getattr(quantization, "product", None) is not None:
+            return "product"
+        return None
+
+    def _search_params(self, collection_name: str):
+        profile = self._profiles.get(collection_name)
+        if profile is None:
+            return None
+
+        quantization = None
+        if profile.quantization:
+            quantization = QuantizationSearchParams(
+                rescore=profile.rescore,
+                oversampling=profile.oversampling,
+            )
+
+        if quantization is None and not profile.search_hnsw_ef:
+            return None
+
+        return SearchParams(
+            hnsw_ef=profile.search_hnsw_ef or None,
+            quantization=quantization,
+        )
+
     def upsert(
         self,
         collection_name: str,
@@ -85,63 +300,287 @@ class QdrantClientWrapper:
         try:
             pid = point_id or str(uuid4())
 
-            self._client.upsert(
-                collection_name=collection_name,
-                points=[
-                    PointStruct(
-                        id=pid,
-                        vector=vector,
-                        payload=payload or {},
-                    )
-                ],
-            )
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="upsert",
+                collection=collection_name,
+            ):
+                self._client.upsert(
+                    collection_name=collection_name,
+                    points=[
+                        PointStruct(
+                            id=pid,
+                            vector=vector,
+                            payload=payload or {},
+                        )
+                    ],
+                )
 
             return pid
 
         except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="upsert",
+                collection=collection_name,
+            ).inc()
             logger.error(
                 f"Qdrant upsert failed | collection={collection_name}",
                 exc_info=e,
             )
             return None
 
+    def upsert_hybrid(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        payload: Optional[dict] = None,
+        point_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Insert or update a point with named dense and sparse vectors.
+        Returns point_id on success.
+        """
+        try:
+            pid = point_id or str(uuid4())
+
+            vector = {self.DENSE_VECTOR: dense}
+            if sparse:
+                vector[self.SPARSE_VECTOR] = self._to_sparse(sparse)
+
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="upsert",
+                collection=collection_name,
+            ):
+                self._client.upsert(
+                    collection_name=collection_name,
+                    points=[
+                        PointStruct(
+                            id=pid,
+                            vector=vector,
+                            payload=payload or {},
+                        )
+                    ],
+                )
+
+            return pid
+
+        except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="upsert",
+                collection=collection_name,
+            ).inc()
+            logger.error(
+                f"Qdrant hybrid upsert failed | collection={collection_name}",
+                exc_info=e,
+            )
+            return None
+
+    @staticmethod
+    def _to_sparse(sparse: Dict[int, float]):
+        indices = sorted(sparse)
+        return SparseVector(indices=indices, values=[float(sparse[i]) for i in indices])
+
     def search(
         self,
         collection_name: str,
         vector: list[float],
         limit: int,
         score_threshold: float | None = None,
+        filter: Optional[dict] = None,
     ):
         """
-        Vector similarity search (Qdrant Python SDK).
+        Vector similarity search (Qdrant Python SDK), optionally with a
+        server-side payload filter.
         """
         try:
-            return self._client.query_points(
-                collection_name=collection_name,
-                query=vector,
-                limit=limit,
-                score_threshold=score_threshold,
-            )
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="search",
+                collection=collection_name,
+            ):
+                return self._client.query_points(
+                    collection_name=collection_name,
+                    query=vector,
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    query_filter=self._to_filter(filter) if filter else None,
+                    search_params=self._search_params(collection_name),
+                )
         except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="search",
+                collection=collection_name,
+            ).inc()
             logger.error(
                 f"Qdrant search failed | collection={collection_name}",
                 exc_info=e,
             )
             return []
         
+    def hybrid_search(
+        self,
+        collection_name: str,
+        dense: List[float],
+        sparse: Dict[int, float],
+        limit: int,
+        prefetch_limit: int = 50,
+        filter: Optional[dict] = None,
+        dense_score_threshold: Optional[float] = None,
+        sparse_score_threshold: Optional[float] = None,
+    ):
+        """
+        Dense and sparse candidates (prefetch_limit each, filtered on the
+        server), fused with reciprocal rank fusion in one query.
+        """
+        try:
+            query_filter = self._to_filter(filter) if filter else None
+
+            prefetch = [
+                Prefetch(
+                    query=dense,
+                    using=self.DENSE_VECTOR,
+                    limit=prefetch_limit,
+                    filter=query_filter,
+                    score_threshold=dense_score_threshold,
+                    params=self._search_params(collection_name),
+                )
+            ]
+            if sparse:
+                prefetch.append(
+                    Prefetch(
+                        query=self._to_sparse(sparse),
+                        using=self.SPARSE_VECTOR,
+                        limit=prefetch_limit,
+                        filter=query_filter,
+                        score_threshold=sparse_score_threshold,
+                    )
+                )
+
+            with metrics.timer(
+                "observer_qdrant_seconds",
+                "Qdrant request latency",
+                op="hybrid_search",
+                collection=collection_name,
+            ):
+                return self._client.query_points(
+                    collection_name=collection_name,
+                    prefetch=prefetch,
+                    query=FusionQuery(fusion=Fusion.RRF),
+                    query_filter=query_filter,
+                    limit=limit,
+                    with_payload=True,
+                )
+        except Exception as e:
+            metrics.counter(
+                "observer_qdrant_errors_total",
+                "Failed Qdrant requests",
+                op="hybrid_search",
+                collection=collection_name,
+            ).inc()
+            logger.error(
+                f"Qdrant hybrid search failed | collection={collection_name}",
+                exc_info=e,
+            )
+            return []
+
     def scroll(
         self,
         collection_name: str,
         limit: int = 1000,
         offset=None,
         with_payload: bool = True,
+        with_vectors: bool = False,
+        filter: Optional[dict] = None,
     ):
+        """
+        Page through points; 'filter' uses the delete_by_filter format.
+        """
         return self._client.scroll(
             collection_name=collection_name,
             limit=limit,
             offset=offset,
             with_payload=with_payload,
+            with_vectors=with_vectors,
+            scroll_filter=self._to_filter(filter) if filter else None,
+        )
+
+    def count(self, collection_name: str, filter: Optional[dict] = None) -> int:
+        """
+        Exact number of points matching 'filter' (delete_by_filter format).
+        """
+        result = self._client.count(
+            collection_name=collection_name,
+            count_filter=self._to_filter(filter) if filter else None,
+            exact=True,
         )
+        return result.count
+
+    def delete_points(
+        self,
+        collection_name: str,
+        point_ids: list,
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Delete points by id, in batches.
+        """
+        try:
+            for start in range(0, len(point_ids), batch_size):
+                self._client.delete(
+                    collection_name=collection_name,
+                    points_selector=PointIdsList(
+                        points=point_ids[start:start + batch_size],
+                    ),
+                )
+        except Exception as e:
+            logger.error(
+                f"Qdrant delete_points failed | collection={collection_name}",
+                exc_info=e,
+            )
+            raise
+
+    def ensure_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: str,
+    ) -> None:
+        """
+        Create a payload index (e.g. "float", "keyword", "integer"), so
+        range/match filters do not scan the whole collection. Idempotent.
+        """
+        try:
+            info = self._client.get_collection(collection_name=collection_name)
+            if field_name in (info.payload_schema or {}):
+                return
+
+            self._client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType(field_schema),
+            )
+            logger.log(
+                f"Qdrant payload index created | collection={collection_name} "
+                f"field={field_name} type={field_schema}"
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to ensure payload index | collection={collection_name} "
+                f"field={field_name}",
+                exc_info=e,
+            )
+            raise
     
     def set_payload_by_point_ids(
         self,
@@ -182,39 +621,13 @@ class QdrantClientWrapper:
         filter: dict,
     ) -> None:
         """
-        Delete points from a collection using a payload filter.
+        Delete points from a collection using a payload filter
+        ("must" and "must_not" lists of range/match conditions).
         """
         try:
-            must_conditions = []
-
-            for cond in filter.get("must", []):
-                key = cond.get("key")
-                range_cond = cond.get("range")
-                match_cond = cond.get("match")
-
-                if key and range_cond:
-                    must_conditions.append(
-                        FieldCondition(
-                            key=key,
-                            range=Range(
-                                gte=range_cond.get("gte"),
-                                lte=range_cond.get("lte"),
-                            ),
-                        )
-                    )
-                elif key and match_cond and "value" in match_cond:
-                    must_conditions.append(
-                        FieldCondition(
-                            key=key,
-                            match=MatchValue(value=match_cond.get("value")),
-                        )
-                    )
-
-            qdrant_filter = Filter(must=must_conditions)
-
             self._client.delete(
                 collection_name=collection_name,
-                points_selector=qdrant_filter,
+                points_selector=self._to_filter(filter),
             )
 
         except Exception as e:
@@ -224,5 +637,74 @@ class QdrantClientWrapper:
             )
             raise
 
+    @classmethod
+    def _to_filter(cls, filter: dict) -> Filter:
+        return Filter(
+            must=cls._to_conditions(filter.get("must", [])),
+            must_not=cls._to_conditions(filter.get("must_not", [])) or None,
+        )
+
+    @staticmethod
+    def _to_conditions(conditions: list) -> list:
+        result = []
 
+        for cond in conditions:
+            key = cond.get("key")
+            range_cond = cond.get("range")
+            match_cond = cond.get("match")
 
+            if key and range_cond:
+                result.append(
+                    FieldCondition(
+                        key=key,
+                        range=Range(
+                            gt=range_cond.get("gt"),
+                            gte=range_cond.get("gte"),
+                            lt=range_cond.get("lt"),
+                            lte=range_cond.get("lte"),
+                        ),
+                    )
+                )
+            elif key and match_cond and "value" in match_cond:
+                result.append(
+                    FieldCondition(
+                        key=key,
+                        match=MatchValue(value=match_cond.get("value")),
+                    )
+                )
+
+        return result
+
+    def create_snapshot(self, collection_name: str, keep: int = 3) -> Optional[str]:
+        """
+        Create a collection snapshot and delete all but the newest 'keep'.
+        Returns the new snapshot name.
+        """
+        try:
+            description = self._client.create_snapshot(collection_name=collection_name)
+            name = getattr(description, "name", None)
+
+            snapshots = sorted(
+                self._client.list_snapshots(collection_name=collection_name),
+                key=lambda s: getattr(s, "creation_time", None) or s.name,
+            )
+            for old in snapshots[:-keep] if keep > 0 else []:
+                self._client.delete_snapshot(
+                    collection_name=collection_name,
+                    snapshot_name=old.name,
+                )
+
+            return name
+
+        except Exception as e:
+            logger.error(
+                f"Qdrant snapshot failed | collection={collection_name}",
+                exc_info=e,
+            )
+            raise
+
+    def close(self) -> None:
+        try:
+            self._client.close()
+        except Exception as e:
+            logger.error("Failed to close Qdrant client", exc_info=e)
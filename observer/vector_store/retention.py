@@ -0,0 +1,263 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from vector_store.image_index import ImageIndex
+from vector_store.base import VectorStore
+
+
+@dataclass(frozen=True)
+class RetentionTier:
+    """
+    Points older than the previous tier (or the full-density window) and
+    younger than max_age_hours keep 'keep' representatives per camera per
+    bucket_minutes bucket.
+    """
+    max_age_hours: float
+    bucket_minutes: float
+    keep: int = 1
+
+
+def parse_tiers(spec: str) -> List[RetentionTier]:
+    """
+    "max_age_hours:bucket_minutes:keep,..." e.g. "168:10:1,720:60:1".
+    """
+    tiers = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Invalid retention tier '{item}'")
+        tiers.append(
+            RetentionTier(
+                max_age_hours=float(parts[0]),
+                bucket_minutes=float(parts[1]),
+                keep=int(parts[2]) if len(parts) == 3 else 1,
+            )
+        )
+    return sorted(tiers, key=lambda tier: tier.max_age_hours)
+
+
+class ImageRetention:
+    """
+    Time-based retention with tiered downsampling for the image collection.
+
+    - Younger than full_density_hours: untouched.
+    - Each tier thins its age range to 'keep' representatives per camera
+      per time bucket: the point closest to the bucket centroid, then the
+      most dissimilar ones (so a bucket with an event keeps it).
+    - Older than horizon_hours: deleted with one filter delete.
+
+    Thinned survivors are tagged with retention_tier, so later runs only
+    scroll points that were not processed for that tier yet; work is
+    done in bounded time windows and batched deletes. Only clip_image
+    points are thinned; cycle training points are never touched.
+    """
+
+    TIER_FIELD = "retention_tier"
+
+    # Points per scroll page and per window (bounded memory)
+    _PAGE_SIZE = 1000
+    _WINDOW_SECONDS = 3600.0
+
+    def __init__(
+        self,
+        qdrant: VectorStore,
+        full_density_hours: float,
+        tiers: List[RetentionTier],
+        horizon_hours: float,
+        collection_name: str = ImageIndex.COLLECTION_NAME,
+    ):
+        self._qdrant = qdrant
+        self._collection = collection_name
+        self._full_density_hours = full_density_hours
+        self._tiers = [tier for tier in tiers if tier.max_age_hours > full_density_hours]
+        self._horizon_hours = horizon_hours
+        self._indexes_ready = False
+
+    def run(self, now: Optional[float] = None) -> Dict[str, int]:
+        now = now or time.time()
+        stats = {"deleted_expired": 0, "deleted_thinned": 0, "kept": 0}
+
+        self._ensure_indexes()
+
+        # 1. Beyond the horizon: one filter delete
+        if self._horizon_hours > 0:
+            expired = {
+                "must": [self._range("timestamp", lt=now - self._horizon_hours * 3600)],
+                "must_not": [self._training_condition()],
+            }
+            stats["deleted_expired"] = self._qdrant.count(self._collection, expired)
+            if stats["deleted_expired"]:
+                self._qdrant.delete_by_filter(
+                    collection_name=self._collection,
+                    filter=expired,
+                )
+
+        # 2. Tiers, youngest first
+        newer_bound = now - self._full_density_hours * 3600
+        for index, tier in enumerate(self._tiers, start=1):
+            max_age_hours = tier.max_age_hours
+            if self._horizon_hours > 0:
+                max_age_hours = min(max_age_hours, self._horizon_hours)
+            older_bound = now - max_age_hours * 3600
+
+            if older_bound < newer_bound:
+                self._thin_range(index, tier, older_bound, newer_bound, stats)
+
+            newer_bound = older_bound
+
+        logger.log(
+            f"Image retention done | expired={stats['deleted_expired']} "
+            f"thinned={stats['deleted_thinned']} "
+            f"kept={stats['kept']} horizon_hours={self._horizon_hours:g}"
+        )
+        for key, value in stats.items():
+            metrics.counter(
+                "observer_retention_points_total",
+                "Image points processed by retention",
+                action=key,
+            ).inc(value)
+
+        return stats
+
+    # -------- thinning --------
+
+    def _thin_range(
+        self,
+        tier_index: int,
+        tier: RetentionTier,
+        start: float,
+        end: float,
+        stats: Dict[str, int],
+    ) -> None:
+        bucket_seconds = tier.bucket_minutes * 60
+        window = bucket_seconds * max(1, math.ceil(self._WINDOW_SECONDS / bucket_seconds))
+
+        # Align windows to bucket boundaries so no bucket is split; the
+        # newest, still incomplete bucket waits for a later run
+        window_start = math.floor(start / bucket_seconds) * bucket_seconds
+        end = math.floor(end / bucket_seconds) * bucket_seconds
+
+        while window_start < end:
+            window_end = min(window_start + window, end)
+            buckets = self._load_window(tier_index, window_start, window_end, bucket_seconds)
+
+            delete_ids, keep_ids = [], []
+            for points in buckets.values():
+                kept = self._representatives(points, tier.keep)
+                keep_ids.extend(points[i][0] for i in kept)
+                kept_set = set(kept)
+                delete_ids.extend(
+                    point_id for i, (point_id, _) in enumerate(points) if i not in kept_set
+                )
+
+            if delete_ids:
+                self._qdrant.delete_points(self._collection, delete_ids)
+            if keep_ids:
+                self._qdrant.set_payload_by_point_ids(
+                    collection_name=self._collection,
+                    point_ids=keep_ids,
+                    payload={self.TIER_FIELD: tier_index},
+                )
+
+            stats["deleted_thinned"] += len(delete_ids)
+            stats["kept"] += len(keep_ids)
+            window_start = window_end
+
+    def _load_window(
+        self,
+        tier_index: int,
+        start: float,
+        end: float,
+        bucket_seconds: float,
+    ) -> Dict[Tuple[str, int], List[Tuple[object, list]]]:
+        """
+        Points in [start, end) not yet thinned for this tier, grouped by
+        (camera_id, bucket).
+        """
+        buckets: Dict[Tuple[str, int], List[Tuple[object, list]]] = {}
+        offset = None
+
+        while True:
+            points, offset = self._qdrant.scroll(
+                collection_name=self._collection,
+                limit=self._PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+                filter={
+                    "must": [
+                        self._range("timestamp", gte=start, lt=end),
+                        {"key": "type", "match": {"value": "clip_image"}},
+                    ],
+                    "must_not": [
+                        self._training_condition(),
+                        self._range(self.TIER_FIELD, gte=tier_index),
+                    ],
+                },
+            )
+
+            for point in points or []:
+                payload = point.payload or {}
+                timestamp = payload.get("timestamp")
+                if timestamp is None or point.vector is None:
+                    continue
+                key = (payload.get("camera_id") or "", int(timestamp // bucket_seconds))
+                buckets.setdefault(key, []).append((point.id, point.vector))
+
+            if not points or offset is None:
+                break
+
+        return buckets
+
+    @staticmethod
+    def _representatives(points: List[Tuple[object, list]], keep: int) -> List[int]:
+        """
+        Indices of up to 'keep' points: the medoid-like point closest to
+        the centroid, then greedily the ones least similar to those kept.
+        """
+        if len(points) <= keep:
+            return list(range(len(points)))
+
+        vectors = np.asarray([vector for _, vector in points], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        centroid = vectors.mean(axis=0)
+        chosen = [int(np.argmax(vectors @ centroid))]
+
+        # Highest similarity of each point to any chosen point
+        closest = vectors @ vectors[chosen[0]]
+        while len(chosen) < keep:
+            candidate = int(np.argmin(closest))
+            chosen.append(candidate)
+            closest = np.maximum(closest, vectors @ vectors[candidate])
+
+        return chosen
+
+    # -------- helpers --------
+
+    def _ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+        self._qdrant.ensure_payload_index(self._collection, "timestamp", "float")
+        self._qdrant.ensure_payload_index(self._collection, "camera_id", "keyword")
+        self._qdrant.ensure_payload_index(self._collection, "type", "keyword")
+        self._qdrant.ensure_payload_index(self._collection, self.TIER_FIELD, "integer")
+        self._indexes_ready = True
+
+    @staticmethod
+    def _range(key: str, **bounds) -> dict:
+        return {"key": key, "range": bounds}
+
+    @staticmethod
+    def _training_condition() -> dict:
+        return {"key": "pipeline", "match": {"value": "cycle_training"}}
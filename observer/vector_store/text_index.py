@@ -1,11 +1,11 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from time import time
 from datetime import datetime
 
-from qdrant_client.models import Distance
-
+from config import settings
 from utils.logger import logger
-from vector_store.qdrant_wrapper import QdrantClientWrapper
+from vector_store.base import VectorStore
+from vector_store.collection_profiles import get_profile
 
 
 class TextIndex:
@@ -17,15 +17,25 @@ class TextIndex:
     - Summaries
     - POS / business context
     - Any explanatory or contextual text
+
+    With TEXT_HYBRID_ENABLED each point holds a dense and a sparse
+    (lexical) vector in a separate collection; queries fuse both rankings
+    with RRF. Qdrant cannot add named vectors to an existing collection,
+    so points of the legacy dense-only collection are re-embedded by
+    migrate_legacy().
     """
 
-    COLLECTION_NAME = "text_vectors"
+    LEGACY_COLLECTION_NAME = "text_vectors"
+    HYBRID_COLLECTION_NAME = "text_vectors_hybrid"
+    COLLECTION_NAME = (
+        HYBRID_COLLECTION_NAME if settings.TEXT_HYBRID_ENABLED else LEGACY_COLLECTION_NAME
+    )
     VECTOR_SIZE = 1024  # CLIP text / other text models should match this
-    DISTANCE = Distance.COSINE
+    DISTANCE = "Cosine"  # backend-neutral name (qdrant Distance.COSINE)
 
     def __init__(
         self,
-        qdrant: QdrantClientWrapper,
+        qdrant: VectorStore,
         score_threshold: float = 0.75,
         top_k: int = 5,
     ):
@@ -34,16 +44,27 @@ class TextIndex:
         self._top_k = top_k
 
         # Ensure collection exists once
-        self._qdrant.ensure_collection(
+        ensure = (
+            self._qdrant.ensure_hybrid_collection
+            if settings.TEXT_HYBRID_ENABLED
+            else self._qdrant.ensure_collection
+        )
+        ensure(
             collection_name=self.COLLECTION_NAME,
             vector_size=self.VECTOR_SIZE,
             distance=self.DISTANCE,
+            profile=get_profile(settings.QDRANT_TEXT_PROFILE),
+            migrate=settings.QDRANT_MIGRATE_COLLECTIONS,
         )
 
     def search_relevant(
         self,
         embedding: List[float],
         source: Optional[str] = None,
+        sparse: Optional[Dict[int, float]] = None,
+        camera_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
     ):
         """
         Search for relevant text entries.
@@ -52,22 +73,37 @@ class TextIndex:
         - 'vlm'
         - 'pos'
         - 'summary'
+
+        source, camera_id and the [since, until] timestamp range are
+        applied by the store, before the top-k cut. With a hybrid index
+        and a sparse query vector, dense and lexical matches are fused
+        (scores are then RRF ranks; score_threshold applies to the dense
+        candidates only).
         """
         try:
-            hits = self._qdrant.search(
-                collection_name=self.COLLECTION_NAME,
-                vector=embedding,
-                limit=self._top_k,
-                score_threshold=self._score_threshold,
-            )
+            query_filter = self._filter(source, camera_id, since, until)
 
-            if source:
-                hits = [
-                    h for h in hits
-                    if h.payload and h.payload.get("source") == source
-                ]
+            if settings.TEXT_HYBRID_ENABLED:
+                response = self._qdrant.hybrid_search(
+                    collection_name=self.COLLECTION_NAME,
+                    dense=embedding,
+                    sparse=sparse or {},
+                    limit=self._top_k,
+                    prefetch_limit=max(settings.TEXT_HYBRID_PREFETCH_LIMIT, self._top_k),
+                    filter=query_filter,
+                    dense_score_threshold=self._score_threshold,
+                    sparse_score_threshold=settings.TEXT_SPARSE_SCORE_THRESHOLD or None,
+                )
+            else:
+                response = self._qdrant.search(
+                    collection_name=self.COLLECTION_NAME,
+                    vector=embedding,
+                    limit=self._top_k,
+                    score_threshold=self._score_threshold,
+                    filter=query_filter,
+                )
 
-            return hits
+            return response.points
 
         except Exception as e:
             logger.error("TextIndex search failed", exc_info=e)
@@ -82,6 +118,8 @@ class TextIndex:
         ref_id: Optional[str] = None,
         metadata: Optional[dict] = None,
         timestamp: Optional[float] = None,
+        sparse: Optional[Dict[int, float]] = None,
+        point_id: Optional[str] = None,
     ) -> Optional[str]:
         """
         Store a text embedding.
@@ -91,6 +129,7 @@ class TextIndex:
             - rolling_context: the rolling context (stored in payload)
             - source: origin of the text (e.g. 'vlm', 'pos')
             - ref_id: optional reference (camera_id, receipt_id, etc.)
+            - sparse: lexical weights (token id -> weight), hybrid index only
         """
 
         ts = timestamp if timestamp is not None else time()
@@ -111,9 +150,133 @@ class TextIndex:
         if metadata:
             payload.update(metadata)
 
+        if settings.TEXT_HYBRID_ENABLED:
+            return self._qdrant.upsert_hybrid(
+                collection_name=self.COLLECTION_NAME,
+                dense=embedding,
+                sparse=sparse or {},
+                payload=payload,
+                point_id=point_id,
+            )
+
         return self._qdrant.upsert(
             collection_name=self.COLLECTION_NAME,
             vector=embedding,
             payload=payload,
+            point_id=point_id,
+        )
+
+    def migrate_legacy(self, embed_batch, batch_size: int = 64) -> int:
+        """
+        Move points of the dense-only legacy collection into the hybrid
+        one, re-embedding frame_description with embed_batch(texts) ->
+        [(dense, sparse), ...]. Ids and payloads are kept; each migrated batch is
+        deleted from the legacy collection, so an interrupted run resumes.
+        Returns the number of migrated points.
+        """
+        if not settings.TEXT_HYBRID_ENABLED:
+            return 0
+        if not self._qdrant.collection_exists(self.LEGACY_COLLECTION_NAME):
+            return 0
+
+        self._qdrant.ensure_collection(
+            collection_name=self.LEGACY_COLLECTION_NAME,
+            vector_size=self.VECTOR_SIZE,
+            distance=self.DISTANCE,
+            migrate=False,
         )
 
+        migrated = 0
+        while True:
+            points, _ = self._qdrant.scroll(
+                collection_name=self.LEGACY_COLLECTION_NAME,
+                limit=batch_size,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if not points:
+                break
+
+            texts = {
+                point.id: (point.payload or {}).get("frame_description")
+                for point in points
+            }
+            texts = {pid: text for pid, text in texts.items() if text and text.strip()}
+
+            embedded = {}
+            if texts:
+                try:
+                    embedded = dict(zip(texts, embed_batch(list(texts.values()))))
+                except Exception as e:
+                    logger.warning(
+                        f"Text re-embedding failed, keeping dense vectors | error={e}"
+                    )
+
+            done = []
+            for point in points:
+                payload = point.payload or {}
+                dense, sparse = embedded.get(point.id, (point.vector, {}))
+
+                if dense and self._qdrant.upsert_hybrid(
+                    collection_name=self.COLLECTION_NAME,
+                    dense=dense,
+                    sparse=sparse,
+                    payload=payload,
+                    point_id=point.id,
+                ):
+                    done.append(point.id)
+
+            if not done:
+                # Nothing could be written; stop instead of looping forever
+                logger.error("Text index migration stalled, will retry on next run")
+                break
+
+            self._qdrant.delete_points(self.LEGACY_COLLECTION_NAME, done)
+            migrated += len(done)
+
+        if migrated:
+            logger.log(f"Text index migrated to hybrid | points={migrated}")
+
+        return migrated
+
+    @staticmethod
+    def _filter(
+        source: Optional[str],
+        camera_id: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+    ) -> Optional[dict]:
+        must = []
+
+        if source:
+            must.append({"key": "source", "match": {"value": source}})
+        if camera_id:
+            must.append({"key": "camera_id", "match": {"value": camera_id}})
+
+        time_range = {}
+        if since is not None:
+            time_range["gte"] = since
+        if until is not None:
+            time_range["lte"] = until
+        if time_range:
+            must.append({"key": "timestamp", "range": time_range})
+
+        return {"must": must} if must else None
+
+    def delete_older_than(self, cutoff_ts: float) -> None:
+        """
+        Delete text points with timestamp < cutoff_ts.
+        """
+        self._qdrant.delete_by_filter(
+            collection_name=self.COLLECTION_NAME,
+            filter={
+                "must": [
+                    {
+                        "key": "timestamp",
+                        "range": {
+                            "lt": cutoff_ts
+                        },
+                    }
+                ]
+            },
+        )
@@ -0,0 +1,159 @@
+"""
+permessage-deflate (RFC 7692) support for the local websocket server.
+
+Only text messages are compressed. JPEG payloads are already entropy-coded,
+so deflating them costs CPU without saving bandwidth.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+EXTENSION_NAME = "permessage-deflate"
+
+# Every deflate block flushed with Z_SYNC_FLUSH ends with this marker.
+# RFC 7692 requires stripping it on send and appending it on receive.
+_DEFLATE_TAIL = b"\x00\x00\xff\xff"
+
+# zlib cannot produce raw deflate streams with an 8-bit window.
+_MIN_WINDOW_BITS = 9
+_MAX_WINDOW_BITS = 15
+
+
+@dataclass(frozen=True)
+class DeflateParams:
+    """
+    Negotiated permessage-deflate parameters for one connection.
+    """
+    server_no_context_takeover: bool = False
+    client_no_context_takeover: bool = False
+    server_max_window_bits: int = _MAX_WINDOW_BITS
+
+    def response_header(self) -> str:
+        parts = [EXTENSION_NAME]
+        if self.server_no_context_takeover:
+            parts.append("server_no_context_takeover")
+        if self.client_no_context_takeover:
+            parts.append("client_no_context_takeover")
+        if self.server_max_window_bits < _MAX_WINDOW_BITS:
+            parts.append(f"server_max_window_bits={self.server_max_window_bits}")
+        return "; ".join(parts)
+
+
+def _parse_offers(header: str) -> List[Tuple[str, Dict[str, Optional[str]]]]:
+    offers = []
+    for raw_offer in header.split(","):
+        tokens = [t.strip() for t in raw_offer.split(";") if t.strip()]
+        if not tokens:
+            continue
+
+        params: Dict[str, Optional[str]] = {}
+        for token in tokens[1:]:
+            if "=" in token:
+                key, value = token.split("=", 1)
+                params[key.strip().lower()] = value.strip().strip('"')
+            else:
+                params[token.lower()] = None
+
+        offers.append((tokens[0].lower(), params))
+    return offers
+
+
+def _parse_window_bits(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    bits = int(value)
+    if bits < 8 or bits > _MAX_WINDOW_BITS:
+        raise ValueError(f"Invalid window bits: {value}")
+    return bits
+
+
+def negotiate(header: Optional[str]) -> Optional[DeflateParams]:
+    """
+    Pick the first acceptable permessage-deflate offer from the client's
+    Sec-WebSocket-Extensions header. Returns None when nothing is accepted.
+    """
+    if not header:
+        return None
+
+    for name, params in _parse_offers(header):
+        if name != EXTENSION_NAME:
+            continue
+
+        try:
+            known = {
+                "server_no_context_takeover",
+                "client_no_context_takeover",
+                "server_max_window_bits",
+                "client_max_window_bits",
+            }
+            if any(key not in known for key in params):
+                continue
+
+            server_bits = _parse_window_bits(params.get("server_max_window_bits"))
+            if server_bits is not None and server_bits < _MIN_WINDOW_BITS:
+                continue
+
+            # client_max_window_bits is only a hint; decompressing with the
+            # full window accepts any smaller window the client picks.
+            _parse_window_bits(params.get("client_max_window_bits"))
+
+            return DeflateParams(
+                server_no_context_takeover="server_no_context_takeover" in params,
+                client_no_context_takeover="client_no_context_takeover" in params,
+                server_max_window_bits=server_bits or _MAX_WINDOW_BITS,
+            )
+
+        except ValueError:
+            continue
+
+    return None
+
+
+class PerMessageDeflate:
+    """
+    Per-connection compressor/decompressor state.
+
+    With context takeover (the default) the compression window is kept
+    between messages, so repeated JSON keys cost only back-references.
+    Not thread-safe: callers must serialize compress() in send order.
+    """
+
+    def __init__(self, params: DeflateParams, level: int = 6):
+        self.params = params
+        self._level = level
+        self._compressor = self._new_compressor()
+        self._decompressor = self._new_decompressor()
+
+    def _new_compressor(self):
+        return zlib.compressobj(
+            self._level,
+            zlib.DEFLATED,
+            -self.params.server_max_window_bits,
+        )
+
+    def _new_decompressor(self):
+        return zlib.decompressobj(-_MAX_WINDOW_BITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.params.server_no_context_takeover:
+            self._compressor = self._new_compressor()
+
+        compressed = self._compressor.compress(data)
+        compressed += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        if compressed.endswith(_DEFLATE_TAIL):
+            compressed = compressed[:-len(_DEFLATE_TAIL)]
+        return compressed
+
+    def decompress(self, data: bytes, max_size: int = 16 * 1024 * 1024) -> bytes:
+        if self.params.client_no_context_takeover:
+            self._decompressor = self._new_decompressor()
+
+        result = self._decompressor.decompress(data + _DEFLATE_TAIL, max_size)
+        if self._decompressor.unconsumed_tail:
+            raise ValueError("Decompressed websocket message exceeds size limit")
+        return result
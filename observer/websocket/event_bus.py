@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import logger
+
+
+Event = Dict[str, Any]
+FlushCallback = Callable[[str, List[Event]], Awaitable[None]]
+
+
+class EventBus:
+    """
+    Thread-safe buffer between processing pipelines and websocket clients.
+
+    Pipelines publish from camera threads without touching the event loop
+    for every event. Events are buffered per camera and flushed once per
+    tick on the websocket loop.
+
+    Coalescing rules:
+      - COALESCED_TYPES keep only the latest pending event per camera.
+      - Other events (anomaly, camera.status, ...) are delivered in order.
+      - NEVER_DROPPED_TYPES are exempt from the per-camera buffer cap.
+    """
+
+    COALESCED_TYPES = frozenset({"prediction"})
+    NEVER_DROPPED_TYPES = frozenset({"anomaly"})
+
+    def __init__(
+        self,
+        *,
+        loop: asyncio.AbstractEventLoop,
+        on_flush: FlushCallback,
+        flush_interval: float = 0.1,
+        max_pending_per_camera: int = 500,
+    ):
+        self._loop = loop
+        self._on_flush = on_flush
+        self._flush_interval = flush_interval
+        self._max_pending_per_camera = max_pending_per_camera
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Optional[Event]]] = {}
+        self._coalesce_index: Dict[tuple, int] = {}
+        self._dropped = 0
+
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start the flush task. Must be called on the bus event loop.
+        """
+        if self._task:
+            return
+
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop(), name="EventBus-flush")
+
+        with self._lock:
+            has_pending = bool(self._pending)
+        if has_pending:
+            self._wake.set()
+
+        logger.log(f"EventBus started | flush_interval={self._flush_interval}s")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Deliver whatever is still buffered (anomalies must not be lost)
+        await self._flush_pending()
+        logger.log("EventBus stopped")
+
+    def publish(self, event: Event) -> None:
+        """
+        Buffer an event. Safe to call from any thread. Never raises.
+        """
+        try:
+            camera_id = event.get("camera_id")
+            if not camera_id:
+                return
+
+            event_type = event.get("type")
+
+            with self._lock:
+                was_idle = not self._pending
+                pending = self._pending.setdefault(camera_id, [])
+
+                if event_type in self.COALESCED_TYPES:
+                    key = (camera_id, event_type)
+                    previous = self._coalesce_index.get(key)
+                    if previous is not None:
+                        # Keep ordering relative to other events: the
+                        # superseded event is dropped, the new one appended.
+                        pending[previous] = None
+                    self._coalesce_index[key] = len(pending)
+
+                pending.append(event)
+
+                if len(pending) > self._max_pending_per_camera:
+                    pending = self._compact(camera_id, pending)
+                    if len(pending) > self._max_pending_per_camera:
+                        self._drop_oldest(camera_id, pending)
+
+            # Only the first event of a tick crosses threads
+            if was_idle:
+                self._loop.call_soon_threadsafe(self._signal_pending)
+
+        except Exception as e:
+            logger.error("Failed to publish event to EventBus", exc_info=e)
+
+    def _compact(self, camera_id: str, pending: List[Optional[Event]]) -> List[Optional[Event]]:
+        """
+        Remove coalesced tombstones and rebuild the coalesce index.
+        Caller must hold the lock.
+        """
+        compacted: List[Optional[Event]] = [e for e in pending if e is not None]
+        self._pending[camera_id] = compacted
+
+        for index, event in enumerate(compacted):
+            event_type = event.get("type")
+            if event_type in self.COALESCED_TYPES:
+                self._coalesce_index[(camera_id, event_type)] = index
+
+        return compacted
+
+    def _drop_oldest(self, camera_id: str, pending: List[Optional[Event]]) -> None:
+        for index, event in enumerate(pending):
+            if event is None or event.get("type") in self.NEVER_DROPPED_TYPES:
+                continue
+
+            pending[index] = None
+            key = (camera_id, event.get("type"))
+            if self._coalesce_index.get(key) == index:
+                self._coalesce_index.pop(key, None)
+
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                logger.warning(
+                    f"EventBus buffer full, dropping events | "
+                    f"camera={camera_id} dropped_total={self._dropped}"
+                )
+            return
+
+    def _signal_pending(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+
+            # Let the tick accumulate events before flushing
+            await asyncio.sleep(self._flush_interval)
+            await self._flush_pending()
+
+    async def _flush_pending(self) -> None:
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._coalesce_index = {}
+
+        for camera_id, events in pending.items():
+            batch = [event for event in events if event is not None]
+            if not batch:
+                continue
+
+            try:
+                await self._on_flush(camera_id, batch)
+            except Exception as e:
+                logger.error(
+                    f"EventBus flush failed | camera={camera_id}",
+                    exc_info=e,
+                )
@@ -4,9 +4,10 @@ import asyncio
 import base64
 import cv2
 from time import time
-from typing import Dict
+from typing import Dict, Optional
 
 from utils.logger import logger
+from utils.metrics import metrics
 from websocket.connection_manager import ConnectionManager
 from websocket.schemas import StreamConfig, make_event
 
@@ -45,6 +46,31 @@ class FramePublisher:
             )
         logger.log(f"FramePublisher started | cameras={len(self._tasks)}")
 
+    def apply_camera_change(self, camera_id: str, change: str) -> None:
+        """
+        Add or remove the per-camera task after a camera config reload.
+        Must run on the event loop.
+        """
+        if not self._running:
+            return
+
+        if change == "removed":
+            task = self._tasks.pop(camera_id, None)
+            if task:
+                task.cancel()
+            self._last_sent_frame_seq.pop(camera_id, None)
+
+        elif change == "added" and camera_id not in self._tasks:
+            self._tasks[camera_id] = asyncio.create_task(
+                self._publish_loop(camera_id),
+                name=f"FramePublisher-{camera_id}",
+            )
+
+        logger.log(
+            f"FramePublisher camera {change} | camera={camera_id} "
+            f"cameras={len(self._tasks)}"
+        )
+
     def stop(self) -> None:
         self._running = False
         for task in self._tasks.values():
@@ -61,17 +87,28 @@ class FramePublisher:
             f"fps={self._config.default_display_fps}"
         )
 
+        watching = False
+
         while self._running:
             started = time()
 
             try:
                 clients = await self._connections.clients_for(camera_id)
+
+                if bool(clients) != watching:
+                    watching = bool(clients)
+                    self._set_display_rate(
+                        camera_id,
+                        self._config.default_display_fps if watching else None,
+                    )
+
                 if clients:
                     message = self._build_frame_message(camera_id)
                     if message:
                         stale = []
                         for client in clients:
-                            ok = await client.send_json(message)
+                            # Base64 JPEG does not deflate well
+                            ok = await client.send_json(message, compress=False)
                             if not ok:
                                 stale.append(client)
 
@@ -93,8 +130,27 @@ class FramePublisher:
             else:
                 await asyncio.sleep(0)
 
+        if watching:
+            self._set_display_rate(camera_id, None)
+
         logger.log(f"FramePublisher loop stopped | camera={camera_id}")
 
+    def _set_display_rate(self, camera_id: str, fps) -> None:
+        """
+        Register the live-view frame rate with the source while anyone
+        is watching, so it decodes enough frames for the stream.
+        """
+        try:
+            camera_source = self._camera_manager.get_camera_source(camera_id)
+            set_consumer_fps = getattr(camera_source, "set_consumer_fps", None)
+            if set_consumer_fps is not None:
+                set_consumer_fps("FramePublisher", fps)
+        except Exception as e:
+            logger.error(
+                f"Failed to update display rate | camera={camera_id}",
+                exc_info=e,
+            )
+
     def _build_frame_message(self, camera_id: str):
         try:
             camera_source = self._camera_manager.get_camera_source(camera_id)
@@ -102,7 +158,13 @@ class FramePublisher:
                 return None
 
             frame_seq = None
-            if hasattr(camera_source, "get_snapshot_with_seq"):
+            is_view = False
+            if hasattr(camera_source, "get_frame_ref"):
+                # Zero-copy: the frame is encoded right away
+                ref = camera_source.get_frame_ref()
+                frame, frame_seq = (ref.frame, ref.seq) if ref else (None, None)
+                is_view = hasattr(camera_source, "is_frame_valid")
+            elif hasattr(camera_source, "get_snapshot_with_seq"):
                 frame, frame_seq = camera_source.get_snapshot_with_seq()
             else:
                 frame = camera_source.get_snapshot()
@@ -119,6 +181,17 @@ class FramePublisher:
             if not encoded:
                 return None
 
+            if is_view and not camera_source.is_frame_valid(frame_seq):
+                # The writer lapped the ring during the encode: torn frame,
+                # the next tick sends a newer one
+                metrics.counter(
+                    "observer_torn_frames_total",
+                    "Frames dropped because the ring slot was overwritten while read",
+                    use="stream",
+                    camera=camera_id,
+                ).inc()
+                return None
+
             if frame_seq is not None:
                 self._last_sent_frame_seq[camera_id] = frame_seq
 
@@ -140,21 +213,70 @@ class FramePublisher:
             )
             return None
 
-    def _encode_jpeg(self, frame):
+    def build_high_res_frame_message(self, camera_id: str):
+        """
+        One full-resolution frame for UI zoom ("frame.high_res").
+        Blocking: dual-stream sources connect their main stream on demand.
+        """
         try:
+            camera_source = self._camera_manager.get_camera_source(camera_id)
+            if camera_source is None:
+                return None
+
+            if hasattr(camera_source, "get_high_res_snapshot"):
+                frame = camera_source.get_high_res_snapshot()
+            else:
+                frame = camera_source.get_snapshot()
+
+            if frame is None:
+                return None
+
+            encoded, width, height = self._encode_jpeg(
+                frame,
+                max_width=self._config.zoom_max_width,
+            )
+            if not encoded:
+                return None
+
+            return make_event(
+                "frame.high_res",
+                camera_id,
+                {
+                    "encoding": "jpeg_base64",
+                    "width": width,
+                    "height": height,
+                    "data": base64.b64encode(encoded).decode("ascii"),
+                },
+            )
+
+        except Exception as e:
+            logger.error(
+                f"Failed to build high-res frame message | camera={camera_id}",
+                exc_info=e,
+            )
+            return None
+
+    def _encode_jpeg(self, frame, max_width: Optional[int] = None):
+        try:
+            max_width = max_width or self._config.max_width
             height, width = frame.shape[:2]
 
-            if width > self._config.max_width:
-                scale = self._config.max_width / float(width)
-                new_size = (self._config.max_width, int(height * scale))
+            if width > max_width:
+                scale = max_width / float(width)
+                new_size = (max_width, int(height * scale))
                 frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
                 height, width = frame.shape[:2]
 
-            success, buffer = cv2.imencode(
-                ".jpg",
-                frame,
-                [int(cv2.IMWRITE_JPEG_QUALITY), self._config.jpeg_quality],
-            )
+            with metrics.timer(
+                "observer_jpeg_encode_seconds",
+                "JPEG encode latency",
+                use="stream",
+            ):
+                success, buffer = cv2.imencode(
+                    ".jpg",
+                    frame,
+                    [int(cv2.IMWRITE_JPEG_QUALITY), self._config.jpeg_quality],
+                )
             if not success:
                 return None, width, height
 
@@ -28,4 +28,9 @@ class StreamConfig:
     default_display_fps: float = 6.0
     jpeg_quality: int = 60
     max_width: int = 640
+    compression_enabled: bool = True
+    compression_level: int = 6
+    compression_min_bytes: int = 128
+    event_flush_interval: float = 0.1
+    zoom_max_width: int = 1920
 
@@ -9,7 +9,10 @@ import struct
 from typing import Any, Dict, Optional
 
 from utils.logger import logger
+from utils.metrics import metrics
+from websocket.compression import PerMessageDeflate, negotiate
 from websocket.connection_manager import ConnectionManager
+from websocket.event_bus import EventBus
 from websocket.frame_publisher import FramePublisher
 from websocket.schemas import StreamConfig, make_event
 
@@ -19,29 +22,64 @@ _CAMERA_PATH_RE = re.compile(r"^/ws/cameras/([^/?#]+)$")
 
 
 class WebSocketClient:
-    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        compression_min_bytes: int = 128,
+    ):
         self.reader = reader
         self.writer = writer
         self._send_lock = asyncio.Lock()
         self.closed = False
-
-    async def send_json(self, payload: Dict[str, Any]) -> bool:
+        self.deflate: Optional[PerMessageDeflate] = None
+        self._compression_min_bytes = compression_min_bytes
+
+    async def send_json(self, payload: Dict[str, Any], compress: bool = True) -> bool:
+        """
+        Send a JSON text message.
+        Pass compress=False for payloads that do not deflate well,
+        such as base64 JPEG frames.
+        """
         try:
             data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
-            return await self.send_text_bytes(data)
+            return await self.send_text_bytes(data, compress=compress)
         except Exception as e:
             logger.error("Failed to serialize WebSocket payload", exc_info=e)
             return False
 
-    async def send_text_bytes(self, data: bytes) -> bool:
+    async def send_text_bytes(self, data: bytes, compress: bool = True) -> bool:
         if self.closed:
             return False
 
         try:
-            frame = self._encode_server_frame(data, opcode=0x1)
-            async with self._send_lock:
-                self.writer.write(frame)
-                await self.writer.drain()
+            compress = (
+                compress
+                and self.deflate is not None
+                and len(data) >= self._compression_min_bytes
+            )
+
+            # Compression must happen under the send lock: with context
+            # takeover the deflate window has to follow wire order.
+            with metrics.timer(
+                "observer_websocket_send_seconds",
+                "WebSocket message send latency, including drain",
+            ):
+                async with self._send_lock:
+                    if compress:
+                        frame = self._encode_server_frame(
+                            self.deflate.compress(data),
+                            opcode=0x1,
+                            rsv1=True,
+                        )
+                    else:
+                        frame = self._encode_server_frame(data, opcode=0x1)
+                    self.writer.write(frame)
+                    await self.writer.drain()
+            metrics.counter(
+                "observer_websocket_sent_bytes_total",
+                "WebSocket payload bytes sent (after compression)",
+            ).inc(len(frame))
             return True
         except Exception as e:
             self.closed = True
@@ -76,9 +114,11 @@ class WebSocketClient:
             return False
 
     @staticmethod
-    def _encode_server_frame(data: bytes, opcode: int) -> bytes:
+    def _encode_server_frame(data: bytes, opcode: int, rsv1: bool = False) -> bytes:
         length = len(data)
         first = 0x80 | opcode
+        if rsv1:
+            first |= 0x40
 
         if length < 126:
             header = bytes([first, length])
@@ -102,6 +142,11 @@ class WebSocketServer:
       - prediction
       - anomaly
       - camera.status
+      - event.batch (several events buffered in one flush tick)
+
+    permessage-deflate is negotiated when the client offers it and
+    StreamConfig.compression_enabled is set. Only JSON event traffic is
+    compressed; frame messages are sent uncompressed.
     """
 
     def __init__(
@@ -120,9 +165,17 @@ class WebSocketServer:
             connection_manager=self._connections,
             config=self._config,
         )
+        self._event_bus = EventBus(
+            loop=loop,
+            on_flush=self._send_event_batch,
+            flush_interval=self._config.event_flush_interval,
+        )
         self._server: Optional[asyncio.AbstractServer] = None
         self._started = False
 
+        if hasattr(camera_manager, "add_camera_listener"):
+            camera_manager.add_camera_listener(self._on_camera_changed)
+
     def start_threadsafe(self) -> None:
         try:
             future = asyncio.run_coroutine_threadsafe(self.start(), self._loop)
@@ -148,6 +201,7 @@ class WebSocketServer:
                 self._config.port,
             )
             self._publisher.start()
+            self._event_bus.start()
             self._started = True
             logger.log(
                 "WebSocket server started | "
@@ -159,6 +213,7 @@ class WebSocketServer:
     async def stop(self) -> None:
         try:
             self._publisher.stop()
+            await self._event_bus.stop()
 
             if self._server:
                 self._server.close()
@@ -170,11 +225,31 @@ class WebSocketServer:
         except Exception as e:
             logger.error("WebSocket server shutdown failed", exc_info=e)
 
-    def publish_event_threadsafe(self, event: Dict[str, Any]) -> None:
+    def _on_camera_changed(self, camera_id: str, change: str) -> None:
+        """
+        CameraManager listener (config reload thread). Must never raise.
+        """
         try:
-            asyncio.run_coroutine_threadsafe(self.publish_event(event), self._loop)
+            self._loop.call_soon_threadsafe(
+                self._publisher.apply_camera_change,
+                camera_id,
+                change,
+            )
+            if change == "removed":
+                self.publish_event_threadsafe(
+                    make_event("camera.status", camera_id, {"state": "removed"})
+                )
         except Exception as e:
-            logger.error("Failed to schedule WebSocket event publish", exc_info=e)
+            logger.error(
+                f"Failed to apply camera change to WebSocket server | camera={camera_id}",
+                exc_info=e,
+            )
+
+    def publish_event_threadsafe(self, event: Dict[str, Any]) -> None:
+        """
+        Buffer an event for the next flush tick. Safe from any thread.
+        """
+        self._event_bus.publish(event)
 
     async def publish_event(self, event: Dict[str, Any]) -> None:
         try:
@@ -182,26 +257,55 @@ class WebSocketServer:
             if not camera_id:
                 return
 
-            clients = await self._connections.clients_for(camera_id)
-            stale = []
+            await self._send_to_camera_clients(camera_id, event)
+
+        except Exception as e:
+            logger.error("Failed to publish WebSocket event", exc_info=e)
 
-            for client in clients:
-                ok = await client.send_json(event)
-                if not ok:
-                    stale.append(client)
+    async def _send_event_batch(self, camera_id: str, events: list) -> None:
+        try:
+            if len(events) == 1:
+                message = events[0]
+            else:
+                message = make_event(
+                    "event.batch",
+                    camera_id,
+                    {"events": events},
+                )
 
-            for client in stale:
-                await self._connections.remove(camera_id, client)
+            await self._send_to_camera_clients(camera_id, message)
 
         except Exception as e:
-            logger.error("Failed to publish WebSocket event", exc_info=e)
+            logger.error("Failed to publish WebSocket event batch", exc_info=e)
+
+    async def _send_to_camera_clients(
+        self,
+        camera_id: str,
+        message: Dict[str, Any],
+    ) -> None:
+        clients = await self._connections.clients_for(camera_id)
+        if not clients:
+            return
+
+        stale = []
+        for client in clients:
+            ok = await client.send_json(message)
+            if not ok:
+                stale.append(client)
+
+        for client in stale:
+            await self._connections.remove(camera_id, client)
 
     async def _handle_client(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
     ) -> None:
-        client = WebSocketClient(reader, writer)
+        client = WebSocketClient(
+            reader,
+            writer,
+            compression_min_bytes=self._config.compression_min_bytes,
+        )
         camera_id = "unknown"
 
         try:
@@ -222,7 +326,17 @@ class WebSocketServer:
                 await self._reject(writer, "400 Bad Request", "Missing websocket key")
                 return
 
-            await self._accept(writer, key)
+            deflate = None
+            if self._config.compression_enabled:
+                params = negotiate(request["headers"].get("sec-websocket-extensions"))
+                if params is not None:
+                    deflate = PerMessageDeflate(
+                        params,
+                        level=self._config.compression_level,
+                    )
+
+            await self._accept(writer, key, deflate)
+            client.deflate = deflate
             await self._connections.add(camera_id, client)
 
             await client.send_json(
@@ -274,16 +388,28 @@ class WebSocketServer:
             return None
         return match.group(1)
 
-    async def _accept(self, writer: asyncio.StreamWriter, key: str) -> None:
+    async def _accept(
+        self,
+        writer: asyncio.StreamWriter,
+        key: str,
+        deflate: Optional[PerMessageDeflate] = None,
+    ) -> None:
         accept_value = base64.b64encode(
             hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()
         ).decode("ascii")
 
+        extensions = ""
+        if deflate is not None:
+            extensions = (
+                f"Sec-WebSocket-Extensions: {deflate.params.response_header()}\r\n"
+            )
+
         response = (
             "HTTP/1.1 101 Switching Protocols\r\n"
             "Upgrade: websocket\r\n"
             "Connection: Upgrade\r\n"
             f"Sec-WebSocket-Accept: {accept_value}\r\n"
+            f"{extensions}"
             "\r\n"
         )
         writer.write(response.encode("ascii"))
@@ -315,28 +441,68 @@ class WebSocketServer:
             if frame is None:
                 return
 
-            opcode, payload = frame
+            opcode, payload, compressed = frame
             if opcode == 0x8:
                 return
             if opcode == 0x9:
                 await client.send_pong(payload)
             elif opcode == 0x1:
-                await self._handle_client_text(camera_id, payload)
-
-    async def _handle_client_text(self, camera_id: str, payload: bytes) -> None:
+                if compressed:
+                    if client.deflate is None:
+                        # RSV1 without a negotiated extension is a protocol error
+                        return
+                    try:
+                        payload = client.deflate.decompress(payload)
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to inflate WebSocket message | camera={camera_id}",
+                            exc_info=e,
+                        )
+                        return
+                await self._handle_client_text(client, camera_id, payload)
+
+    async def _handle_client_text(
+        self,
+        client: WebSocketClient,
+        camera_id: str,
+        payload: bytes,
+    ) -> None:
         try:
             text = payload.decode("utf-8", errors="replace")
             logger.log(f"WebSocket client message | camera={camera_id} text={text}")
+
+            try:
+                message = json.loads(text)
+            except ValueError:
+                return
+
+            if isinstance(message, dict) and message.get("type") == "camera.zoom":
+                await self._send_high_res_frame(client, camera_id)
+
         except Exception as e:
             logger.error("Failed to handle WebSocket client text", exc_info=e)
 
+    async def _send_high_res_frame(self, client: WebSocketClient, camera_id: str) -> None:
+        """
+        Answer a zoom request with one main-stream frame. Fetching may
+        connect the main stream, so it runs off the event loop.
+        """
+        message = await asyncio.get_running_loop().run_in_executor(
+            None,
+            self._publisher.build_high_res_frame_message,
+            camera_id,
+        )
+        if message:
+            await client.send_json(message, compress=False)
+
     async def _read_client_frame(
         self,
         reader: asyncio.StreamReader,
-    ) -> Optional[tuple[int, bytes]]:
+    ) -> Optional[tuple[int, bytes, bool]]:
         try:
             header = await reader.readexactly(2)
             first, second = header
+            compressed = bool(first & 0x40)
             opcode = first & 0x0F
             masked = bool(second & 0x80)
             length = second & 0x7F
@@ -352,7 +518,7 @@ class WebSocketServer:
             if masked:
                 payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
 
-            return opcode, payload
+            return opcode, payload, compressed
 
         except asyncio.IncompleteReadError:
             return None